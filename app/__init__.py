@@ -1,4 +1,5 @@
 from flask import Flask
+from werkzeug.middleware.proxy_fix import ProxyFix
 from config import config
 
 def create_app(config_name='default'):
@@ -7,9 +8,20 @@ def create_app(config_name='default'):
 
     app.config['SESSION_TYPE'] = 'filesystem'
     app.config['PERMANENT_SESSION_LIFETIME'] = 3600
+
+    proxies = app.config.get('TRUSTED_PROXY_COUNT', 0)
+    if proxies:
+        # request.remote_addr must be the client, not the proxy, for per-IP login throttling
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxies, x_proto=proxies)
     
     from app.middleware import init_app
     init_app(app)
+
+    from app.database import db
+    db.init_app(app)
+
+    from app.services.jobs import scheduler
+    scheduler.init_app(app)
     
     from app.routes import main_bp
     app.register_blueprint(main_bp)
@@ -1,7 +1,18 @@
 import psycopg2
 import psycopg2.extras
 from contextlib import contextmanager
+import functools
+import logging
 import os
+import threading
+import time
+from flask import has_request_context, session
+from app.database.pool import ConnectionPool
+from app.database.routing import ReplicaRouter
+from app.database.prepared import PreparedStatements, statement_name
+from app.database.metrics import QueryStats, InstrumentedCursor, request_query_totals
+
+logger = logging.getLogger(__name__)
 
 class Database:
     def __init__(self):
@@ -11,35 +22,307 @@ class Database:
             'password': os.environ.get('DB_PASSWORD'),
             'host': os.environ.get('DB_HOST'),
             'port': os.environ.get('DB_PORT'),
-            'sslmode': 'require'
+            'sslmode': os.environ.get('DB_SSLMODE', 'require')
+        }
+        self.replica_conn_params = None
+        if os.environ.get('DB_REPLICA_HOST'):
+            self.replica_conn_params = dict(
+                self.conn_params,
+                host=os.environ.get('DB_REPLICA_HOST'),
+                port=os.environ.get('DB_REPLICA_PORT', self.conn_params['port']),
+                connect_timeout=int(os.environ.get('DB_REPLICA_CONNECT_TIMEOUT', 3))
+            )
+        self.replica_config = {
+            'max_lag': float(os.environ.get('DB_REPLICA_MAX_LAG', 10)),
+            'lag_check_interval': float(os.environ.get('DB_REPLICA_LAG_CHECK_INTERVAL', 5)),
+            'retry_after': float(os.environ.get('DB_REPLICA_RETRY_AFTER', 30))
         }
-    
+        self.read_your_writes_window = float(os.environ.get('DB_READ_YOUR_WRITES_SECONDS', 5))
+        self.pool_config = {
+            'min_size': int(os.environ.get('DB_POOL_MIN_SIZE', 1)),
+            'max_size': int(os.environ.get('DB_POOL_MAX_SIZE', 10)),
+            'max_lifetime': float(os.environ.get('DB_POOL_MAX_LIFETIME', 1800)),
+            'idle_timeout': float(os.environ.get('DB_POOL_IDLE_TIMEOUT', 300)),
+            'checkout_timeout': float(os.environ.get('DB_POOL_TIMEOUT', 30)),
+            'health_check_after': float(os.environ.get('DB_POOL_HEALTH_CHECK_AFTER', 30))
+        }
+        self._pool = None
+        self._replica = None
+        self._pool_pid = None
+        self._pool_lock = threading.Lock()
+        self._local = threading.local()
+        self.prepared = PreparedStatements(
+            enabled=os.environ.get('DB_PREPARED_STATEMENTS', 'true').lower() == 'true'
+        )
+        self.query_stats = QueryStats(
+            slow_query_ms=float(os.environ.get('DB_SLOW_QUERY_MS', 200))
+        )
+
+    def _ensure_pools(self):
+        pid = os.getpid()
+        if self._pool is None or self._pool_pid != pid:
+            with self._pool_lock:
+                if self._pool is None or self._pool_pid != pid:
+                    # Connections are never shared with a forked worker
+                    self._pool = ConnectionPool(self.conn_params, **self.pool_config)
+                    self._replica = None
+                    if self.replica_conn_params:
+                        replica_pool_config = dict(
+                            self.pool_config,
+                            checkout_timeout=float(os.environ.get('DB_REPLICA_POOL_TIMEOUT', 2))
+                        )
+                        self._replica = ReplicaRouter(
+                            self.replica_conn_params, replica_pool_config, **self.replica_config
+                        )
+                    self._pool_pid = pid
+
+    @property
+    def pool(self):
+        """Connection pool for the current process, created on first use"""
+        self._ensure_pools()
+        return self._pool
+
+    @property
+    def replica(self):
+        """Read replica router for the current process, or None when not configured"""
+        self._ensure_pools()
+        return self._replica
+
+    def pool_stats(self):
+        """Get connection pool usage statistics"""
+        stats = self.pool.stats()
+        if self.replica is not None:
+            stats['replica'] = self.replica.stats()
+        return stats
+
+    def close_pool(self):
+        """Close all idle pooled connections"""
+        if self._pool is not None:
+            self._pool.closeall()
+        if self._replica is not None:
+            self._replica.closeall()
+
+    @contextmanager
+    def reading(self):
+        """Mark nested get_cursor calls as read-only so they may use the replica"""
+        self._local.reading = getattr(self._local, 'reading', 0) + 1
+        try:
+            yield
+        finally:
+            self._local.reading -= 1
+
+    def read_only(self, func):
+        """Decorator for service methods that never write"""
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.reading():
+                return func(*args, **kwargs)
+        return wrapper
+
+    def _use_replica(self, unit):
+        if not getattr(self._local, 'reading', 0) or self.replica is None:
+            return False
+        if unit is not None and (unit['explicit'] or unit['wrote']):
+            # Explicit transactions and units that already wrote stay on the primary
+            return False
+        if has_request_context():
+            last_write = session.get('_db_last_write')
+            if last_write and time.time() - last_write < self.read_your_writes_window:
+                self.replica.count('read_your_writes')
+                return False
+        return True
+
+    def _note_write(self, unit):
+        if unit is not None:
+            unit['wrote'] = True
+        if has_request_context() and self.replica_conn_params:
+            session['_db_last_write'] = time.time()
+
+    def init_app(self, app):
+        """Register request hooks for Server-Timing and request-scoped connections"""
+        if app.config.get('DB_SERVER_TIMING', True):
+            @app.after_request
+            def add_server_timing_header(response):
+                count, elapsed = request_query_totals()
+                response.headers.add(
+                    'Server-Timing', f'db;dur={elapsed * 1000:.2f};desc="{count} queries"'
+                )
+                return response
+
+        if not app.config.get('DB_REQUEST_SCOPED', True):
+            return
+
+        @app.before_request
+        def begin_request_unit_of_work():
+            self._begin_unit()
+
+        @app.after_request
+        def commit_request_unit_of_work(response):
+            # Commit before the response is sent so a failed commit is reported
+            self._end_unit(commit=response.status_code < 500)
+            return response
+
+        @app.teardown_request
+        def release_request_unit_of_work(exc):
+            self._end_unit(commit=False)
+
+    def _current_unit(self):
+        return getattr(self._local, 'unit', None)
+
+    def _begin_unit(self, explicit=False):
+        if self._current_unit() is None:
+            # Connections are only checked out on the first get_cursor call
+            self._local.unit = {
+                'conn': None,
+                'replica_conn': None,
+                'failed': False,
+                'wrote': False,
+                'explicit': explicit,
+                'on_commit': []
+            }
+
+    def _end_unit(self, commit):
+        unit = self._current_unit()
+        if unit is None:
+            return
+        self._local.unit = None
+
+        replica_conn = unit['replica_conn']
+        if replica_conn is not None:
+            broken = False
+            try:
+                replica_conn.rollback()
+            except psycopg2.Error:
+                broken = True
+            self.replica.putconn(replica_conn, discard=broken)
+
+        conn = unit['conn']
+        committed = commit and not unit['failed']
+        if conn is not None:
+            broken = False
+            try:
+                if committed:
+                    conn.commit()
+                else:
+                    conn.rollback()
+            except Exception:
+                try:
+                    conn.rollback()
+                except psycopg2.Error:
+                    broken = True
+                raise
+            finally:
+                self.pool.putconn(conn, discard=broken)
+
+        if committed:
+            for callback in unit['on_commit']:
+                try:
+                    callback()
+                except Exception:
+                    # The data is already committed; a failing hook must not turn it into an error
+                    logger.exception("on_commit callback failed")
+
+    def on_commit(self, callback):
+        """Run callback once the current unit of work commits, or right away outside one"""
+        unit = self._current_unit()
+        if unit is None:
+            callback()
+        else:
+            unit['on_commit'].append(callback)
+
+    def in_transaction(self):
+        """Whether get_cursor calls currently share a request or transaction connection"""
+        return self._current_unit() is not None
+
+    @contextmanager
+    def transaction(self):
+        """Share one connection across nested get_cursor calls, committed once on exit"""
+        if self._current_unit() is not None:
+            # Join the enclosing request or transaction
+            try:
+                yield
+            except Exception:
+                self._current_unit()['failed'] = True
+                raise
+            return
+
+        self._begin_unit(explicit=True)
+        try:
+            yield
+        except Exception:
+            self._end_unit(commit=False)
+            raise
+        self._end_unit(commit=True)
+
+    def _checkout(self, pool):
+        conn = pool.getconn()
+        if conn is not None:
+            self.prepared.checked_out(conn)
+        return conn
+
     @contextmanager
     def get_connection(self):
-        """Context manager for database connections"""
+        """Context manager for pooled database connections"""
+        unit = self._current_unit()
+        use_replica = self._use_replica(unit)
+
+        if unit is not None:
+            conn = None
+            if use_replica:
+                if unit['replica_conn'] is None:
+                    unit['replica_conn'] = self._checkout(self.replica)
+                conn = unit['replica_conn']
+            if conn is None:
+                if unit['conn'] is None:
+                    unit['conn'] = self._checkout(self.pool)
+                conn = unit['conn']
+            try:
+                yield conn
+            except Exception:
+                unit['failed'] = True
+                raise
+            return
+
+        pool = self.pool
         conn = None
+        if use_replica:
+            conn = self._checkout(self.replica)
+            if conn is not None:
+                pool = self.replica
+        if conn is None:
+            conn = self._checkout(self.pool)
+
+        broken = False
         try:
-            conn = psycopg2.connect(**self.conn_params)
-            conn.autocommit = False
             yield conn
         except Exception as e:
-            if conn:
+            try:
                 conn.rollback()
+            except psycopg2.Error:
+                broken = True
+            if isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError)):
+                broken = True
             raise e
         finally:
-            if conn:
-                conn.close()
-    
+            pool.putconn(conn, discard=broken)
+
     @contextmanager
     def get_cursor(self, cursor_factory=psycopg2.extras.DictCursor):
         """Context manager for database cursors with transaction handling"""
+        unit = self._current_unit()
         with self.get_connection() as conn:
-            cursor = conn.cursor(cursor_factory=cursor_factory)
+            cursor = InstrumentedCursor(conn.cursor(cursor_factory=cursor_factory), self.query_stats)
             try:
                 yield cursor
-                conn.commit()
+                if unit is None:
+                    conn.commit()
             except Exception:
-                conn.rollback()
+                if unit is None:
+                    conn.rollback()
                 raise
+            finally:
+                cursor.close()
+                if cursor.wrote:
+                    self._note_write(unit)
 
-db = Database()
\ No newline at end of file
+db = Database()
@@ -0,0 +1,168 @@
+import logging
+import re
+import threading
+import time
+from collections import deque
+from flask import g, has_request_context, request
+
+slow_query_logger = logging.getLogger('app.database.slow_query')
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER = re.compile(r"%\(\w+\)s|%s")
+_WHITESPACE = re.compile(r"\s+")
+_WRITE_STATEMENT = re.compile(
+    r"^\s*(INSERT|UPDATE|DELETE|MERGE|TRUNCATE|COPY|CREATE|ALTER|DROP)\b", re.IGNORECASE
+)
+# Statements that write without starting with a write keyword: data-modifying CTEs and NOTIFY
+_CTE_WRITE = re.compile(r"^\s*WITH\b.*\b(INSERT|UPDATE|DELETE|MERGE)\b", re.IGNORECASE | re.DOTALL)
+_NOTIFY = re.compile(r"^\s*NOTIFY\b|\bpg_notify\s*\(", re.IGNORECASE)
+
+
+def is_write_statement(sql):
+    """Whether a statement changes data, so the unit has to stay on the primary"""
+    if isinstance(sql, bytes):
+        sql = sql.decode('utf-8', 'replace')
+    sql = str(sql)
+    return bool(_WRITE_STATEMENT.match(sql) or _CTE_WRITE.match(sql) or _NOTIFY.search(sql))
+
+
+def normalize_statement(sql):
+    """Collapse a SQL statement into a stable key without literals or parameters"""
+    if isinstance(sql, bytes):
+        sql = sql.decode('utf-8', 'replace')
+    sql = str(sql)
+    sql = _STRING_LITERAL.sub('?', sql)
+    sql = _PLACEHOLDER.sub('?', sql)
+    sql = _NUMBER_LITERAL.sub('?', sql)
+    return _WHITESPACE.sub(' ', sql).strip()
+
+
+def _percentile(sorted_samples, fraction):
+    if not sorted_samples:
+        return 0.0
+    index = min(int(round(fraction * (len(sorted_samples) - 1))), len(sorted_samples) - 1)
+    return sorted_samples[index]
+
+
+class QueryStats:
+    """Aggregated per-statement timings, shared by every thread in the process"""
+
+    OTHER = '<other>'
+
+    def __init__(self, slow_query_ms=200, max_statements=500, samples_per_statement=1000):
+        self.slow_query_ms = slow_query_ms
+        self.max_statements = max_statements
+        self.samples_per_statement = samples_per_statement
+        self._lock = threading.Lock()
+        self._statements = {}
+
+    def record(self, sql, duration, rowcount):
+        """Record one execute; duration is in seconds"""
+        statement = normalize_statement(sql)
+        endpoint = request.endpoint if has_request_context() else None
+        duration_ms = duration * 1000
+
+        with self._lock:
+            entry = self._statements.get(statement)
+            if entry is None:
+                if len(self._statements) >= self.max_statements:
+                    statement = self.OTHER
+                    entry = self._statements.get(statement)
+                if entry is None:
+                    entry = {
+                        'count': 0,
+                        'total_ms': 0.0,
+                        'max_ms': 0.0,
+                        'rows': 0,
+                        'slow': 0,
+                        'endpoints': {},
+                        'samples': deque(maxlen=self.samples_per_statement)
+                    }
+                    self._statements[statement] = entry
+            entry['count'] += 1
+            entry['total_ms'] += duration_ms
+            entry['max_ms'] = max(entry['max_ms'], duration_ms)
+            entry['rows'] += max(rowcount or 0, 0)
+            entry['samples'].append(duration_ms)
+            if endpoint:
+                entry['endpoints'][endpoint] = entry['endpoints'].get(endpoint, 0) + 1
+            is_slow = self.slow_query_ms is not None and duration_ms >= self.slow_query_ms
+            if is_slow:
+                entry['slow'] += 1
+
+        if has_request_context():
+            g._db_query_count = g.get('_db_query_count', 0) + 1
+            g._db_query_time = g.get('_db_query_time', 0.0) + duration
+
+        if is_slow:
+            slow_query_logger.warning(
+                "Slow query (%.1f ms, %s rows, endpoint=%s): %s",
+                duration_ms, rowcount, endpoint, statement
+            )
+
+    def summary(self):
+        """Per-statement percentiles, slowest total time first"""
+        with self._lock:
+            snapshot = [
+                (statement, dict(entry, samples=sorted(entry['samples']), endpoints=dict(entry['endpoints'])))
+                for statement, entry in self._statements.items()
+            ]
+
+        result = []
+        for statement, entry in snapshot:
+            samples = entry['samples']
+            result.append({
+                'statement': statement,
+                'count': entry['count'],
+                'rows': entry['rows'],
+                'slow': entry['slow'],
+                'total_ms': round(entry['total_ms'], 3),
+                'mean_ms': round(entry['total_ms'] / entry['count'], 3),
+                'p50_ms': round(_percentile(samples, 0.50), 3),
+                'p95_ms': round(_percentile(samples, 0.95), 3),
+                'p99_ms': round(_percentile(samples, 0.99), 3),
+                'max_ms': round(entry['max_ms'], 3),
+                'endpoints': entry['endpoints']
+            })
+        result.sort(key=lambda item: item['total_ms'], reverse=True)
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._statements.clear()
+
+
+class InstrumentedCursor:
+    """Cursor proxy that times every execute and reports it to QueryStats"""
+
+    def __init__(self, cursor, stats):
+        self._cursor = cursor
+        self._stats = stats
+        self.wrote = False
+
+    def _timed(self, method, sql, *args):
+        if not self.wrote:
+            self.wrote = is_write_statement(sql)
+        started = time.perf_counter()
+        try:
+            return method(sql, *args)
+        finally:
+            self._stats.record(sql, time.perf_counter() - started, self._cursor.rowcount)
+
+    def execute(self, sql, params=None):
+        return self._timed(self._cursor.execute, sql, params)
+
+    def executemany(self, sql, params_seq):
+        return self._timed(self._cursor.executemany, sql, params_seq)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def request_query_totals():
+    """Query count and DB time (seconds) accumulated by the current request"""
+    return g.get('_db_query_count', 0), g.get('_db_query_time', 0.0)
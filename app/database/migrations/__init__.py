@@ -0,0 +1,154 @@
+import hashlib
+import importlib
+import pkgutil
+import re
+import time
+from app.database import db
+from app.database.migrations import versions
+
+MIGRATION_LOCK_ID = 7253801
+
+_MODULE_NAME = re.compile(r"^(\d{4})_(\w+)$")
+
+
+class Migration:
+    """A versioned set of statements loaded from app/database/migrations/versions"""
+
+    def __init__(self, version, name, module):
+        self.version = version
+        self.name = name
+        self.description = getattr(module, 'description', name)
+        self.statements = list(module.statements)
+        # CREATE INDEX CONCURRENTLY and friends cannot run inside a transaction
+        self.transactional = getattr(module, 'transactional', True)
+
+    @property
+    def checksum(self):
+        return hashlib.md5('\n;\n'.join(self.statements).encode('utf-8')).hexdigest()
+
+
+def load_migrations():
+    """Discover migration modules ordered by version"""
+    migrations = []
+    for module_info in pkgutil.iter_modules(versions.__path__):
+        match = _MODULE_NAME.match(module_info.name)
+        if not match:
+            continue
+        module = importlib.import_module(f"{versions.__name__}.{module_info.name}")
+        migrations.append(Migration(int(match.group(1)), match.group(2), module))
+
+    migrations.sort(key=lambda migration: migration.version)
+    seen = set()
+    for migration in migrations:
+        if migration.version in seen:
+            raise ValueError(f"Duplicate migration version {migration.version:04d}")
+        seen.add(migration.version)
+    return migrations
+
+
+class MigrationRunner:
+    """Applies pending migrations in order and records them in schema_migrations"""
+
+    def __init__(self, migrations=None, log=print):
+        self.migrations = migrations if migrations is not None else load_migrations()
+        self.log = log
+
+    def _ensure_tracking_table(self, cursor):
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS schema_migrations (
+                version INTEGER PRIMARY KEY,
+                name VARCHAR(100) NOT NULL,
+                checksum VARCHAR(32) NOT NULL,
+                duration_ms INTEGER NOT NULL,
+                applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+
+    def applied_versions(self):
+        """Map of applied version -> checksum"""
+        with db.get_cursor() as cursor:
+            cursor.execute("SELECT to_regclass('schema_migrations') IS NOT NULL")
+            if not cursor.fetchone()[0]:
+                return {}
+            cursor.execute("SELECT version, checksum FROM schema_migrations")
+            return {row['version']: row['checksum'] for row in cursor.fetchall()}
+
+    def pending(self, target=None):
+        applied = self.applied_versions()
+        for migration in self.migrations:
+            if migration.version in applied and applied[migration.version] != migration.checksum:
+                self.log(f"Warning: migration {migration.version:04d}_{migration.name} "
+                         f"changed after it was applied")
+        return [
+            migration for migration in self.migrations
+            if migration.version not in applied and (target is None or migration.version <= target)
+        ]
+
+    def plan(self, target=None):
+        """Print the pending migrations and their statements without running them"""
+        pending = self.pending(target)
+        if not pending:
+            self.log("Database is up to date.")
+            return pending
+        for migration in pending:
+            mode = '' if migration.transactional else ' (outside a transaction)'
+            self.log(f"-- {migration.version:04d}_{migration.name}: {migration.description}{mode}")
+            for statement in migration.statements:
+                self.log(statement.strip() + ';')
+            self.log('')
+        return pending
+
+    def _apply(self, conn, migration):
+        started = time.perf_counter()
+        if migration.transactional:
+            with conn.cursor() as cursor:
+                for statement in migration.statements:
+                    cursor.execute(statement)
+                self._record(cursor, migration, started)
+            conn.commit()
+            return
+
+        conn.autocommit = True
+        try:
+            with conn.cursor() as cursor:
+                for statement in migration.statements:
+                    cursor.execute(statement)
+        finally:
+            conn.autocommit = False
+        with conn.cursor() as cursor:
+            self._record(cursor, migration, started)
+        conn.commit()
+
+    def _record(self, cursor, migration, started):
+        cursor.execute("""
+            INSERT INTO schema_migrations (version, name, checksum, duration_ms)
+            VALUES (%s, %s, %s, %s)
+        """, (migration.version, migration.name, migration.checksum,
+              int((time.perf_counter() - started) * 1000)))
+
+    def run(self, target=None):
+        """Apply pending migrations; safe to call from several processes at once"""
+        applied = []
+        with db.get_connection() as conn:
+            with conn.cursor() as cursor:
+                self._ensure_tracking_table(cursor)
+            conn.commit()
+
+            conn.autocommit = True
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT pg_advisory_lock(%s)", (MIGRATION_LOCK_ID,))
+            conn.autocommit = False
+            try:
+                for migration in self.pending(target):
+                    self.log(f"Applying {migration.version:04d}_{migration.name}...")
+                    self._apply(conn, migration)
+                    applied.append(migration)
+            except Exception:
+                conn.rollback()
+                raise
+            finally:
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT pg_advisory_unlock(%s)", (MIGRATION_LOCK_ID,))
+                conn.autocommit = False
+        return applied
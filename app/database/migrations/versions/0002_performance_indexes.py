@@ -0,0 +1,54 @@
+description = "Indexes for the hot reservation, inventory and user filters"
+
+# Built concurrently so existing deployments keep serving requests
+transactional = False
+
+statements = [
+    # Admin list filtered by date/status and today's reservations
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_reservations_date_status
+    ON reservations (reservation_date, status)
+    """,
+    # Per-user lists and upcoming reservations
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_reservations_user_date
+    ON reservations (user_id, reservation_date, start_time)
+    """,
+    # Conflict checks only ever look at pending/confirmed rows
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_reservations_active_slot
+    ON reservations (reservation_date, start_time, end_time)
+    WHERE status IN ('pending', 'confirmed')
+    """,
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_reservations_created_at
+    ON reservations (created_at DESC)
+    """,
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_inventory_type_status_created
+    ON inventory_items (item_type, status, created_at DESC)
+    """,
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_inventory_created_at
+    ON inventory_items (created_at DESC)
+    """,
+    # Case-insensitive lookups and prefix searches on users
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_lower_username
+    ON users (lower(username) text_pattern_ops)
+    """,
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_lower_email
+    ON users (lower(email) text_pattern_ops)
+    """,
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_lower_full_name
+    ON users (lower(full_name) text_pattern_ops)
+    """,
+    # Dropdowns only list active users ordered by name
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_active_full_name
+    ON users (full_name)
+    WHERE is_active = TRUE
+    """
+]
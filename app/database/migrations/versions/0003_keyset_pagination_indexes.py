@@ -0,0 +1,14 @@
+description = "Composite indexes matching the keyset pagination sort keys"
+
+transactional = False
+
+statements = [
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_reservations_keyset
+    ON reservations (reservation_date, start_time, id)
+    """,
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_inventory_keyset
+    ON inventory_items (created_at, id)
+    """
+]
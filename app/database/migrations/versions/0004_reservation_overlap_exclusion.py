@@ -0,0 +1,43 @@
+description = "Reject overlapping pending/confirmed reservations in the schema"
+
+statements = [
+    # The exclusion constraint cannot be added while overlaps exist; fail with a clear message
+    """
+    DO $$
+    BEGIN
+        IF EXISTS (
+            SELECT 1
+            FROM reservations a
+            JOIN reservations b
+              ON a.id < b.id
+             AND a.reservation_date = b.reservation_date
+             AND a.start_time < b.end_time
+             AND b.start_time < a.end_time
+            WHERE a.status IN ('pending', 'confirmed')
+              AND b.status IN ('pending', 'confirmed')
+        ) THEN
+            RAISE EXCEPTION 'Existen reservaciones activas traslapadas; resuélvalas antes de aplicar esta migración';
+        END IF;
+    END $$
+    """,
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'reservations_time_order') THEN
+            ALTER TABLE reservations
+                ADD CONSTRAINT reservations_time_order CHECK (end_time > start_time) NOT VALID;
+        END IF;
+    END $$
+    """,
+    """
+    DO $$
+    BEGIN
+        IF NOT EXISTS (SELECT 1 FROM pg_constraint WHERE conname = 'reservations_no_overlap') THEN
+            ALTER TABLE reservations
+                ADD CONSTRAINT reservations_no_overlap EXCLUDE USING gist (
+                    tsrange(reservation_date + start_time, reservation_date + end_time) WITH &&
+                ) WHERE (status IN ('pending', 'confirmed'));
+        END IF;
+    END $$
+    """
+]
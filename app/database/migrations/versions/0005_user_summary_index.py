@@ -0,0 +1,11 @@
+description = "Covering index for the per-user dashboard summary"
+
+transactional = False
+
+statements = [
+    # Lets the summary aggregate count a user's reservations with an index-only scan
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_reservations_user_summary
+    ON reservations (user_id, reservation_date) INCLUDE (status)
+    """
+]
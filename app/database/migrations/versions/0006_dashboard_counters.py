@@ -0,0 +1,94 @@
+description = "Dashboard counters maintained by statement-level triggers"
+
+# Counter names each row contributes to, as a SQL array over the row's columns
+COUNTER_KEYS = {
+    'users': """ARRAY[
+        'users:total',
+        CASE WHEN is_active THEN 'users:active' ELSE 'users:inactive' END,
+        CASE WHEN is_admin THEN 'users:admin' END
+    ]""",
+    'reservations': """ARRAY[
+        'reservations:total',
+        'reservations:' || status
+    ]""",
+    'inventory_items': """ARRAY[
+        'inventory:total',
+        'inventory_type:' || item_type,
+        'inventory_status:' || status
+    ]""",
+}
+
+# Concurrent writers add to one of several rows per counter instead of queueing on a single one
+SHARDS = 8
+
+statements = [
+    """
+    CREATE TABLE IF NOT EXISTS dashboard_counters (
+        name TEXT NOT NULL,
+        shard SMALLINT NOT NULL DEFAULT 0,
+        value BIGINT NOT NULL DEFAULT 0,
+        PRIMARY KEY (name, shard)
+    )
+    """,
+    # TG_ARGV[0] is the table's COUNTER_KEYS expression; transition tables are visible to EXECUTE
+    f"""
+    CREATE OR REPLACE FUNCTION apply_dashboard_counters() RETURNS trigger AS $$
+    DECLARE
+        changes TEXT;
+    BEGIN
+        changes := CASE TG_OP
+            WHEN 'INSERT' THEN format('SELECT unnest(%1$s) AS name, 1 AS delta FROM new_rows', TG_ARGV[0])
+            WHEN 'DELETE' THEN format('SELECT unnest(%1$s) AS name, -1 AS delta FROM old_rows', TG_ARGV[0])
+            ELSE format(
+                'SELECT unnest(%1$s) AS name, 1 AS delta FROM new_rows '
+                'UNION ALL SELECT unnest(%1$s), -1 FROM old_rows', TG_ARGV[0]
+            )
+        END;
+        EXECUTE format(
+            'INSERT INTO dashboard_counters (name, shard, value) '
+            'SELECT name, pg_backend_pid() %% {SHARDS}, SUM(delta) FROM (%s) changes '
+            'WHERE name IS NOT NULL GROUP BY name HAVING SUM(delta) <> 0 '
+            'ON CONFLICT (name, shard) DO UPDATE SET value = dashboard_counters.value + EXCLUDED.value',
+            changes
+        );
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    # Source of truth used to seed the counters and by the reconciliation job
+    f"""
+    CREATE OR REPLACE FUNCTION dashboard_counter_totals() RETURNS TABLE (name TEXT, value BIGINT) AS $$
+        SELECT keys.name, COUNT(*)
+        FROM (
+            SELECT unnest({COUNTER_KEYS['users']}) AS name FROM users
+            UNION ALL
+            SELECT unnest({COUNTER_KEYS['reservations']}) FROM reservations
+            UNION ALL
+            SELECT unnest({COUNTER_KEYS['inventory_items']}) FROM inventory_items
+        ) keys
+        WHERE keys.name IS NOT NULL
+        GROUP BY keys.name
+    $$ LANGUAGE sql STABLE
+    """,
+]
+
+for table, keys in COUNTER_KEYS.items():
+    for event, transition in (('INSERT', 'NEW TABLE AS new_rows'),
+                              ('UPDATE', 'OLD TABLE AS old_rows NEW TABLE AS new_rows'),
+                              ('DELETE', 'OLD TABLE AS old_rows')):
+        trigger = f"{table}_counters_{event.lower()}"
+        statements += [
+            f"DROP TRIGGER IF EXISTS {trigger} ON {table}",
+            f"""
+            CREATE TRIGGER {trigger}
+            AFTER {event} ON {table}
+            REFERENCING {transition}
+            FOR EACH STATEMENT EXECUTE PROCEDURE apply_dashboard_counters('{keys.replace("'", "''")}')
+            """,
+        ]
+
+# CREATE TRIGGER holds off writers until commit, so the seed matches what the triggers see next
+statements += [
+    "DELETE FROM dashboard_counters",
+    "INSERT INTO dashboard_counters (name, value) SELECT name, value FROM dashboard_counter_totals()",
+]
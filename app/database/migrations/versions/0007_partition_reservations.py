@@ -0,0 +1,112 @@
+import importlib
+
+description = "Range-partition reservations by month with a default partition as a safety net"
+
+# Reuses the trigger definitions of the dashboard counters so both stay in sync
+_counters = importlib.import_module('app.database.migrations.versions.0006_dashboard_counters')
+
+_EXCLUDE_OVERLAP = (
+    "EXCLUDE USING gist (tsrange(reservation_date + start_time, reservation_date + end_time) WITH &&) "
+    "WHERE (status IN ('pending', 'confirmed'))"
+)
+
+# Copies the whole table while holding an exclusive lock on it; run it in a maintenance window
+statements = [
+    # The new table validates the time order constraint that 0004 added as NOT VALID
+    """
+    DO $$
+    BEGIN
+        IF EXISTS (SELECT 1 FROM reservations WHERE end_time <= start_time) THEN
+            RAISE EXCEPTION 'Existen reservaciones con hora de fin anterior a la de inicio; corríjalas antes de aplicar esta migración';
+        END IF;
+    END $$
+    """,
+    "ALTER TABLE reservations RENAME TO reservations_legacy",
+    "ALTER INDEX reservations_pkey RENAME TO reservations_legacy_pkey",
+    # Keep the id sequence alive when the old table is dropped
+    "ALTER SEQUENCE reservations_id_seq OWNED BY NONE",
+    """
+    CREATE TABLE reservations (
+        id INTEGER NOT NULL DEFAULT nextval('reservations_id_seq'),
+        user_id INTEGER NOT NULL REFERENCES users(id),
+        reservation_date DATE NOT NULL,
+        start_time TIME NOT NULL,
+        end_time TIME NOT NULL,
+        status VARCHAR(20) DEFAULT 'pending',
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        PRIMARY KEY (id, reservation_date),
+        CONSTRAINT reservations_time_order CHECK (end_time > start_time)
+    ) PARTITION BY RANGE (reservation_date)
+    """,
+    # Catches dates no monthly partition covers yet; ensure_reservation_partition drains it
+    "CREATE TABLE reservations_default PARTITION OF reservations DEFAULT",
+    f"ALTER TABLE reservations_default ADD CONSTRAINT reservations_default_no_overlap {_EXCLUDE_OVERLAP}",
+    # Exclusion constraints cannot span partitions, but overlapping bookings share a date and
+    # therefore a month, so one constraint per partition is equivalent
+    f"""
+    CREATE OR REPLACE FUNCTION ensure_reservation_partition(target_month DATE) RETURNS TEXT AS $$
+    DECLARE
+        month_start DATE := date_trunc('month', target_month)::date;
+        month_end DATE := (date_trunc('month', target_month) + INTERVAL '1 month')::date;
+        partition_name TEXT := 'reservations_' || to_char(month_start, 'YYYY_MM');
+    BEGIN
+        IF to_regclass(partition_name) IS NOT NULL THEN
+            RETURN partition_name;
+        END IF;
+
+        EXECUTE format('CREATE TABLE %I (LIKE reservations INCLUDING DEFAULTS INCLUDING CONSTRAINTS)',
+                       partition_name);
+        EXECUTE format('ALTER TABLE %I ADD CONSTRAINT %I {_EXCLUDE_OVERLAP.replace("'", "''")}',
+                       partition_name, partition_name || '_no_overlap');
+        EXECUTE format(
+            'WITH moved AS (DELETE FROM reservations_default '
+            'WHERE reservation_date >= %L AND reservation_date < %L RETURNING *) '
+            'INSERT INTO %I SELECT * FROM moved',
+            month_start, month_end, partition_name
+        );
+        EXECUTE format('ALTER TABLE reservations ATTACH PARTITION %I FOR VALUES FROM (%L) TO (%L)',
+                       partition_name, month_start, month_end);
+        RETURN partition_name;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    # Every month from the oldest reservation through two years ahead
+    """
+    SELECT ensure_reservation_partition(month::date)
+    FROM generate_series(
+        date_trunc('month', LEAST(COALESCE((SELECT MIN(reservation_date) FROM reservations_legacy), CURRENT_DATE),
+                                  CURRENT_DATE)),
+        date_trunc('month', CURRENT_DATE) + INTERVAL '24 months',
+        INTERVAL '1 month'
+    ) AS month
+    """,
+    # Counter triggers are created afterwards, so the copy leaves the dashboard counters untouched
+    """
+    INSERT INTO reservations (id, user_id, reservation_date, start_time, end_time, status, created_at)
+    SELECT id, user_id, reservation_date, start_time, end_time, status, created_at
+    FROM reservations_legacy
+    """,
+    "DROP TABLE reservations_legacy",
+    "ALTER SEQUENCE reservations_id_seq OWNED BY reservations.id",
+    # The indexes of 0002, 0003 and 0005, now cascaded to every partition
+    "CREATE INDEX idx_reservations_date_status ON reservations (reservation_date, status)",
+    "CREATE INDEX idx_reservations_user_date ON reservations (user_id, reservation_date, start_time)",
+    """
+    CREATE INDEX idx_reservations_active_slot ON reservations (reservation_date, start_time, end_time)
+    WHERE status IN ('pending', 'confirmed')
+    """,
+    "CREATE INDEX idx_reservations_created_at ON reservations (created_at DESC)",
+    "CREATE INDEX idx_reservations_keyset ON reservations (reservation_date, start_time, id)",
+    "CREATE INDEX idx_reservations_user_summary ON reservations (user_id, reservation_date) INCLUDE (status)",
+    "ANALYZE reservations",
+]
+
+for event, transition in (('INSERT', 'NEW TABLE AS new_rows'),
+                          ('UPDATE', 'OLD TABLE AS old_rows NEW TABLE AS new_rows'),
+                          ('DELETE', 'OLD TABLE AS old_rows')):
+    statements.append(f"""
+    CREATE TRIGGER reservations_counters_{event.lower()}
+    AFTER {event} ON reservations
+    REFERENCING {transition}
+    FOR EACH STATEMENT EXECUTE PROCEDURE apply_dashboard_counters('{_counters.COUNTER_KEYS['reservations'].replace("'", "''")}')
+    """)
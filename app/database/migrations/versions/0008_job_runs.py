@@ -0,0 +1,26 @@
+description = "History of background job runs"
+
+statements = [
+    """
+    CREATE TABLE IF NOT EXISTS job_runs (
+        id SERIAL PRIMARY KEY,
+        job_name VARCHAR(100) NOT NULL,
+        status VARCHAR(20) NOT NULL,
+        rows_affected INTEGER,
+        message TEXT,
+        started_at TIMESTAMP NOT NULL,
+        finished_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+        duration_ms INTEGER NOT NULL
+    )
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS idx_job_runs_name_finished
+    ON job_runs (job_name, finished_at DESC)
+    """,
+    # Expiry scans only ever look for pending rows by date
+    """
+    CREATE INDEX IF NOT EXISTS idx_reservations_pending_date
+    ON reservations (reservation_date)
+    WHERE status = 'pending'
+    """
+]
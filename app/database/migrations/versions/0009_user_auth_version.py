@@ -0,0 +1,9 @@
+description = "Per-user auth_version checked against signed session snapshots"
+
+statements = [
+    # Bumped whenever a change must invalidate the sessions of that user
+    """
+    ALTER TABLE users
+    ADD COLUMN IF NOT EXISTS auth_version INTEGER NOT NULL DEFAULT 1
+    """
+]
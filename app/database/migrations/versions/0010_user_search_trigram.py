@@ -0,0 +1,14 @@
+description = "Trigram index for user search"
+
+# Built concurrently so existing deployments keep serving requests
+transactional = False
+
+statements = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    # One index over the concatenated search text for username, full name and email;
+    # replaced by per-column indexes in 0012
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_search_trgm
+    ON users USING gin (lower(username || ' ' || full_name || ' ' || email) gin_trgm_ops)
+    """
+]
@@ -0,0 +1,40 @@
+description = "id -> reservation_date lookup so by-id reservation queries touch a single partition"
+
+# The partitioned primary key is (id, reservation_date), so 'WHERE id = ...' alone has to probe
+# every monthly partition. Writes pay one extra upsert into this small table instead.
+statements = [
+    """
+    CREATE TABLE IF NOT EXISTS reservation_locator (
+        id INTEGER PRIMARY KEY,
+        reservation_date DATE NOT NULL
+    )
+    """,
+    # The trigger only inserts or moves entries; it never deletes them. Ids are not reused, so the
+    # entry of a deleted reservation just leads to a partition where the id is no longer found,
+    # and rows drained out of reservations_default by ensure_reservation_partition (deleted
+    # there, copied into a partition before it is attached) stay correctly located. Entries of
+    # archived months are removed by ReservationPartitionService.archive_partitions.
+    """
+    CREATE OR REPLACE FUNCTION locate_reservation() RETURNS TRIGGER AS $$
+    BEGIN
+        INSERT INTO reservation_locator (id, reservation_date)
+        VALUES (NEW.id, NEW.reservation_date)
+        ON CONFLICT (id) DO UPDATE SET reservation_date = EXCLUDED.reservation_date
+        WHERE reservation_locator.reservation_date IS DISTINCT FROM EXCLUDED.reservation_date;
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+    """,
+    # A date change that moves the row to another partition fires the INSERT trigger on it
+    """
+    CREATE TRIGGER reservations_locate
+    AFTER INSERT OR UPDATE OF reservation_date ON reservations
+    FOR EACH ROW EXECUTE PROCEDURE locate_reservation()
+    """,
+    """
+    INSERT INTO reservation_locator (id, reservation_date)
+    SELECT id, reservation_date FROM reservations
+    ON CONFLICT (id) DO NOTHING
+    """,
+    "ANALYZE reservation_locator",
+]
@@ -0,0 +1,24 @@
+description = "Per-column trigram indexes for user search"
+
+# Built concurrently so existing deployments keep serving requests
+transactional = False
+
+statements = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    # Matching each column on its own keeps terms from spanning two fields, as the old ILIKE
+    # filters did; the expressions must match user_search.search_columns()
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_username_trgm
+    ON users USING gin (lower(username) gin_trgm_ops)
+    """,
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_full_name_trgm
+    ON users USING gin (lower(full_name) gin_trgm_ops)
+    """,
+    """
+    CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_users_email_trgm
+    ON users USING gin (lower(email) gin_trgm_ops)
+    """,
+    # The concatenated expression of 0010 is no longer queried
+    "DROP INDEX CONCURRENTLY IF EXISTS idx_users_search_trgm",
+]
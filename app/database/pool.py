@@ -0,0 +1,207 @@
+import threading
+import time
+import psycopg2
+import psycopg2.extensions
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection could be checked out in time"""
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of psycopg2 connections"""
+
+    def __init__(self, conn_params, min_size=1, max_size=10, max_lifetime=1800,
+                 idle_timeout=300, checkout_timeout=30, health_check_after=30):
+        self.conn_params = conn_params
+        self.min_size = min_size
+        self.max_size = max(max_size, 1)
+        self.max_lifetime = max_lifetime
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+        self.health_check_after = health_check_after
+
+        self._cond = threading.Condition()
+        self._idle = []  # (conn, returned_at), most recently used last
+        self._born = {}  # conn -> created_at for every open connection
+        self._in_use = 0
+        self._stats = {
+            'connections_created': 0,
+            'connections_closed': 0,
+            'checkouts': 0,
+            'waits': 0,
+            'wait_time': 0.0,
+            'timeouts': 0,
+            'health_check_failures': 0
+        }
+        self._warmed = False
+
+    def _connect(self):
+        conn = psycopg2.connect(**self.conn_params)
+        conn.autocommit = False
+        return conn
+
+    def _discard(self, conn):
+        """Close a connection and forget it; caller must hold the lock"""
+        self._born.pop(conn, None)
+        self._stats['connections_closed'] += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+    def _is_expired(self, conn, returned_at, now):
+        if self.max_lifetime and now - self._born.get(conn, now) > self.max_lifetime:
+            return True
+        if self.idle_timeout and now - returned_at > self.idle_timeout:
+            return True
+        return False
+
+    def _is_healthy(self, conn, returned_at, now):
+        """Check a connection that is about to be handed out"""
+        if conn.closed:
+            return False
+        if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+            return False
+        if now - returned_at < self.health_check_after:
+            return True
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            conn.rollback()
+            return True
+        except Exception:
+            return False
+
+    def _warm(self):
+        """Open min_size connections on first use"""
+        with self._cond:
+            if self._warmed:
+                return
+            self._warmed = True
+            missing = self.min_size - len(self._born)
+        for _ in range(max(missing, 0)):
+            conn = self._connect()
+            with self._cond:
+                if len(self._born) >= self.max_size:
+                    conn.close()
+                    break
+                self._born[conn] = time.monotonic()
+                self._stats['connections_created'] += 1
+                self._idle.append((conn, time.monotonic()))
+                self._cond.notify()
+
+    def getconn(self):
+        """Check out a healthy connection, opening a new one if allowed"""
+        if not self._warmed:
+            self._warm()
+
+        deadline = None
+        waited_since = None
+        while True:
+            with self._cond:
+                now = time.monotonic()
+                candidate = None
+                while self._idle:
+                    conn, returned_at = self._idle.pop()
+                    if self._is_expired(conn, returned_at, now):
+                        self._discard(conn)
+                        continue
+                    candidate = (conn, returned_at)
+                    break
+
+                if candidate is None:
+                    if len(self._born) < self.max_size:
+                        # Reserve the slot before releasing the lock to connect
+                        self._in_use += 1
+                        reserved = True
+                    else:
+                        reserved = False
+                        if waited_since is None:
+                            waited_since = now
+                            deadline = now + self.checkout_timeout
+                            self._stats['waits'] += 1
+                        remaining = deadline - now
+                        if remaining <= 0:
+                            self._stats['timeouts'] += 1
+                            self._stats['wait_time'] += now - waited_since
+                            raise PoolTimeout(
+                                f"No database connection available after {self.checkout_timeout}s"
+                            )
+                        self._cond.wait(remaining)
+                        continue
+                else:
+                    self._in_use += 1
+                    reserved = False
+
+            if reserved:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._cond:
+                        self._in_use -= 1
+                        self._cond.notify()
+                    raise
+                with self._cond:
+                    self._born[conn] = time.monotonic()
+                    self._stats['connections_created'] += 1
+                    self._record_checkout(waited_since)
+                return conn
+
+            conn, returned_at = candidate
+            if self._is_healthy(conn, returned_at, time.monotonic()):
+                with self._cond:
+                    self._record_checkout(waited_since)
+                return conn
+
+            with self._cond:
+                self._stats['health_check_failures'] += 1
+                self._in_use -= 1
+                self._discard(conn)
+                self._cond.notify()
+
+    def _record_checkout(self, waited_since):
+        self._stats['checkouts'] += 1
+        if waited_since is not None:
+            self._stats['wait_time'] += time.monotonic() - waited_since
+
+    def putconn(self, conn, discard=False):
+        """Return a connection to the pool, rolling back any open transaction"""
+        if not conn.closed and not discard:
+            try:
+                if conn.get_transaction_status() != psycopg2.extensions.TRANSACTION_STATUS_IDLE:
+                    conn.rollback()
+            except Exception:
+                discard = True
+
+        with self._cond:
+            self._in_use -= 1
+            if discard or conn.closed or conn not in self._born:
+                self._discard(conn)
+            else:
+                self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def closeall(self):
+        """Close every idle connection; in-use ones are closed when returned"""
+        with self._cond:
+            while self._idle:
+                conn, _ = self._idle.pop()
+                self._discard(conn)
+            # Forgetting the checked-out ones makes putconn discard them instead of re-idling
+            self._born.clear()
+            self._warmed = False
+
+    def stats(self):
+        """Snapshot of pool usage counters"""
+        with self._cond:
+            stats = dict(self._stats)
+            stats.update({
+                'size': len(self._born),
+                'in_use': self._in_use,
+                'idle': len(self._idle),
+                'min_size': self.min_size,
+                'max_size': self.max_size
+            })
+        stats['wait_time'] = round(stats['wait_time'], 6)
+        return stats
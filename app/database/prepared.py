@@ -0,0 +1,149 @@
+import hashlib
+import re
+import threading
+import weakref
+import psycopg2
+import psycopg2.errors
+import psycopg2.extensions
+from app.database.metrics import is_write_statement
+
+_PARAMETER = re.compile(r"%%|%s")
+
+
+def statement_name(prefix, sql):
+    """Stable name for a dynamically built statement"""
+    digest = hashlib.md5(sql.encode('utf-8')).hexdigest()[:10]
+    return f"{prefix}_{digest}"
+
+
+def _to_server_placeholders(sql):
+    """Turn psycopg2 %s placeholders into $1..$n for PREPARE"""
+    counter = [0]
+
+    def replace(match):
+        if match.group(0) == '%%':
+            return '%'
+        counter[0] += 1
+        return f"${counter[0]}"
+
+    return _PARAMETER.sub(replace, sql), counter[0]
+
+
+def _attempt(cursor, sql, params, expected_error):
+    """Run sql, returning False instead of raising expected_error
+
+    Inside an open transaction the statement runs under a savepoint, so
+    the expected failure does not abort the caller's transaction.
+    """
+    conn = cursor.connection
+    in_transaction = conn.get_transaction_status() == psycopg2.extensions.TRANSACTION_STATUS_INTRANS
+    if in_transaction:
+        with conn.cursor() as control:
+            control.execute("SAVEPOINT prepared_statement")
+    try:
+        cursor.execute(sql, params)
+    except expected_error:
+        if in_transaction:
+            with conn.cursor() as control:
+                control.execute("ROLLBACK TO SAVEPOINT prepared_statement; RELEASE SAVEPOINT prepared_statement")
+        else:
+            # Only the failed statement ran in this transaction
+            conn.rollback()
+        return False
+    if in_transaction:
+        # A separate cursor keeps the statement's results readable
+        with conn.cursor() as control:
+            control.execute("RELEASE SAVEPOINT prepared_statement")
+    return True
+
+
+class PreparedStatements:
+    """Registry of named server-side prepared statements, prepared once per connection"""
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._statements = {}  # name -> (original sql, server sql, parameter count, is write)
+        self._prepared = weakref.WeakKeyDictionary()  # connection -> {'names', 'verified'}
+
+    def register(self, name, sql):
+        """Register a statement under a name; re-registering the same SQL is a no-op"""
+        if not re.fullmatch(r"[a-z_][a-z0-9_]*", name):
+            raise ValueError(f"Invalid prepared statement name: {name}")
+        with self._lock:
+            existing = self._statements.get(name)
+            if existing is not None:
+                if existing[0] != sql:
+                    raise ValueError(f"Prepared statement {name} is already registered with different SQL")
+                return name
+            server_sql, param_count = _to_server_placeholders(sql)
+            self._statements[name] = (sql, server_sql, param_count, is_write_statement(sql))
+        return name
+
+    def execute(self, cursor, name, sql, params=()):
+        """Execute a registered statement, preparing it on this connection first if needed
+
+        A statement the session already has is used as is; statements the
+        session lost (DISCARD ALL, a pooler reset) are prepared again and
+        the EXECUTE retried once, without aborting the caller's transaction.
+        """
+        if not self.enabled:
+            cursor.execute(sql, params)
+            return
+
+        self.register(name, sql)
+        _, server_sql, param_count, is_write = self._statements[name]
+        if len(params) != param_count:
+            raise ValueError(f"Prepared statement {name} expects {param_count} parameters, got {len(params)}")
+        if is_write and hasattr(cursor, 'wrote'):
+            # 'EXECUTE name' hides the write from the cursor's own statement check
+            cursor.wrote = True
+
+        conn = cursor.connection
+        with self._lock:
+            state = self._prepared.setdefault(conn, {'names': set(), 'verified': False})
+            is_prepared = name in state['names']
+            verified = state['verified']
+
+        placeholders = ', '.join(['%s'] * param_count)
+        execute_sql = f"EXECUTE {name} ({placeholders})" if param_count else f"EXECUTE {name}"
+        if not is_prepared:
+            # A new or recycled connection: prepare before the first EXECUTE
+            self._prepare(cursor, name, server_sql, state)
+            cursor.execute(execute_sql, params)
+            return
+        if verified:
+            cursor.execute(execute_sql, params)
+            return
+
+        # First EXECUTE of an earlier PREPARE since checkout: the session may have been reset meanwhile
+        if not _attempt(cursor, execute_sql, params, psycopg2.errors.InvalidSqlStatementName):
+            with self._lock:
+                state['names'].clear()
+            self._prepare(cursor, name, server_sql, state)
+            cursor.execute(execute_sql, params)
+        with self._lock:
+            state['verified'] = True
+
+    def _prepare(self, cursor, name, server_sql, state):
+        # DuplicatePreparedStatement means the session kept it while we lost track; use it
+        _attempt(cursor, f"PREPARE {name} AS {server_sql}", None, psycopg2.errors.DuplicatePreparedStatement)
+        with self._lock:
+            state['names'].add(name)
+
+    def checked_out(self, conn):
+        """Note that a connection left the pool; its prepared statements are re-verified on first use"""
+        with self._lock:
+            state = self._prepared.get(conn)
+            if state is not None:
+                state['verified'] = False
+
+    def prepared_on(self, conn):
+        """Names prepared on a given connection"""
+        with self._lock:
+            state = self._prepared.get(conn)
+            return set(state['names']) if state else set()
+
+    def registered(self):
+        with self._lock:
+            return {name: entry[0] for name, entry in self._statements.items()}
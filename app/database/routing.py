@@ -0,0 +1,107 @@
+import logging
+import threading
+import time
+import psycopg2
+from app.database.pool import ConnectionPool, PoolTimeout
+
+logger = logging.getLogger(__name__)
+
+
+class ReplicaRouter:
+    """Decides whether read-only work can go to the replica and hands out its connections"""
+
+    def __init__(self, conn_params, pool_config, max_lag=10, lag_check_interval=5, retry_after=30):
+        self.conn_params = conn_params
+        self.pool = ConnectionPool(conn_params, **pool_config)
+        self.max_lag = max_lag
+        self.lag_check_interval = lag_check_interval
+        self.retry_after = retry_after
+
+        self._lock = threading.Lock()
+        self._down_until = 0.0
+        self._lag = None
+        self._lag_checked_at = 0.0
+        self._stats = {
+            'replica_reads': 0,
+            'primary_fallbacks': 0,
+            'lag_fallbacks': 0,
+            'read_your_writes': 0
+        }
+
+    def count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def _mark_down(self, error):
+        logger.warning("Read replica unavailable, using primary for %ss: %s", self.retry_after, error)
+        with self._lock:
+            self._down_until = time.monotonic() + self.retry_after
+            self._stats['primary_fallbacks'] += 1
+
+    def _measure_lag(self, conn):
+        """Replay lag in seconds; 0 when caught up or not a streaming replica"""
+        with conn.cursor() as cursor:
+            cursor.execute("""
+                SELECT CASE
+                    WHEN NOT pg_is_in_recovery() THEN 0
+                    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                    ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+                END
+            """)
+            lag = float(cursor.fetchone()[0])
+        conn.rollback()
+        return lag
+
+    def getconn(self):
+        """Check out a replica connection, or return None to fall back to the primary"""
+        now = time.monotonic()
+        with self._lock:
+            if now < self._down_until:
+                self._stats['primary_fallbacks'] += 1
+                return None
+            lag_due = now - self._lag_checked_at >= self.lag_check_interval
+            if lag_due:
+                # Only one thread refreshes the lag at a time
+                self._lag_checked_at = now
+            lag = self._lag
+
+        try:
+            conn = self.pool.getconn()
+        except (psycopg2.OperationalError, PoolTimeout) as e:
+            self._mark_down(e)
+            return None
+
+        try:
+            if lag_due:
+                lag = self._measure_lag(conn)
+                with self._lock:
+                    self._lag = lag
+            conn.readonly = True
+        except psycopg2.Error as e:
+            self.pool.putconn(conn, discard=True)
+            self._mark_down(e)
+            return None
+
+        if lag is not None and self.max_lag is not None and lag > self.max_lag:
+            self.pool.putconn(conn)
+            self.count('lag_fallbacks')
+            return None
+
+        self.count('replica_reads')
+        return conn
+
+    def putconn(self, conn, discard=False):
+        self.pool.putconn(conn, discard=discard)
+
+    def stats(self):
+        with self._lock:
+            stats = dict(self._stats)
+            stats.update({
+                'lag_seconds': self._lag,
+                'available': time.monotonic() >= self._down_until
+            })
+        stats['pool'] = self.pool.stats()
+        return stats
+
+    def closeall(self):
+        self.pool.closeall()
@@ -1,7 +1,21 @@
 from flask import request, session, redirect, url_for
 from app.services.user_service import UserService
 
+def _user_from_snapshot(user_id):
+    """User from the signed session snapshot while its auth_version is current, else from the database"""
+    snapshot = session.get('user')
+    if snapshot and snapshot.get('id') == user_id and \
+            snapshot.get('auth_version') == UserService.get_auth_version(user_id):
+        return dict(snapshot)
+    
+    user = UserService.get_user_for_auth(user_id)
+    if user:
+        UserService.remember_auth_version(user_id, user['auth_version'])
+        session['user'] = UserService.session_snapshot(user)
+    return user
+
 def init_app(app):
+    use_snapshots = app.config.get('SESSION_USER_SNAPSHOT', False)
     
     @app.before_request
     def load_authenticated_user():
@@ -13,8 +27,11 @@ def init_app(app):
         user_id = session.get('user_id')
         
         if user_id:
-            user = UserService.get_user_by_id(user_id)
-            if user:
+            if use_snapshots:
+                user = _user_from_snapshot(user_id)
+            else:
+                user = UserService.get_authenticated_user(user_id)
+            if user and user['is_active']:
                 request.user = user
                 return
             else:
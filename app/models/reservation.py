@@ -1,19 +0,0 @@
-from app.database import db
-
-class Reservation:
-    
-    @staticmethod
-    def create_table():
-        """Create reservations table if it doesn't exist"""
-        with db.get_cursor() as cursor:
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS reservations (
-                    id SERIAL PRIMARY KEY,
-                    user_id INTEGER NOT NULL REFERENCES users(id),
-                    reservation_date DATE NOT NULL,
-                    start_time TIME NOT NULL,
-                    end_time TIME NOT NULL,
-                    status VARCHAR(20) DEFAULT 'pending',
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
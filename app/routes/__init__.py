@@ -2,6 +2,22 @@ from flask import Blueprint, send_from_directory
 
 main_bp = Blueprint('main', __name__)
 
+def pagination_payload(result):
+    """Pagination block for list endpoints in offset or keyset mode"""
+    if 'next_cursor' in result:
+        return {
+            'per_page': result['per_page'],
+            'next_cursor': result['next_cursor'],
+            'has_more': result['has_more']
+        }
+    return {
+        'page': result['page'],
+        'per_page': result['per_page'],
+        'total_count': result['total_count'],
+        'total_pages': result['total_pages'],
+        'count_estimated': result.get('count_estimated', False)
+    }
+
 @main_bp.route('/manifest.json')
 def manifest():
     return send_from_directory('..', 'manifest.json')
@@ -15,4 +31,6 @@ from app.routes import admin_routes
 from app.routes import inventory_management_routes
 from app.routes import reservations_management_routes
 from app.routes import users_management_routes
+from app.routes import database_management_routes
+from app.routes import change_feed_routes
 from app.routes import user_routes
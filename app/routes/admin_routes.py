@@ -1,15 +1,16 @@
 from flask import render_template
 from app.routes import main_bp
-from app.services.user_service import UserService
 from app.services.reservation_service import ReservationService
+from app.services.counter_service import CounterService
 
 @main_bp.route('/admin/dashboard')
 def admin_dashboard():
     """Render admin dashboard with simplified data"""
     try:
-        total_users = UserService.get_total_users_count()
-        total_reservations = ReservationService.get_total_reservations_count()
-        pending_reservations = ReservationService.get_pending_reservations_count()
+        counters = CounterService.get_counters()
+        total_users = counters.get('users', {}).get('total', 0)
+        total_reservations = counters.get('reservations', {}).get('total', 0)
+        pending_reservations = counters.get('reservations', {}).get('pending', 0)
         recent_reservations = ReservationService.get_recent_reservations(limit=5)
         recent_reservations_formatted = [format_reservation_display(r) for r in recent_reservations]
         
@@ -57,7 +58,8 @@ def format_reservation_display(reservation):
         'end_time': reservation['end_time'].strftime('%H:%M'),
         'status': reservation['status'],
         'status_display': 'Confirmada' if reservation['status'] == 'confirmed' else 
-                        'Pendiente' if reservation['status'] == 'pending' else 'Cancelada',
+                        'Pendiente' if reservation['status'] == 'pending' else
+                        'Expirada' if reservation['status'] == 'expired' else 'Cancelada',
         'user_name': reservation.get('full_name', reservation.get('username', 'Usuario')),
         'created_display': reservation['created_at'].strftime('%d/%m %H:%M')
     }
\ No newline at end of file
@@ -1,5 +1,8 @@
-from flask import render_template, request, redirect, url_for, session, flash
+import math
+from flask import render_template, request, redirect, url_for, session, flash, make_response
 from app.routes import main_bp
+from app.services.password_hashing import PasswordPoolBusy
+from app.services.throttle import check_login_throttle, clear_login_throttle, record_failed_login
 from app.services.user_service import UserService
 
 @main_bp.route('/login', methods=['GET', 'POST'])
@@ -7,15 +10,32 @@ def login():
     if request.method == 'POST':
         username = request.form.get('username')
         password = request.form.get('password')
-        user = UserService.authenticate(username, password)
+        
+        retry_after = check_login_throttle(username, request.remote_addr)
+        if retry_after:
+            seconds = math.ceil(retry_after)
+            flash(f'Demasiados intentos de inicio de sesión. Intenta de nuevo en {seconds} segundos', 'error')
+            response = make_response(render_template('login.html'), 429)
+            response.headers['Retry-After'] = str(seconds)
+            return response
+        
+        try:
+            user = UserService.authenticate(username, password)
+        except (PasswordPoolBusy, TimeoutError):
+            flash('El servidor está ocupado, intenta de nuevo en unos segundos', 'error')
+            response = make_response(render_template('login.html'), 503)
+            response.headers['Retry-After'] = '5'
+            return response
         
         if user:
+            clear_login_throttle(username)
             session['user_id'] = user['id']
             session['user_name'] = user['full_name']
             flash(f'Iniciaste sesión como {user["full_name"]}', 'success')
             redirect_url = 'main.admin_dashboard' if user['is_admin'] else 'main.user_dashboard'
             return redirect(url_for(redirect_url))
         else:
+            record_failed_login(request.remote_addr)
             flash('Usuario o contraseña inválidos', 'error')
 
     return render_template('login.html')
@@ -0,0 +1,36 @@
+from flask import Response, request, jsonify, stream_with_context
+from app.routes import main_bp
+from app.services.change_feed import TOPICS, TooManyStreams, change_feed
+
+@main_bp.route('/api/admin/changes', methods=['GET'])
+def api_change_stream():
+    """Server-sent events stream of reservation and inventory changes for the admin tables"""
+    if not request.user or not request.user['is_admin']:
+        return jsonify({
+            'success': False,
+            'message': 'Acceso restringido a administradores'
+        }), 403
+    
+    topics = [topic for topic in request.args.get('topics', ','.join(TOPICS)).split(',') if topic in TOPICS]
+    if not topics:
+        return jsonify({
+            'success': False,
+            'message': f'Temas válidos: {", ".join(TOPICS)}'
+        }), 400
+    
+    try:
+        subscription = change_feed.subscribe(topics, request.headers.get('Last-Event-ID'))
+    except TooManyStreams:
+        response = jsonify({
+            'success': False,
+            'message': 'Demasiadas conexiones de actualización abiertas, intente más tarde'
+        })
+        response.status_code = 503
+        response.headers['Retry-After'] = '30'
+        return response
+    
+    response = Response(stream_with_context(change_feed.stream(subscription)), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # Keep reverse proxies from buffering the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
@@ -0,0 +1,98 @@
+from flask import request, jsonify
+from app.routes import main_bp
+from app.database import db
+from app.services.reservation_service import ReservationService
+from app.services.jobs import JOBS, JobService
+from app.services.change_feed import change_feed
+from app.services.user_service import UserService
+from app.services.password_hashing import password_hasher
+from app.services.throttle import login_ip_throttle, login_user_throttle
+
+@main_bp.route('/api/admin/database/stats', methods=['GET'])
+def api_get_database_stats():
+    """API endpoint to get aggregated query timings and pool usage"""
+    try:
+        if not request.user or not request.user['is_admin']:
+            return jsonify({
+                'success': False,
+                'message': 'Acceso restringido a administradores'
+            }), 403
+        
+        limit = int(request.args.get('limit', 50))
+        statements = db.query_stats.summary()
+        
+        return jsonify({
+            'success': True,
+            'slow_query_ms': db.query_stats.slow_query_ms,
+            'statements': statements[:limit],
+            'total_statements': len(statements),
+            'pool': db.pool_stats(),
+            'reservation_index': ReservationService.get_interval_index_stats(),
+            'change_feed': change_feed.stats(),
+            'user_cache': UserService.get_user_cache_stats(),
+            'login': {
+                'password_pool': password_hasher.stats(),
+                'user_throttle': login_user_throttle.stats(),
+                'ip_throttle': login_ip_throttle.stats()
+            }
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error al cargar estadísticas de la base de datos: {str(e)}'
+        }), 500
+
+@main_bp.route('/api/admin/database/stats', methods=['DELETE'])
+def api_reset_database_stats():
+    """API endpoint to reset aggregated query timings"""
+    try:
+        if not request.user or not request.user['is_admin']:
+            return jsonify({
+                'success': False,
+                'message': 'Acceso restringido a administradores'
+            }), 403
+        
+        db.query_stats.reset()
+        
+        return jsonify({
+            'success': True,
+            'message': 'Estadísticas reiniciadas'
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error al reiniciar estadísticas: {str(e)}'
+        }), 500
+
+@main_bp.route('/api/admin/jobs', methods=['GET'])
+def api_get_job_runs():
+    """API endpoint to get the latest background job runs"""
+    try:
+        if not request.user or not request.user['is_admin']:
+            return jsonify({
+                'success': False,
+                'message': 'Acceso restringido a administradores'
+            }), 403
+        
+        runs = JobService.get_recent_runs(
+            job_name=request.args.get('job') or None,
+            limit=int(request.args.get('limit', 20))
+        )
+        
+        return jsonify({
+            'success': True,
+            'jobs': {name: interval for name, (_, interval) in JOBS.items()},
+            'runs': [dict(
+                run,
+                started_at=run['started_at'].strftime('%Y-%m-%d %H:%M:%S'),
+                finished_at=run['finished_at'].strftime('%Y-%m-%d %H:%M:%S')
+            ) for run in runs]
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error al cargar ejecuciones de tareas: {str(e)}'
+        }), 500
@@ -1,6 +1,8 @@
 from flask import request, jsonify
 from app.services.inventory_service import InventoryService
-from app.routes import main_bp
+from app.routes import main_bp, pagination_payload
+from app.services.pagination import InvalidCursor
+from app.services.inventory_import import read_import_rows, detect_format
 
 @main_bp.route('/api/inventory/items', methods=['GET'])
 def api_get_inventory_items():
@@ -11,26 +13,29 @@ def api_get_inventory_items():
         search = request.args.get('search', '')
         item_type = request.args.get('type', '')
         status = request.args.get('status', '')
+        cursor = request.args.get('cursor')
         
         result = InventoryService.get_all_items(
             page=page,
             per_page=per_page,
             search=search,
             item_type=item_type,
-            status=status
+            status=status,
+            cursor=cursor,
+            count_mode=request.args.get('count', 'window')
         )
         
         return jsonify({
             'success': True,
             'items': result['items'],
-            'pagination': {
-                'page': result['page'],
-                'per_page': result['per_page'],
-                'total_count': result['total_count'],
-                'total_pages': result['total_pages']
-            }
+            'pagination': pagination_payload(result)
         })
 
+    except InvalidCursor as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -83,6 +88,52 @@ def api_create_inventory_item():
             'message': f'Error al crear item: {str(e)}'
         }), 500
 
+@main_bp.route('/api/inventory/items/import', methods=['POST'])
+def api_import_inventory_items():
+    """API endpoint to bulk import inventory items from CSV or JSON"""
+    try:
+        if not request.user or not request.user['is_admin']:
+            return jsonify({
+                'success': False,
+                'message': 'Acceso restringido a administradores'
+            }), 403
+
+        upload = request.files.get('file')
+        if upload:
+            fmt = request.form.get('format') or detect_format(upload.filename, upload.mimetype)
+            stream = upload.stream
+            atomic = request.form.get('atomic') == 'true'
+        else:
+            fmt = request.args.get('format') or detect_format(None, request.mimetype)
+            stream = request.stream
+            atomic = request.args.get('atomic') == 'true'
+        
+        if not fmt:
+            return jsonify({
+                'success': False,
+                'message': 'Formato no reconocido, usa CSV, JSON o JSON Lines'
+            }), 400
+        
+        report = InventoryService.import_items(read_import_rows(stream, fmt), atomic=atomic)
+        success = report['inserted'] > 0 or report['error_count'] == 0
+        
+        return jsonify({
+            'success': success,
+            'message': f"Se importaron {report['inserted']} de {report['total_rows']} items",
+            'report': report
+        }), 200 if success else 400
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': f'Archivo inválido: {str(e)}'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error al importar items: {str(e)}'
+        }), 500
+
 @main_bp.route('/api/inventory/items/<int:item_id>', methods=['GET'])
 def api_get_inventory_item(item_id):
     """API endpoint to get specific inventory item"""
@@ -188,9 +239,8 @@ def api_get_item_types():
     """API endpoint to get available item types"""
     try:
         item_types = [
-            {'value': 'computadora', 'label': 'Computadora'},
-            {'value': 'pantalla', 'label': 'Pantalla'},
-            {'value': 'lentes_vr', 'label': 'Lentes VR'}
+            {'value': value, 'label': label}
+            for value, label in InventoryService.ITEM_TYPES.items()
         ]
         
         return jsonify({
@@ -209,9 +259,8 @@ def api_get_statuses():
     """API endpoint to get available statuses"""
     try:
         statuses = [
-            {'value': 'available', 'label': 'Disponible'},
-            {'value': 'maintenance', 'label': 'En Mantenimiento'},
-            {'value': 'broken', 'label': 'Dañado'}
+            {'value': value, 'label': label}
+            for value, label in InventoryService.STATUSES.items()
         ]
         
         return jsonify({
@@ -1,8 +1,33 @@
 from flask import request, jsonify
-from app.routes import main_bp
+from app.routes import main_bp, pagination_payload
+from app.services.pagination import InvalidCursor
 from app.services.reservation_service import ReservationService
 from app.services.user_service import UserService
 
+STATUS_DISPLAY = {
+    "pending": "Pendiente",
+    "cancelled": "Cancelada",
+    "confirmed": "Confirmada",
+    "expired": "Expirada"
+}
+
+def format_admin_reservation(reservation):
+    """Row of the admin reservations table for a reservation joined with its user"""
+    return {
+        'id': reservation['id'],
+        'user_id': reservation['user_id'],
+        'user_name': reservation['full_name'],
+        'user_email': reservation['email'],
+        'user_username': reservation['username'],
+        'reservation_date': reservation['reservation_date'].strftime('%d-%m-%Y'),
+        'start_time': reservation['start_time'].strftime('%H:%M'),
+        'end_time': reservation['end_time'].strftime('%H:%M'),
+        'status': reservation['status'],
+        'status_display': STATUS_DISPLAY[reservation['status']],
+        'created_at': reservation['created_at'].strftime('%d-%m-%Y'),
+        'avatar_initials': ''.join([name[0].upper() for name in reservation['full_name'].split()[:2]])
+    }
+
 @main_bp.route('/api/admin/reservations', methods=['GET'])
 def api_get_reservations():
     """API endpoint to get reservations with filtering and pagination"""
@@ -12,55 +37,69 @@ def api_get_reservations():
         date_filter = request.args.get('date', '')
         page = int(request.args.get('page', 1))
         per_page = int(request.args.get('per_page', 15))
+        cursor = request.args.get('cursor')
         
         result = ReservationService.get_all_reservations(
             search=search, 
             status=status, 
             date_filter=date_filter,
             page=page, 
-            per_page=per_page
+            per_page=per_page,
+            cursor=cursor,
+            count_mode=request.args.get('count', 'window'),
+            date_from=request.args.get('from') or None,
+            date_to=request.args.get('to') or None,
+            include_history=request.args.get('history') == 'all'
         )
 
-        status_match = {
-            "pending": "Pendiente",
-            "cancelled": "Cancelada",
-            "confirmed": "Confirmada"
-        }
-        
-        formatted_reservations = []
-        for reservation in result['reservations']:
-            formatted_reservations.append({
-                'id': reservation['id'],
-                'user_id': reservation['user_id'],
-                'user_name': reservation['full_name'],
-                'user_email': reservation['email'],
-                'user_username': reservation['username'],
-                'reservation_date': reservation['reservation_date'].strftime('%d-%m-%Y'),
-                'start_time': reservation['start_time'].strftime('%H:%M'),
-                'end_time': reservation['end_time'].strftime('%H:%M'),
-                'status': reservation['status'],
-                'status_display': status_match[reservation['status']],
-                'created_at': reservation['created_at'].strftime('%d-%m-%Y'),
-                'avatar_initials': ''.join([name[0].upper() for name in reservation['full_name'].split()[:2]])
-            })
+        formatted_reservations = [format_admin_reservation(reservation) for reservation in result['reservations']]
         
         return jsonify({
             'success': True,
             'reservations': formatted_reservations,
-            'pagination': {
-                'page': result['page'],
-                'per_page': result['per_page'],
-                'total_count': result['total_count'],
-                'total_pages': result['total_pages']
-            }
+            'pagination': pagination_payload(result)
         })
         
+    except InvalidCursor as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
             'message': f'Error al cargar las reservaciones: {str(e)}'
         }), 500
 
+@main_bp.route('/api/admin/reservations/<int:reservation_id>', methods=['GET'])
+def api_get_reservation(reservation_id):
+    """API endpoint to get one reservation row, used to patch the table in place"""
+    try:
+        if not request.user or not request.user['is_admin']:
+            return jsonify({
+                'success': False,
+                'message': 'Acceso restringido a administradores'
+            }), 403
+        
+        reservation = ReservationService.get_reservation_by_id(reservation_id)
+        
+        if not reservation:
+            return jsonify({
+                'success': False,
+                'message': 'Reservación no encontrada'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'reservation': format_admin_reservation(reservation)
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error al cargar la reservación: {str(e)}'
+        }), 500
+
 @main_bp.route('/api/admin/reservations', methods=['POST'])
 def api_create_reservation():
     """API endpoint to create new reservation"""
@@ -223,10 +262,62 @@ def api_delete_reservation(reservation_id):
             'message': f'Error al eliminar la reservación: {str(e)}'
         }), 500
 
+MAX_PICKER_PAGE_SIZE = 50
+
+@main_bp.route('/api/admin/reservations/users', methods=['GET'])
+def api_get_user_picker():
+    """API endpoint to page through active users for the reservation user picker"""
+    try:
+        if not request.user or not request.user['is_admin']:
+            return jsonify({
+                'success': False,
+                'message': 'Acceso restringido a administradores'
+            }), 403
+        
+        per_page = min(max(int(request.args.get('per_page', 20)), 1), MAX_PICKER_PAGE_SIZE)
+        result = UserService.get_user_picker_page(
+            search=request.args.get('q', ''),
+            cursor=request.args.get('cursor'),
+            per_page=per_page
+        )
+        
+        response = jsonify({
+            'success': True,
+            'users': [{
+                'id': user['id'],
+                'name': user['full_name'],
+                'initials': ''.join([name[0].upper() for name in user['full_name'].split()[:2]])
+            } for user in result['users']],
+            'pagination': pagination_payload(result)
+        })
+        # Pages rarely change; revalidating costs the query but not the payload or re-rendering
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        response.add_etag()
+        return response.make_conditional(request)
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error al cargar los usuarios: {str(e)}'
+        }), 500
+
 @main_bp.route('/api/admin/reservations/users/active', methods=['GET'])
 def api_get_active_users():
-    """API endpoint to get active users for dropdown"""
+    """Legacy API endpoint with every active user, only served with ?legacy=1"""
     try:
+        if request.args.get('legacy') != '1':
+            return jsonify({
+                'success': False,
+                'message': 'La lista completa de usuarios fue reemplazada por /api/admin/reservations/users; '
+                           'use ?legacy=1 para obtenerla'
+            }), 410
+        
         users = UserService.get_active_users()
         formatted_users = [{
             'id': user['id'],
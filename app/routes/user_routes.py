@@ -1,6 +1,7 @@
 from flask import request, jsonify, session, render_template, redirect, url_for
-from app.services.reservation_service import ReservationService
-from app.routes import main_bp
+from app.services.reservation_service import ReservationService, LAB_OPENING_TIME, LAB_CLOSING_TIME
+from app.routes import main_bp, pagination_payload
+from app.services.pagination import InvalidCursor
 from datetime import date
 from app.services.chat_service import ChatService
 
@@ -13,21 +14,9 @@ def user_dashboard():
             return redirect(url_for('main.login'))
         
         upcoming_reservations = ReservationService.get_user_upcoming_reservations(user_id, limit=5)
-        all_reservations_data = ReservationService.get_user_reservations(
-            user_id=user_id, 
-            page=1, 
-            per_page=1000
-        )
-        all_reservations = all_reservations_data['reservations']
+        summary = ReservationService.get_user_reservation_summary(user_id)
         today = date.today().isoformat()
         
-        upcoming_count = len([r for r in all_reservations 
-                            if r['reservation_date'].isoformat() >= today 
-                            and r['status'] in ['confirmed', 'pending']])
-        
-        total_count = len(all_reservations)
-        cancelled_count = len([r for r in all_reservations if r['status'] == 'cancelled'])
-        
         def format_reservation_display(reservation):
             reservation_date = reservation['reservation_date']
             is_today = reservation_date.isoformat() == today
@@ -45,9 +34,9 @@ def user_dashboard():
         upcoming_reservations_formatted = [format_reservation_display(r) for r in upcoming_reservations]
         
         return render_template('user/dashboard.html',
-                           upcoming_count=upcoming_count,
-                           total_count=total_count,
-                           cancelled_count=cancelled_count,
+                           upcoming_count=summary['upcoming_count'],
+                           total_count=summary['total_count'],
+                           cancelled_count=summary['cancelled_count'],
                            upcoming_reservations=upcoming_reservations_formatted)
                            
     except Exception as e:
@@ -133,6 +122,76 @@ def api_create_user_reservation():
             'message': f'Error al crear reservación: {str(e)}'
         }), 500
 
+@main_bp.route('/api/user/reservations/recurring', methods=['POST'])
+def api_create_recurring_reservations():
+    """API endpoint for user to book the same slot on a weekly or biweekly series"""
+    try:
+        user_id = session.get('user_id')
+        if not user_id:
+            return jsonify({
+                'success': False,
+                'message': 'Usuario no autenticado'
+            }), 401
+
+        data = request.get_json()
+
+        if not data:
+            return jsonify({
+                'success': False,
+                'message': 'No se proporcionaron datos'
+            }), 400
+
+        required_fields = ['start_date', 'until_date', 'start_time', 'end_time']
+        for field in required_fields:
+            if not data.get(field):
+                return jsonify({
+                    'success': False,
+                    'message': f'Campo requerido faltante: {field}'
+                }), 400
+
+        results, message = ReservationService.create_recurring_reservations(
+            user_id=user_id,
+            start_date=data['start_date'],
+            until_date=data['until_date'],
+            start_time=data['start_time'],
+            end_time=data['end_time'],
+            frequency=data.get('frequency', 'weekly'),
+            exceptions=data.get('exceptions') or [],
+            atomic=bool(data.get('atomic', False))
+        )
+
+        if results is None:
+            return jsonify({
+                'success': False,
+                'message': message
+            }), 400
+
+        occurrences = [{
+            'reservation_date': result['reservation_date'].strftime('%Y-%m-%d'),
+            'status': result['status'],
+            'reservation_id': result['reservation']['id'] if result['reservation'] else None
+        } for result in results]
+        created = sum(1 for result in results if result['status'] == 'created')
+
+        return jsonify({
+            'success': created > 0,
+            'message': message,
+            'created': created,
+            'conflicts': sum(1 for result in results if result['status'] == 'conflict'),
+            'occurrences': occurrences
+        }), 200 if created else 409
+
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': f'Datos inválidos: {str(e)}'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error al crear reservaciones: {str(e)}'
+        }), 500
+
 @main_bp.route('/api/user/reservations', methods=['GET'])
 def api_get_user_reservations():
     """API endpoint to get user's reservations"""
@@ -148,19 +207,25 @@ def api_get_user_reservations():
         per_page = int(request.args.get('per_page', 15))
         status = request.args.get('status', '')
         date_filter = request.args.get('date', '')
+        cursor = request.args.get('cursor')
         
         result = ReservationService.get_user_reservations(
             user_id=user_id,
             page=page,
             per_page=per_page,
             status=status,
-            date_filter=date_filter
+            date_filter=date_filter,
+            cursor=cursor,
+            date_from=request.args.get('from') or None,
+            date_to=request.args.get('to') or None,
+            include_history=request.args.get('history') == 'all'
         )
 
         status_match = {
             "pending": "Pendiente",
             "cancelled": "Cancelada",
-            "confirmed": "Confirmada"
+            "confirmed": "Confirmada",
+            "expired": "Expirada"
         }
         
         formatted_reservations = []
@@ -178,14 +243,14 @@ def api_get_user_reservations():
         return jsonify({
             'success': True,
             'reservations': formatted_reservations,
-            'pagination': {
-                'page': result['page'],
-                'per_page': result['per_page'],
-                'total_count': result['total_count'],
-                'total_pages': result['total_pages']
-            }
+            'pagination': pagination_payload(result)
         })
         
+    except InvalidCursor as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
@@ -227,6 +292,106 @@ def api_get_user_upcoming_reservations():
             'message': f'Error al cargar próximas reservaciones: {str(e)}'
         }), 500
 
+@main_bp.route('/api/reservations/conflict-check', methods=['GET'])
+def api_check_reservation_conflict():
+    """API endpoint to check whether a time slot is still free"""
+    try:
+        reservation_date = request.args.get('date', '')
+        start_time = request.args.get('start_time', '')
+        end_time = request.args.get('end_time', '')
+        exclude_id = request.args.get('exclude_id', type=int)
+        
+        if not reservation_date or not start_time or not end_time:
+            return jsonify({
+                'success': False,
+                'message': 'Se requieren date, start_time y end_time'
+            }), 400
+        
+        conflict = ReservationService.has_time_conflict(reservation_date, start_time, end_time, exclude_id)
+        
+        return jsonify({
+            'success': True,
+            'available': not conflict
+        })
+        
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error al verificar disponibilidad: {str(e)}'
+        }), 500
+
+@main_bp.route('/api/reservations/availability', methods=['GET'])
+def api_reservation_availability():
+    """API endpoint with the free slots of every day in a date range"""
+    try:
+        date_from = request.args.get('from', '')
+        date_to = request.args.get('to', '') or date_from
+        granularity = request.args.get('granularity', 30, type=int)
+
+        if not date_from:
+            return jsonify({
+                'success': False,
+                'message': 'Se requiere el parámetro from'
+            }), 400
+
+        days = ReservationService.get_availability(date_from, date_to, granularity)
+
+        return jsonify({
+            'success': True,
+            'opening': LAB_OPENING_TIME,
+            'closing': LAB_CLOSING_TIME,
+            'granularity': granularity,
+            'days': days
+        })
+
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': f'Parámetros inválidos: {str(e)}'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error al obtener disponibilidad: {str(e)}'
+        }), 500
+
+@main_bp.route('/api/reservations/calendar', methods=['GET'])
+def api_reservation_calendar():
+    """API endpoint with the active reservations of a date range in columnar form"""
+    try:
+        date_from = request.args.get('from', '')
+        date_to = request.args.get('to', '') or date_from
+
+        if not date_from:
+            return jsonify({
+                'success': False,
+                'message': 'Se requiere el parámetro from'
+            }), 400
+
+        # Only administrators see who booked the other slots
+        user_id = None if request.user['is_admin'] else request.user['id']
+        calendar = ReservationService.get_calendar(date_from, date_to, user_id=user_id)
+
+        response = jsonify({
+            'success': True,
+            'calendar': calendar
+        })
+        response.cache_control.private = True
+        response.cache_control.no_cache = True
+        response.add_etag()
+        return response.make_conditional(request)
+
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': f'Parámetros inválidos: {str(e)}'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error al cargar el calendario: {str(e)}'
+        }), 500
+
 @main_bp.route('/api/user/reservations/<int:reservation_id>/cancel', methods=['PUT'])
 def api_cancel_user_reservation(reservation_id):
     """API endpoint for user to cancel their reservation"""
@@ -1,5 +1,7 @@
 from flask import request, jsonify
-from app.routes import main_bp
+from app.routes import main_bp, pagination_payload
+from app.services.pagination import InvalidCursor
+from app.services.inventory_import import read_import_rows, detect_format
 from app.services.user_service import UserService
 
 @main_bp.route('/api/admin/users', methods=['GET'])
@@ -11,13 +13,16 @@ def api_get_users():
         role = request.args.get('role', '')
         page = int(request.args.get('page', 1))
         per_page = int(request.args.get('per_page', 15))
+        cursor = request.args.get('cursor')
         
         result = UserService.get_all_users(
             search=search, 
             status=status, 
             role=role, 
             page=page, 
-            per_page=per_page
+            per_page=per_page,
+            cursor=cursor,
+            count_mode=request.args.get('count', 'window')
         )
 
         formatted_users = []
@@ -38,20 +43,62 @@ def api_get_users():
         return jsonify({
             'success': True,
             'users': formatted_users,
-            'pagination': {
-                'page': result['page'],
-                'per_page': result['per_page'],
-                'total_count': result['total_count'],
-                'total_pages': result['total_pages']
-            }
+            'pagination': pagination_payload(result)
         })
         
+    except InvalidCursor as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         return jsonify({
             'success': False,
             'message': f'Error al cargar los usuarios: {str(e)}'
         }), 500
 
+MAX_SEARCH_RESULTS = 50
+
+@main_bp.route('/api/admin/users/search', methods=['GET'])
+def api_search_users():
+    """API endpoint for ranked user type-ahead"""
+    try:
+        if not request.user or not request.user['is_admin']:
+            return jsonify({
+                'success': False,
+                'message': 'Acceso restringido a administradores'
+            }), 403
+        
+        limit = min(max(int(request.args.get('limit', 10)), 1), MAX_SEARCH_RESULTS)
+        users = UserService.search_users(
+            request.args.get('q', ''),
+            limit=limit,
+            active_only=request.args.get('active') == '1'
+        )
+        
+        return jsonify({
+            'success': True,
+            'users': [{
+                'id': user['id'],
+                'username': user['username'],
+                'email': user['email'],
+                'full_name': user['full_name'],
+                'status': 'active' if user['is_active'] else 'inactive',
+                'avatar_initials': ''.join([name[0].upper() for name in user['full_name'].split()[:2]])
+            } for user in users]
+        })
+        
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'message': 'Parámetro limit inválido'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error al buscar usuarios: {str(e)}'
+        }), 500
+
 @main_bp.route('/api/admin/users', methods=['POST'])
 def api_create_user():
     """API endpoint to create new user"""
@@ -115,6 +162,52 @@ def api_create_user():
             'message': f'Error al crear el usuario: {str(e)}'
         }), 500
 
+@main_bp.route('/api/admin/users/import', methods=['POST'])
+def api_provision_users():
+    """API endpoint to create student accounts in bulk from a CSV roster"""
+    try:
+        if not request.user or not request.user['is_admin']:
+            return jsonify({
+                'success': False,
+                'message': 'Acceso restringido a administradores'
+            }), 403
+        
+        upload = request.files.get('file')
+        if upload:
+            fmt = request.form.get('format') or detect_format(upload.filename, upload.mimetype)
+            stream = upload.stream
+            dry_run = request.form.get('dry_run') == 'true'
+        else:
+            fmt = request.args.get('format') or detect_format(None, request.mimetype)
+            stream = request.stream
+            dry_run = request.args.get('dry_run') == 'true'
+        
+        if not fmt:
+            return jsonify({
+                'success': False,
+                'message': 'Formato no reconocido, usa CSV, JSON o JSON Lines'
+            }), 400
+        
+        report = UserService.provision_users(read_import_rows(stream, fmt), dry_run=dry_run)
+        success = report['created'] > 0 or dry_run or report['error_count'] == 0
+        
+        return jsonify({
+            'success': success,
+            'message': f"Se crearon {report['created']} de {report['total_rows']} usuarios",
+            'report': report
+        }), 200 if success else 400
+        
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': f'Archivo inválido: {str(e)}'
+        }), 400
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'message': f'Error al importar usuarios: {str(e)}'
+        }), 500
+
 @main_bp.route('/api/admin/users/<int:user_id>', methods=['PUT'])
 def api_update_user(user_id):
     """API endpoint to update user"""
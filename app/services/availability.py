@@ -0,0 +1,42 @@
+from app.services.reservation_index import to_minutes
+
+
+def merge_intervals(intervals):
+    """Sweep sorted (start, end) minute pairs into disjoint busy blocks"""
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def free_slots(busy, opening, closing, granularity):
+    """Free [start, end) minute ranges between busy blocks, snapped to the granularity grid"""
+    slots = []
+    cursor = opening
+    for start, end in busy + [[closing, closing]]:
+        gap_start = cursor + (-(cursor - opening) % granularity)
+        gap_end = min(start, closing)
+        gap_end -= (gap_end - opening) % granularity
+        if gap_end - gap_start >= granularity:
+            slots.append((gap_start, gap_end))
+        cursor = max(cursor, end)
+        if cursor >= closing:
+            break
+    return slots
+
+
+def format_minutes(minutes):
+    minutes = int(minutes)
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def busy_by_date(rows):
+    """Group (reservation_date, start_time, end_time) rows into merged busy blocks per date"""
+    grouped = {}
+    for reservation_date, start_time, end_time in rows:
+        grouped.setdefault(reservation_date, []).append((to_minutes(start_time), to_minutes(end_time)))
+    return {reservation_date: merge_intervals(intervals) for reservation_date, intervals in grouped.items()}
@@ -0,0 +1,120 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after ttl seconds"""
+
+    def __init__(self, ttl, max_size=1024):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, default=None):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses
+            }
+
+
+class VersionCache:
+    """Latest known version per key, trusted for max_age seconds after it was read
+
+    A lookup that finds its key stale re-reads it together with every other
+    stale key in one loader call, so busy workers refresh all their users
+    in a single query per max_age instead of one query per user.
+    """
+
+    def __init__(self, loader, max_age, max_size=4096, batch_size=500):
+        self.loader = loader  # list of keys -> {key: version} for the keys that still exist
+        self.max_age = max_age
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (checked_at, version)
+        self.hits = 0
+        self.refreshes = 0
+
+    def get(self, key):
+        """Version for key, or None when the loader no longer knows it"""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[0] < self.max_age:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            # Most recently used stale keys first; the requested one is always included
+            stale = [key]
+            for other, (checked_at, _) in reversed(self._entries.items()):
+                if len(stale) >= self.batch_size:
+                    break
+                if other != key and now - checked_at >= self.max_age:
+                    stale.append(other)
+            self.refreshes += 1
+
+        versions = self.loader(stale)
+        with self._lock:
+            for stale_key in stale:
+                if stale_key in versions:
+                    self._store(stale_key, versions[stale_key], now)
+                else:
+                    self._entries.pop(stale_key, None)
+        return versions.get(key)
+
+    def set(self, key, version):
+        with self._lock:
+            self._store(key, version, time.monotonic())
+
+    def _store(self, key, version, checked_at):
+        self._entries[key] = (checked_at, version)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'max_age': self.max_age,
+                'hits': self.hits,
+                'refreshes': self.refreshes
+            }
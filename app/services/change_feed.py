@@ -0,0 +1,254 @@
+import itertools
+import json
+import logging
+import os
+import queue
+import select
+import threading
+import time
+from collections import deque
+import psycopg2
+from app.database import db
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'change_feed'
+TOPICS = ('reservations', 'inventory')
+
+# 'local' keeps events in-process: free, but a stream only sees writes made by its own worker.
+# 'postgres' fans them out to every worker through LISTEN/NOTIFY, at the cost of one extra
+# SELECT pg_notify round trip on the primary for every reservation and inventory write, streams
+# open or not; use it when several worker processes serve the admin pages
+CHANGE_FEED_BACKEND = os.environ.get('CHANGE_FEED_BACKEND', 'local').lower()
+CHANGE_FEED_MAX_STREAMS = int(os.environ.get('CHANGE_FEED_MAX_STREAMS', 20))
+CHANGE_FEED_STREAM_SECONDS = float(os.environ.get('CHANGE_FEED_STREAM_SECONDS', 300))
+CHANGE_FEED_HEARTBEAT_SECONDS = float(os.environ.get('CHANGE_FEED_HEARTBEAT_SECONDS', 15))
+
+
+class TooManyStreams(Exception):
+    """Raised when a worker already serves its maximum number of streams"""
+
+
+class Subscription:
+    """One open stream: a bounded queue of events for the topics it asked for"""
+
+    def __init__(self, topics, queue_size):
+        self.topics = frozenset(topics)
+        self.queue = queue.Queue(maxsize=queue_size)
+        # Set when the queue overflowed; the client has to reload instead of applying diffs
+        self.lagged = False
+
+    def offer(self, event):
+        if event['topic'] not in self.topics and event['topic'] != '*':
+            return
+        try:
+            self.queue.put_nowait(event)
+        except queue.Full:
+            self.lagged = True
+
+    def get(self, timeout):
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class ChangeBroker:
+    """Process-local fan-out of change events to the open SSE streams
+
+    Recent events are kept in a ring buffer with increasing ids so a
+    reconnecting client can resume from its Last-Event-ID.
+    """
+
+    def __init__(self, max_streams=20, queue_size=200, history_size=500):
+        self.max_streams = max_streams
+        self.queue_size = queue_size
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+        self._history = deque(maxlen=history_size)
+        self._ids = itertools.count(1)
+        self._started = int(time.time())
+        self.published = 0
+        self.rejected_streams = 0
+
+    def _stream_token(self):
+        # Ids are only meaningful within one worker process; forks get their own token
+        return f"{os.getpid():x}.{self._started:x}"
+
+    def subscribe(self, topics, last_event_id=None):
+        """Open a subscription, replaying missed events when last_event_id is still buffered"""
+        subscription = Subscription(topics, self.queue_size)
+        with self._lock:
+            if len(self._subscriptions) >= self.max_streams:
+                self.rejected_streams += 1
+                raise TooManyStreams()
+            if last_event_id:
+                token, _, number = last_event_id.rpartition('-')
+                if token != self._stream_token() or not number.isdigit():
+                    # Resumed on another worker or after a restart: the gap is unknown
+                    subscription.lagged = True
+                else:
+                    seen = int(number)
+                    if self._history and seen < self._history[0]['seq'] - 1:
+                        subscription.lagged = True
+                    for event in self._history:
+                        if event['seq'] > seen:
+                            subscription.offer(event)
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, event):
+        with self._lock:
+            seq = next(self._ids)
+            event = dict(event, seq=seq, id=f"{self._stream_token()}-{seq}")
+            self._history.append(event)
+            self.published += 1
+            for subscription in self._subscriptions:
+                subscription.offer(event)
+        return event
+
+    def stats(self):
+        with self._lock:
+            return {
+                'streams': len(self._subscriptions),
+                'max_streams': self.max_streams,
+                'published': self.published,
+                'rejected_streams': self.rejected_streams,
+                'buffered': len(self._history)
+            }
+
+
+class ChangeListener:
+    """Background thread that LISTENs on one channel and hands each payload to handler
+
+    It uses its own autocommit connection outside the pool and is started
+    lazily on first use in each worker process. on_reconnect runs after a
+    lost connection is re-established, since notifications sent in
+    between are gone.
+    """
+
+    def __init__(self, channel, handler, on_reconnect=None, reconnect_delay=5):
+        self.channel = channel
+        self.handler = handler
+        self.on_reconnect = on_reconnect
+        self.reconnect_delay = reconnect_delay
+        self._lock = threading.Lock()
+        self._thread = None
+        self._pid = None
+        self._stop = threading.Event()
+
+    def ensure_started(self):
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            # A forked worker inherits the object but not the thread
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._stop.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='change-feed-listener', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        connected_before = False
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = psycopg2.connect(**db.conn_params)
+                conn.autocommit = True
+                with conn.cursor() as cursor:
+                    cursor.execute(f"LISTEN {self.channel}")
+                if connected_before and self.on_reconnect is not None:
+                    self.on_reconnect()
+                connected_before = True
+                while not self._stop.is_set():
+                    if select.select([conn], [], [], 5) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        notify = conn.notifies.pop(0)
+                        try:
+                            self.handler(notify.payload)
+                        except ValueError:
+                            logger.warning("Ignoring malformed notification on %s: %s", self.channel, notify.payload)
+            except Exception:
+                logger.exception("Change feed listener failed, reconnecting")
+                self._stop.wait(self.reconnect_delay)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except psycopg2.Error:
+                        pass
+
+
+class ChangeFeed:
+    """Publishes committed changes from the service write paths to open streams
+
+    Events only carry the topic, the action and the row id; clients fetch
+    the single row they need instead of re-querying whole lists.
+    """
+
+    def __init__(self, backend=CHANGE_FEED_BACKEND, max_streams=CHANGE_FEED_MAX_STREAMS):
+        self.backend = backend
+        self.broker = ChangeBroker(max_streams=max_streams)
+        self.listener = ChangeListener(
+            CHANNEL,
+            lambda payload: self.broker.publish(json.loads(payload)),
+            # Notifications sent while disconnected are lost; tell clients to reload
+            on_reconnect=lambda: self.broker.publish({'topic': '*', 'action': 'reset'})
+        ) if backend == 'postgres' else None
+
+    def publish(self, topic, action, record_id=None, **extra):
+        """Announce a change once the current unit of work commits"""
+        event = dict(extra, topic=topic, action=action, record_id=record_id)
+        if self.listener is not None:
+            # NOTIFY is transactional: it is delivered on commit and dropped on rollback.
+            # This is the extra round trip per write that the postgres backend costs
+            with db.get_cursor() as cursor:
+                cursor.execute("SELECT pg_notify(%s, %s)", (CHANNEL, json.dumps(event, default=str)))
+        else:
+            db.on_commit(lambda: self.broker.publish(event))
+
+    def subscribe(self, topics, last_event_id=None):
+        if self.listener is not None:
+            self.listener.ensure_started()
+        return self.broker.subscribe(topics, last_event_id)
+
+    def unsubscribe(self, subscription):
+        self.broker.unsubscribe(subscription)
+
+    def stream(self, subscription, max_seconds=CHANGE_FEED_STREAM_SECONDS,
+               heartbeat=CHANGE_FEED_HEARTBEAT_SECONDS):
+        """Yield SSE frames until max_seconds pass; the browser then reconnects with Last-Event-ID"""
+        deadline = time.monotonic() + max_seconds
+        try:
+            yield f"retry: {int(heartbeat * 1000)}\n\n"
+            while True:
+                if subscription.lagged:
+                    subscription.lagged = False
+                    yield "event: reset\ndata: {}\n\n"
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                event = subscription.get(timeout=min(heartbeat, remaining))
+                if event is None:
+                    yield ": keepalive\n\n"
+                    continue
+                name = 'reset' if event['action'] == 'reset' else 'change'
+                yield f"id: {event['id']}\nevent: {name}\ndata: {json.dumps(event, default=str)}\n\n"
+        finally:
+            self.unsubscribe(subscription)
+
+    def stats(self):
+        return dict(self.broker.stats(), backend=self.backend)
+
+
+change_feed = ChangeFeed()
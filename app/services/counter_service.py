@@ -0,0 +1,63 @@
+from app.database import db
+
+
+class CounterService:
+    """Dashboard counters kept current by the triggers of migration 0006
+
+    Counter names are 'scope:key' (e.g. 'reservations:pending'); each one is
+    spread over a few shard rows that are summed on read.
+    """
+
+    @staticmethod
+    @db.read_only
+    def get_counters(scope=None):
+        """Get non-zero counters as {scope: {key: value}}, or {key: value} for one scope"""
+        query = "SELECT name, SUM(value)::bigint AS value FROM dashboard_counters"
+        params = []
+        if scope:
+            query += " WHERE name LIKE %s"
+            params.append(f"{scope}:%")
+        query += " GROUP BY name"
+
+        with db.get_cursor() as cursor:
+            cursor.execute(query, params)
+            counters = {}
+            for row in cursor.fetchall():
+                if row['value']:
+                    counter_scope, key = row['name'].split(':', 1)
+                    counters.setdefault(counter_scope, {})[key] = row['value']
+        return counters.get(scope, {}) if scope else counters
+
+    @staticmethod
+    def check_consistency():
+        """Compare the counters with real counts; returns {name: (counter, actual)} for every mismatch"""
+        with db.get_cursor() as cursor:
+            cursor.execute("""
+                SELECT COALESCE(c.name, t.name) AS name,
+                    COALESCE(c.value, 0) AS counter, COALESCE(t.value, 0) AS actual
+                FROM (SELECT name, SUM(value)::bigint AS value FROM dashboard_counters GROUP BY name) c
+                FULL JOIN dashboard_counter_totals() t ON t.name = c.name
+                WHERE COALESCE(c.value, 0) <> COALESCE(t.value, 0)
+                ORDER BY 1
+            """)
+            return {row['name']: (row['counter'], row['actual']) for row in cursor.fetchall()}
+
+    @staticmethod
+    def reconcile():
+        """Rewrite the counters from real counts and collapse their shards
+
+        The counted tables are locked against writes (reads go on) for the
+        duration, so no trigger delta can slip in between count and rewrite.
+        Returns the drift that was corrected, as check_consistency does.
+        """
+        with db.transaction():
+            with db.get_cursor() as cursor:
+                cursor.execute("LOCK TABLE users, reservations, inventory_items IN SHARE MODE")
+            drift = CounterService.check_consistency()
+            with db.get_cursor() as cursor:
+                cursor.execute("DELETE FROM dashboard_counters")
+                cursor.execute("""
+                    INSERT INTO dashboard_counters (name, value)
+                    SELECT name, value FROM dashboard_counter_totals()
+                """)
+        return drift
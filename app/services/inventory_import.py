@@ -0,0 +1,80 @@
+import codecs
+import csv
+import json
+
+IMPORT_FIELDS = ('identificador', 'item_type', 'brand', 'model', 'status')
+MAX_REPORTED_ERRORS = 1000
+
+
+def read_import_rows(stream, fmt):
+    """Yield (row_number, row) pairs from a binary CSV, JSON array or JSON Lines stream"""
+    if fmt == 'csv':
+        text = codecs.getreader('utf-8-sig')(stream)
+        reader = csv.DictReader(text)
+        try:
+            # Row 1 is the header, so data rows start at 2 like in a spreadsheet
+            for row_number, row in enumerate(reader, start=2):
+                yield row_number, row
+        except csv.Error as e:
+            raise ValueError(f"CSV inválido: {e}")
+    elif fmt == 'jsonl':
+        text = codecs.getreader('utf-8-sig')(stream)
+        for row_number, line in enumerate(text, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield row_number, json.loads(line)
+            except ValueError:
+                yield row_number, None
+    elif fmt == 'json':
+        data = json.load(codecs.getreader('utf-8-sig')(stream))
+        if isinstance(data, dict):
+            data = data.get('items', [])
+        if not isinstance(data, list):
+            raise ValueError("El JSON debe ser una lista de items")
+        for row_number, row in enumerate(data, start=1):
+            yield row_number, row
+    else:
+        raise ValueError(f"Formato no soportado: {fmt}")
+
+
+def detect_format(filename, content_type=None):
+    """Guess the import format from a file name or content type"""
+    name = (filename or '').lower()
+    if name.endswith('.csv') or content_type == 'text/csv':
+        return 'csv'
+    if name.endswith(('.jsonl', '.ndjson')) or content_type == 'application/x-ndjson':
+        return 'jsonl'
+    if name.endswith('.json') or content_type == 'application/json':
+        return 'json'
+    return None
+
+
+def validate_import_row(row, item_types, statuses):
+    """Return (values, None) for a valid row or (None, message) for an invalid one"""
+    if not isinstance(row, dict):
+        return None, "Fila con formato inválido"
+
+    values = {}
+    for field in IMPORT_FIELDS:
+        value = row.get(field)
+        if isinstance(value, str):
+            value = value.strip()
+        values[field] = value if value not in ('', None) else None
+
+    if not values['identificador']:
+        return None, "Campo requerido faltante: identificador"
+    if not values['item_type']:
+        return None, "Campo requerido faltante: item_type"
+    if values['item_type'] not in item_types:
+        return None, f"Tipo de item inválido: {values['item_type']}"
+
+    values['status'] = values['status'] or 'available'
+    if values['status'] not in statuses:
+        return None, f"Estado inválido: {values['status']}"
+
+    for field in ('brand', 'model'):
+        if values[field] is not None and len(str(values[field])) > 100:
+            return None, f"El campo {field} excede 100 caracteres"
+
+    return tuple(str(values[field]) if values[field] is not None else None for field in IMPORT_FIELDS), None
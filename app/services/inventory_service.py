@@ -1,11 +1,34 @@
 from app.database import db
+from app.services.counter_service import CounterService
+from app.services.change_feed import change_feed
+import psycopg2.extras
+from app.services.inventory_import import IMPORT_FIELDS, MAX_REPORTED_ERRORS, validate_import_row
+from app.services.pagination import fetch_keyset_page, fetch_offset_page, make_count_cache
+
+_count_cache = make_count_cache()
+
+class _ImportRejected(Exception):
+    """Aborts an atomic import that found invalid rows"""
 
 class InventoryService:
+
+    ITEM_TYPES = {
+        'computadora': 'Computadora',
+        'pantalla': 'Pantalla',
+        'lentes_vr': 'Lentes VR'
+    }
+    STATUSES = {
+        'available': 'Disponible',
+        'maintenance': 'En Mantenimiento',
+        'broken': 'Dañado'
+    }
     
     @staticmethod
     @staticmethod
-    def get_all_items(page=1, per_page=15, search=None, item_type=None, status=None):
-        """Get all inventory items with pagination and filtering"""
+    @db.read_only
+    def get_all_items(page=1, per_page=15, search=None, item_type=None, status=None, cursor=None,
+                      count_mode='window'):
+        """Get all inventory items with pagination and filtering (keyset when cursor is given)"""
         query = "SELECT * FROM inventory_items WHERE 1=1"
         count_query = "SELECT COUNT(*) FROM inventory_items WHERE 1=1"
         params = []
@@ -25,28 +48,28 @@ class InventoryService:
             count_query += " AND status = %s"
             params.append(status)
         
-        query += " ORDER BY created_at DESC"
-        
-        offset = (page - 1) * per_page
-        query += " LIMIT %s OFFSET %s"
-        params.extend([per_page, offset])
-        
-        with db.get_cursor() as cursor:
-            cursor.execute(count_query, params[:len(params)-2])
-            total_count = cursor.fetchone()[0]
-            
-            cursor.execute(query, params)
-            items = cursor.fetchall()
-            
+        if cursor is not None:
+            items, next_cursor, has_more = fetch_keyset_page(
+                'inventory_keyset', query, params, ['created_at', 'id'], ['created_at', 'id'],
+                cursor, per_page, descending=True
+            )
             return {
-                'items': [dict(item) for item in items],
-                'total_count': total_count,
-                'page': page,
+                'items': items,
                 'per_page': per_page,
-                'total_pages': (total_count + per_page - 1) // per_page
+                'next_cursor': next_cursor,
+                'has_more': has_more
             }
+        
+        result = fetch_offset_page(
+            'inventory_page', query, count_query, params, 'created_at DESC', page, per_page,
+            count_cache=_count_cache,
+            estimate_table='inventory_items' if count_mode == 'estimate' and not params else None
+        )
+        result['items'] = result.pop('rows')
+        return result
     
     @staticmethod
+    @db.read_only
     def get_item_by_id(item_id):
         """Get inventory item by ID"""
         with db.get_cursor() as cursor:
@@ -66,8 +89,64 @@ class InventoryService:
                 RETURNING *
             """, (identificador, item_type, brand, model, status))
             item = cursor.fetchone()
-            return dict(item) if item else None
+        _count_cache.clear()
+        if item:
+            change_feed.publish('inventory', 'created', item['id'])
+        return dict(item) if item else None
     
+    @staticmethod
+    def import_items(rows, batch_size=1000, atomic=False):
+        """Validate (row_number, row) pairs in one pass and insert them in batches
+
+        Every batch is a multi-row INSERT inside a single transaction. Invalid
+        rows are reported and skipped, or abort the whole import when atomic.
+        """
+        report = {'total_rows': 0, 'inserted': 0, 'error_count': 0, 'errors': [], 'rolled_back': False}
+        batch = []
+
+        def flush(cursor):
+            psycopg2.extras.execute_values(cursor, f"""
+                INSERT INTO inventory_items ({', '.join(IMPORT_FIELDS)})
+                VALUES %s
+            """, batch, page_size=batch_size)
+            report['inserted'] += len(batch)
+            batch.clear()
+
+        try:
+            with db.transaction():
+                with db.get_cursor() as cursor:
+                    for row_number, row in rows:
+                        report['total_rows'] += 1
+                        values, error = validate_import_row(
+                            row, InventoryService.ITEM_TYPES, InventoryService.STATUSES
+                        )
+                        if error:
+                            report['error_count'] += 1
+                            if len(report['errors']) < MAX_REPORTED_ERRORS:
+                                report['errors'].append({'row': row_number, 'message': error})
+                            continue
+                        if atomic and report['error_count']:
+                            continue
+
+                        batch.append(values)
+                        if len(batch) >= batch_size:
+                            flush(cursor)
+
+                    if atomic and report['error_count']:
+                        # Raising rolls back the batches flushed before the first error
+                        raise _ImportRejected()
+                    if batch:
+                        flush(cursor)
+        except _ImportRejected:
+            report['inserted'] = 0
+            report['rolled_back'] = True
+            return report
+
+        _count_cache.clear()
+        if report['inserted']:
+            change_feed.publish('inventory', 'created', count=report['inserted'])
+        return report
+
     @staticmethod
     def update_item(item_id, **kwargs):
         """Update inventory item"""
@@ -93,7 +172,10 @@ class InventoryService:
                 RETURNING *
             """, params)
             item = cursor.fetchone()
-            return dict(item) if item else None
+        _count_cache.clear()
+        if item:
+            change_feed.publish('inventory', 'updated', item['id'])
+        return dict(item) if item else None
     
     @staticmethod
     def delete_item(item_id):
@@ -105,43 +187,37 @@ class InventoryService:
                 RETURNING id
             """, (item_id,))
             deleted = cursor.fetchone()
-            return bool(deleted)
+        _count_cache.clear()
+        if deleted:
+            change_feed.publish('inventory', 'deleted', item_id)
+        return bool(deleted)
     
     @staticmethod
+    @db.read_only
     def get_items_by_type(item_type, page=1, per_page=15):
         """Get inventory items by type with pagination"""
         return InventoryService.get_all_items(page=page, per_page=per_page, item_type=item_type)
 
     @staticmethod
+    @db.read_only
     def get_items_by_status(status, page=1, per_page=15):
         """Get inventory items by status with pagination"""
         return InventoryService.get_all_items(page=page, per_page=per_page, status=status)
 
     @staticmethod
+    @db.read_only
     def get_available_items(page=1, per_page=15):
         """Get all available inventory items with pagination"""
         return InventoryService.get_all_items(page=page, per_page=per_page, status='available')
     
     @staticmethod
+    @db.read_only
     def get_item_types_count():
         """Get count of items by type"""
-        with db.get_cursor() as cursor:
-            cursor.execute("""
-                SELECT item_type, COUNT(*) as count
-                FROM inventory_items
-                GROUP BY item_type
-            """)
-            result = cursor.fetchall()
-            return {row['item_type']: row['count'] for row in result}
+        return CounterService.get_counters('inventory_type')
     
     @staticmethod
+    @db.read_only
     def get_status_count():
         """Get count of items by status"""
-        with db.get_cursor() as cursor:
-            cursor.execute("""
-                SELECT status, COUNT(*) as count
-                FROM inventory_items
-                GROUP BY status
-            """)
-            result = cursor.fetchall()
-            return {row['status']: row['count'] for row in result}
+        return CounterService.get_counters('inventory_status')
@@ -0,0 +1,158 @@
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from app.database import db
+from app.services.reservation_partitions import ReservationPartitionService
+from app.services.reservation_service import ReservationService
+
+logger = logging.getLogger(__name__)
+
+# First key of the two-key advisory locks taken per job name (the migration lock is 7253801)
+JOB_LOCK_CLASS = 7253802
+
+# name -> (callable returning the number of rows affected, seconds between runs)
+JOBS = {
+    'expire_pending_reservations': (
+        ReservationService.expire_pending_reservations,
+        int(os.environ.get('JOB_EXPIRE_PENDING_INTERVAL', 900))
+    ),
+    'ensure_reservation_partitions': (
+        lambda: len(ReservationPartitionService.ensure_partitions()),
+        int(os.environ.get('JOB_ENSURE_PARTITIONS_INTERVAL', 86400))
+    ),
+}
+
+
+class JobService:
+
+    @staticmethod
+    def run(name, force=False):
+        """Run one job unless another worker holds its lock or, without force, it is not due yet
+
+        Returns the recorded run, or None when the job was skipped.
+        """
+        func, interval = JOBS[name]
+        with db.get_connection() as conn:
+            # Autocommit keeps the lock connection from idling inside a transaction
+            conn.autocommit = True
+            try:
+                with conn.cursor() as cursor:
+                    cursor.execute("SELECT pg_try_advisory_lock(%s, hashtext(%s))", (JOB_LOCK_CLASS, name))
+                    if not cursor.fetchone()[0]:
+                        return None
+                try:
+                    if not force:
+                        with conn.cursor() as cursor:
+                            cursor.execute("""
+                                SELECT EXTRACT(EPOCH FROM (CURRENT_TIMESTAMP - MAX(finished_at)))
+                                FROM job_runs
+                                WHERE job_name = %s AND status = 'success'
+                            """, (name,))
+                            since_last = cursor.fetchone()[0]
+                        if since_last is not None and since_last < interval:
+                            return None
+
+                    run = {'job_name': name, 'started_at': datetime.now(), 'rows_affected': None, 'message': None}
+                    started = time.perf_counter()
+                    try:
+                        run['rows_affected'] = func()
+                        run['status'] = 'success'
+                    except Exception as e:
+                        logger.exception("Job %s failed", name)
+                        run['status'] = 'failed'
+                        run['message'] = str(e)
+                    run['duration_ms'] = int((time.perf_counter() - started) * 1000)
+
+                    with conn.cursor() as cursor:
+                        cursor.execute("""
+                            INSERT INTO job_runs (job_name, status, rows_affected, message, started_at, duration_ms)
+                            VALUES (%s, %s, %s, %s, %s, %s)
+                        """, (name, run['status'], run['rows_affected'], run['message'],
+                              run['started_at'], run['duration_ms']))
+                    return run
+                finally:
+                    with conn.cursor() as cursor:
+                        cursor.execute("SELECT pg_advisory_unlock(%s, hashtext(%s))", (JOB_LOCK_CLASS, name))
+            finally:
+                conn.autocommit = False
+
+    @staticmethod
+    def run_due():
+        """Run every job that is due; returns the runs that happened"""
+        runs = []
+        for name in JOBS:
+            run = JobService.run(name)
+            if run:
+                runs.append(run)
+        return runs
+
+    @staticmethod
+    def get_recent_runs(job_name=None, limit=20):
+        """Get the latest recorded runs, newest first"""
+        query = """
+            SELECT id, job_name, status, rows_affected, message, started_at, finished_at, duration_ms
+            FROM job_runs
+        """
+        params = []
+        if job_name:
+            query += " WHERE job_name = %s"
+            params.append(job_name)
+        query += " ORDER BY finished_at DESC LIMIT %s"
+        params.append(limit)
+
+        with db.get_cursor() as cursor:
+            cursor.execute(query, params)
+            return [dict(row) for row in cursor.fetchall()]
+
+
+class JobScheduler:
+    """Daemon thread that calls JobService.run_due every `tick` seconds
+
+    Each worker process may start one; the advisory locks and the last-run
+    check in job_runs make sure a due job runs once across all of them.
+    """
+
+    def __init__(self, tick=60):
+        self.tick = tick
+        self._thread = None
+        self._pid = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def init_app(self, app):
+        if not app.config.get('JOBS_ENABLED'):
+            return
+
+        # Started lazily so forked workers each get their own thread
+        @app.before_request
+        def start_job_scheduler():
+            self.start()
+
+    def start(self):
+        with self._lock:
+            if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return
+            self._pid = os.getpid()
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._loop, name='job-scheduler', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def join(self):
+        if self._thread is not None:
+            self._thread.join()
+
+    def _loop(self):
+        while not self._stop.is_set():
+            try:
+                JobService.run_due()
+            except Exception:
+                logger.exception("Job scheduler tick failed")
+            self._stop.wait(self.tick)
+
+
+scheduler = JobScheduler(tick=int(os.environ.get('JOB_SCHEDULER_TICK', 60)))
@@ -0,0 +1,148 @@
+import base64
+import binascii
+import json
+import os
+import re
+from app.database import db, statement_name
+from app.services.cache import TTLCache
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def encode_cursor(values):
+    """Encode sort key values into an opaque URL-safe cursor"""
+    payload = json.dumps(
+        [value.isoformat() if hasattr(value, 'isoformat') else value for value in values],
+        separators=(',', ':')
+    )
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor, size):
+    """Decode a cursor produced by encode_cursor, checking it has size values"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, binascii.Error, UnicodeError):
+        raise InvalidCursor("Cursor de paginación inválido")
+
+    if not isinstance(values, list) or len(values) != size:
+        raise InvalidCursor("Cursor de paginación inválido")
+    for value in values:
+        if isinstance(value, bool) or not isinstance(value, (str, int, float)):
+            raise InvalidCursor("Cursor de paginación inválido")
+    return values
+
+
+def fetch_keyset_page(name, query, params, sort_columns, row_keys, cursor, per_page, descending=False):
+    """Run a filtered query (ending in its WHERE clause) as one keyset page"""
+    params = list(params)
+    if cursor:
+        values = decode_cursor(cursor, len(sort_columns))
+        operator = '<' if descending else '>'
+        query += f" AND ({', '.join(sort_columns)}) {operator} ({', '.join(['%s'] * len(values))})"
+        params.extend(values)
+
+    direction = ' DESC' if descending else ''
+    query += " ORDER BY " + ', '.join(column + direction for column in sort_columns)
+    query += " LIMIT %s"
+    params.append(per_page + 1)  # One extra row tells us whether another page exists
+
+    with db.get_cursor() as db_cursor:
+        db.prepared.execute(db_cursor, statement_name(name, query), query, params)
+        rows = [dict(row) for row in db_cursor.fetchall()]
+
+    has_more = len(rows) > per_page
+    rows = rows[:per_page]
+    next_cursor = encode_cursor([rows[-1][key] for key in row_keys]) if has_more else None
+    return rows, next_cursor, has_more
+
+
+_FIRST_FROM = re.compile(r"\bFROM\b", re.IGNORECASE)
+
+
+def _estimated_count(table):
+    """Row estimate from planner statistics, or None when the table was never analyzed"""
+    with db.get_cursor() as db_cursor:
+        # A partitioned table has no statistics of its own; add up its partitions
+        db_cursor.execute("""
+            SELECT SUM(GREATEST(reltuples, 0))::bigint
+            FROM pg_class
+            WHERE oid = to_regclass(%s)
+            OR oid IN (SELECT inhrelid FROM pg_inherits WHERE inhparent = to_regclass(%s))
+        """, (table, table))
+        row = db_cursor.fetchone()
+    if row is None or row[0] is None or row[0] <= 0:
+        return None
+    return row[0]
+
+
+def _planned_rows(query, params):
+    """Planner's row estimate for a filtered query, or None when it has none"""
+    with db.get_cursor() as db_cursor:
+        db_cursor.execute("EXPLAIN (FORMAT JSON) " + query, params)
+        row = db_cursor.fetchone()
+    plan = row[0] if row else None
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    rows = plan[0]['Plan'].get('Plan Rows') if plan else None
+    return int(rows) if rows else None
+
+
+def fetch_offset_page(name, query, count_query, params, order_by, page, per_page,
+                      count_cache=None, estimate_table=None):
+    """Fetch one offset page together with its total count
+
+    The total comes from the count cache, a planner estimate or a
+    COUNT(*) OVER() window on the page query itself, so a listing costs a
+    single round trip instead of COUNT plus SELECT. With estimate_table the
+    estimate is that table's statistics for an unfiltered listing and the
+    planner's row estimate for the filtered query otherwise.
+    """
+    params = list(params)
+    # The filters live in the SQL as much as in the values: '= %s' and '>= %s' must not share a total
+    cache_key = (statement_name(name, count_query), tuple(params))
+    estimated = False
+
+    total_count = count_cache.get(cache_key) if count_cache is not None else None
+    if total_count is None and estimate_table:
+        total_count = _planned_rows(query, params) if params else _estimated_count(estimate_table)
+        estimated = total_count is not None
+
+    offset = (page - 1) * per_page
+    if total_count is None:
+        query = _FIRST_FROM.sub(", COUNT(*) OVER() AS _total_count FROM", query, count=1)
+    query += f" ORDER BY {order_by} LIMIT %s OFFSET %s"
+
+    with db.get_cursor() as db_cursor:
+        db.prepared.execute(db_cursor, statement_name(name, query), query, params + [per_page, offset])
+        rows = [dict(row) for row in db_cursor.fetchall()]
+
+        if total_count is None:
+            if rows:
+                total_count = rows[0]['_total_count']
+                for row in rows:
+                    del row['_total_count']
+            else:
+                # Past the last page the window has nothing to report
+                db.prepared.execute(db_cursor, statement_name(f"{name}_count", count_query), count_query, params)
+                total_count = db_cursor.fetchone()[0]
+
+    if count_cache is not None and not estimated:
+        count_cache.set(cache_key, total_count)
+
+    return {
+        'rows': rows,
+        'total_count': total_count,
+        'count_estimated': estimated,
+        'page': page,
+        'per_page': per_page,
+        'total_pages': (total_count + per_page - 1) // per_page
+    }
+
+
+def make_count_cache():
+    """Short-lived cache of list totals keyed by statement and filter values"""
+    return TTLCache(ttl=float(os.environ.get('DB_COUNT_CACHE_TTL', 5)), max_size=512)
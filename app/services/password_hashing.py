@@ -0,0 +1,167 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from werkzeug.security import check_password_hash, generate_password_hash
+
+# Worker processes doing scrypt/pbkdf2 work off the request threads; 0 hashes in-process
+PASSWORD_POOL_SIZE = int(os.environ.get('PASSWORD_POOL_SIZE', min(2, os.cpu_count() or 1)))
+# Verifications allowed to wait for a pool worker before new logins are turned away
+PASSWORD_POOL_MAX_PENDING = int(os.environ.get('PASSWORD_POOL_MAX_PENDING', max(PASSWORD_POOL_SIZE, 1) * 4))
+PASSWORD_POOL_TIMEOUT = float(os.environ.get('PASSWORD_POOL_TIMEOUT', 10))
+# Werkzeug method spec for new hashes, e.g. 'scrypt' or 'pbkdf2:sha256:600000'
+PASSWORD_HASH_METHOD = os.environ.get('PASSWORD_HASH_METHOD', 'scrypt')
+# hash_many through the shared pool: passwords per task, and tasks one call may have queued
+BULK_CHUNK_SIZE = int(os.environ.get('PASSWORD_BULK_CHUNK_SIZE', 8))
+BULK_MAX_IN_FLIGHT = int(os.environ.get('PASSWORD_BULK_MAX_IN_FLIGHT', 1))
+
+# Forking a threaded web worker can copy locks held by other threads into the children; start
+# pool processes from a clean forkserver (or spawn where that is unavailable) instead
+_MP_CONTEXT = multiprocessing.get_context(
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+)
+
+
+class PasswordPoolBusy(Exception):
+    """Raised when too many password operations are already waiting for the pool"""
+
+
+def _hash_many(passwords, method):
+    return [generate_password_hash(password, method=method) for password in passwords]
+
+
+class PasswordHasher:
+    """Bounded process pool for password hashing and verification
+
+    Request threads only wait on a future, so a burst of logins costs one
+    CPU per pool worker instead of one per request thread, and requests
+    beyond max_pending fail fast instead of queueing behind the burst.
+    """
+
+    def __init__(self, pool_size=PASSWORD_POOL_SIZE, max_pending=PASSWORD_POOL_MAX_PENDING,
+                 timeout=PASSWORD_POOL_TIMEOUT, method=PASSWORD_HASH_METHOD):
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.method = method
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self.max_pending = max_pending
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+        self._method_prefix = None
+        self._bulk_executor = None
+        self._bulk_workers = None
+        self._bulk_pid = None
+        self.rejected = 0
+
+    def _pool(self):
+        with self._lock:
+            # Forked web workers must not share the parent's pool
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ProcessPoolExecutor(max_workers=self.pool_size, mp_context=_MP_CONTEXT)
+                self._pid = os.getpid()
+            return self._executor
+
+    def _submit(self, func, *args, wait=None):
+        """Submit work to the pool, holding one of the max_pending slots until it has finished
+
+        Logins fail fast when every slot is taken; bulk work may `wait` that many seconds for one.
+        """
+        acquired = self._slots.acquire(timeout=wait) if wait else self._slots.acquire(blocking=False)
+        if not acquired:
+            with self._lock:
+                self.rejected += 1
+            raise PasswordPoolBusy()
+        try:
+            future = self._pool().submit(func, *args)
+        except BaseException:
+            self._slots.release()
+            raise
+        # Released on completion, not when a caller stops waiting, so timeouts cannot grow the queue
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _run(self, func, *args):
+        if self.pool_size <= 0:
+            return func(*args)
+        return self._submit(func, *args).result(timeout=self.timeout)
+
+    def verify(self, password_hash, password):
+        return self._run(check_password_hash, password_hash, password)
+
+    def hash(self, password):
+        return self._run(generate_password_hash, password, self.method)
+
+    def hash_many(self, passwords, workers=None, method=None):
+        """Hash a list of passwords across worker processes, keeping their order
+
+        With `workers` (offline provisioning scripts) the work is spread over
+        a dedicated pool of that many processes. Otherwise it goes through
+        the shared pool in small chunks, at most BULK_MAX_IN_FLIGHT of them
+        at a time and each holding an admission slot, so logins wait behind
+        at most that many chunks and never find the slots exhausted. Hashes made with another `method` are
+        upgraded by rehash-on-login.
+        """
+        passwords = list(passwords)
+        method = method or self.method
+        if len(passwords) < 2 or (not workers and self.pool_size <= 0):
+            return _hash_many(passwords, method)
+
+        if workers:
+            # A few chunks per worker keeps them all busy without one task per password
+            chunk_size = max(1, -(-len(passwords) // (workers * 4)))
+            chunks = [passwords[i:i + chunk_size] for i in range(0, len(passwords), chunk_size)]
+            results = self._dedicated_pool(workers).map(_hash_many, chunks, [method] * len(chunks))
+            return [password_hash for chunk in results for password_hash in chunk]
+
+        in_flight = threading.BoundedSemaphore(max(1, BULK_MAX_IN_FLIGHT))
+        futures = []
+        for i in range(0, len(passwords), BULK_CHUNK_SIZE):
+            in_flight.acquire()
+            try:
+                future = self._submit(_hash_many, passwords[i:i + BULK_CHUNK_SIZE], method,
+                                      wait=self.timeout)
+            except BaseException:
+                in_flight.release()
+                raise
+            future.add_done_callback(lambda _: in_flight.release())
+            futures.append(future)
+        return [password_hash for future in futures for password_hash in future.result()]
+
+    def _dedicated_pool(self, workers):
+        with self._lock:
+            if self._bulk_executor is None or self._bulk_workers != workers or self._bulk_pid != os.getpid():
+                if self._bulk_executor is not None and self._bulk_pid == os.getpid():
+                    self._bulk_executor.shutdown(wait=False)
+                self._bulk_executor = ProcessPoolExecutor(max_workers=workers, mp_context=_MP_CONTEXT)
+                self._bulk_workers = workers
+                self._bulk_pid = os.getpid()
+            return self._bulk_executor
+
+    def needs_rehash(self, password_hash):
+        """Whether a stored hash was made with other parameters than the configured method"""
+        if self._method_prefix is None:
+            # Werkzeug expands defaults ('scrypt' -> 'scrypt:32768:8:1'); read them off a real hash
+            self._method_prefix = generate_password_hash('', method=self.method).split('$', 1)[0]
+        return password_hash.split('$', 1)[0] != self._method_prefix
+
+    def stats(self):
+        with self._lock:
+            return {
+                'pool_size': self.pool_size,
+                'max_pending': self.max_pending,
+                'method': self.method,
+                'rejected': self.rejected
+            }
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None and self._pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            if self._bulk_executor is not None and self._bulk_pid == os.getpid():
+                self._bulk_executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._bulk_executor = None
+
+
+password_hasher = PasswordHasher()
@@ -0,0 +1,26 @@
+from datetime import timedelta
+from app.services.reservation_index import to_date
+
+FREQUENCIES = {
+    'weekly': 7,
+    'biweekly': 14
+}
+
+MAX_OCCURRENCES = 60
+
+
+def expand_occurrences(start_date, until_date, frequency='weekly', exceptions=None):
+    """Dates of a recurring series from start_date through until_date, as (date, skipped) pairs"""
+    if frequency not in FREQUENCIES:
+        raise ValueError(f"Frecuencia inválida: {frequency}")
+    start_date, until_date = to_date(start_date), to_date(until_date)
+    if until_date < start_date:
+        raise ValueError("La fecha final debe ser posterior a la fecha de inicio")
+
+    step = timedelta(days=FREQUENCIES[frequency])
+    count = (until_date - start_date) // step + 1
+    if count > MAX_OCCURRENCES:
+        raise ValueError(f"La serie no puede tener más de {MAX_OCCURRENCES} ocurrencias")
+
+    skipped = {to_date(value) for value in exceptions or []}
+    return [(start_date + step * i, start_date + step * i in skipped) for i in range(count)]
@@ -0,0 +1,170 @@
+import bisect
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime, time as time_of_day
+
+
+def to_date(value):
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(str(value))
+
+
+def to_minutes(value):
+    """Minutes since midnight for a time object or an 'HH:MM[:SS]' string"""
+    if not isinstance(value, time_of_day):
+        value = time_of_day.fromisoformat(str(value))
+    return value.hour * 60 + value.minute + value.second / 60
+
+
+class DateIntervals:
+    """Active reservations of one day sorted by start, with a running max of end times
+
+    The running max answers "does anything overlap [start, end)?" with one
+    bisect: among the intervals starting before `end`, some interval
+    overlaps exactly when the largest end among them is after `start`.
+    Excluding a reservation (updates) falls back to a linear scan of those
+    intervals.
+    """
+
+    def __init__(self, intervals):
+        self.intervals = sorted(intervals)  # (start, end, reservation_id)
+        self._rebuild()
+
+    def _rebuild(self):
+        self.starts = [interval[0] for interval in self.intervals]
+        self.max_ends = []
+        running = float('-inf')
+        for _, end, _ in self.intervals:
+            running = max(running, end)
+            self.max_ends.append(running)
+
+    def overlaps(self, start, end, exclude_id=None):
+        count = bisect.bisect_left(self.starts, end)
+        if count == 0:
+            return False
+        if exclude_id is None:
+            return self.max_ends[count - 1] > start
+        # Updates skip their own row; days hold few bookings so a scan is fine here
+        return any(
+            interval_end > start and reservation_id != exclude_id
+            for _, interval_end, reservation_id in self.intervals[:count]
+        )
+
+    def add(self, start, end, reservation_id):
+        bisect.insort(self.intervals, (start, end, reservation_id))
+        self._rebuild()
+
+    def remove(self, reservation_id):
+        remaining = [interval for interval in self.intervals if interval[2] != reservation_id]
+        if len(remaining) != len(self.intervals):
+            self.intervals = remaining
+            self._rebuild()
+            return True
+        return False
+
+
+class ReservationIntervalIndex:
+    """Process-local, lazily loaded per-date index of pending/confirmed reservations
+
+    It is a fast path only: entries expire after `ttl` seconds so changes
+    made by other workers are picked up, callers confirm the conflicts it
+    reports against the database, and writes are decided by the database.
+    """
+
+    def __init__(self, loader, ttl=30, max_dates=400):
+        self.loader = loader  # date -> iterable of (reservation_id, start_time, end_time)
+        self.ttl = ttl
+        self.max_dates = max_dates
+        self._lock = threading.Lock()
+        self._dates = OrderedDict()  # date -> (loaded_at, DateIntervals)
+        self._dates_by_id = {}
+        # Bumped by every add/remove/invalidate so a load racing one is not cached
+        self._changes = 0
+        self.loads = 0
+        self.lookups = 0
+
+    def _get(self, day):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._dates.get(day)
+            if entry is not None and now - entry[0] < self.ttl:
+                self._dates.move_to_end(day)
+                return entry[1]
+            changes = self._changes
+
+        rows = list(self.loader(day))
+        intervals = DateIntervals([
+            (to_minutes(start), to_minutes(end), reservation_id) for reservation_id, start, end in rows
+        ])
+        with self._lock:
+            self.loads += 1
+            if self._changes != changes:
+                # The rows may predate a concurrent add/remove; answer from them but do not keep them
+                return intervals
+            self._drop(day)
+            self._dates[day] = (now, intervals)
+            for reservation_id, _, _ in rows:
+                self._dates_by_id[reservation_id] = day
+            while len(self._dates) > self.max_dates:
+                self._drop(next(iter(self._dates)))
+        return intervals
+
+    def _drop(self, day):
+        entry = self._dates.pop(day, None)
+        if entry is not None:
+            for _, _, reservation_id in entry[1].intervals:
+                if self._dates_by_id.get(reservation_id) == day:
+                    del self._dates_by_id[reservation_id]
+
+    def has_conflict(self, reservation_date, start_time, end_time, exclude_reservation_id=None):
+        """Whether [start_time, end_time) overlaps an active reservation on that date"""
+        day = to_date(reservation_date)
+        start, end = to_minutes(start_time), to_minutes(end_time)
+        intervals = self._get(day)
+        with self._lock:
+            self.lookups += 1
+            return intervals.overlaps(start, end, exclude_reservation_id)
+
+    def add(self, reservation_id, reservation_date, start_time, end_time):
+        """Record a committed active reservation on a date that is already loaded"""
+        day = to_date(reservation_date)
+        with self._lock:
+            self._changes += 1
+            entry = self._dates.get(day)
+            if entry is None:
+                return
+            entry[1].remove(reservation_id)
+            entry[1].add(to_minutes(start_time), to_minutes(end_time), reservation_id)
+            self._dates_by_id[reservation_id] = day
+
+    def remove(self, reservation_id):
+        """Forget a reservation that was cancelled, moved or deleted"""
+        with self._lock:
+            self._changes += 1
+            day = self._dates_by_id.pop(reservation_id, None)
+            entry = self._dates.get(day) if day is not None else None
+            if entry is not None:
+                entry[1].remove(reservation_id)
+
+    def invalidate(self, reservation_date=None):
+        """Drop one date, or everything, so it is reloaded on next use"""
+        with self._lock:
+            self._changes += 1
+            if reservation_date is None:
+                self._dates.clear()
+                self._dates_by_id.clear()
+            else:
+                self._drop(to_date(reservation_date))
+
+    def stats(self):
+        with self._lock:
+            return {
+                'dates_loaded': len(self._dates),
+                'reservations_indexed': len(self._dates_by_id),
+                'loads': self.loads,
+                'lookups': self.lookups
+            }
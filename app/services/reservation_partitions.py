@@ -0,0 +1,104 @@
+import gzip
+import os
+import re
+from datetime import date
+from app.database import db
+from app.services.counter_service import CounterService
+
+ARCHIVE_SCHEMA = 'reservations_archive'
+
+_PARTITION_NAME = re.compile(r"^reservations_(\d{4})_(\d{2})$")
+
+
+def month_start(value):
+    return date(value.year, value.month, 1)
+
+
+def add_months(value, months):
+    index = value.year * 12 + value.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+class ReservationPartitionService:
+    """Maintenance of the monthly reservation partitions created by migration 0007"""
+
+    @staticmethod
+    def list_partitions():
+        """Partitions of reservations with their month, estimated rows and size on disk"""
+        with db.get_cursor() as cursor:
+            cursor.execute("""
+                SELECT c.relname AS name, GREATEST(c.reltuples, 0)::bigint AS estimated_rows,
+                    pg_total_relation_size(c.oid) AS size_bytes
+                FROM pg_inherits i
+                JOIN pg_class c ON c.oid = i.inhrelid
+                WHERE i.inhparent = 'reservations'::regclass
+                ORDER BY c.relname
+            """)
+            partitions = []
+            for row in cursor.fetchall():
+                partition = dict(row)
+                match = _PARTITION_NAME.match(row['name'])
+                partition['month'] = date(int(match.group(1)), int(match.group(2)), 1) if match else None
+                partitions.append(partition)
+            return partitions
+
+    @staticmethod
+    def ensure_partitions(months_ahead=24):
+        """Create any missing monthly partition from the current month through months_ahead"""
+        with db.get_cursor() as cursor:
+            cursor.execute("""
+                SELECT ensure_reservation_partition(
+                    (date_trunc('month', CURRENT_DATE) + make_interval(months => n))::date
+                ) AS name
+                FROM generate_series(0, %s) AS n
+            """, (months_ahead,))
+            return [row['name'] for row in cursor.fetchall()]
+
+    @staticmethod
+    def archive_partitions(before, export_dir=None, drop=False, dry_run=False):
+        """Detach every monthly partition older than the month of `before`
+
+        Each partition is detached in its own transaction, optionally exported
+        to a gzipped CSV file, then dropped or moved to the archive schema, and
+        its reservation_locator entries are removed. The dashboard counters
+        are reconciled afterwards because detaching skips the counter triggers.
+        """
+        before = month_start(before)
+        if before > month_start(date.today()):
+            raise ValueError("Solo se pueden archivar meses anteriores al actual")
+        if drop and not export_dir and not dry_run:
+            raise ValueError("Eliminar particiones requiere exportarlas antes")
+
+        archived = []
+        for partition in ReservationPartitionService.list_partitions():
+            if partition['month'] is None or partition['month'] >= before:
+                continue
+            entry = {'name': partition['name'], 'month': partition['month'], 'file': None,
+                     'action': 'drop' if drop else 'move'}
+            archived.append(entry)
+            if dry_run:
+                continue
+
+            with db.transaction():
+                with db.get_cursor() as cursor:
+                    cursor.execute(f'ALTER TABLE reservations DETACH PARTITION "{partition["name"]}"')
+                    # The archived ids can no longer be found by id; drop their lookup entries too
+                    cursor.execute("""
+                        DELETE FROM reservation_locator
+                        WHERE reservation_date >= %s AND reservation_date < %s
+                    """, (partition['month'], add_months(partition['month'], 1)))
+                    if export_dir:
+                        entry['file'] = os.path.join(export_dir, f"{partition['name']}.csv.gz")
+                        with gzip.open(entry['file'], 'wb') as export_file:
+                            cursor.copy_expert(
+                                f'COPY "{partition["name"]}" TO STDOUT WITH CSV HEADER', export_file
+                            )
+                    if drop:
+                        cursor.execute(f'DROP TABLE "{partition["name"]}"')
+                    else:
+                        cursor.execute(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}")
+                        cursor.execute(f'ALTER TABLE "{partition["name"]}" SET SCHEMA {ARCHIVE_SCHEMA}')
+
+        if archived and not dry_run:
+            CounterService.reconcile()
+        return archived
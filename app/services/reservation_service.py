@@ -1,11 +1,50 @@
-from app.database import db
-from datetime import date
+from app.database import db, statement_name
+from app.services.counter_service import CounterService
+import psycopg2.errors
+from app.services.pagination import fetch_keyset_page, fetch_offset_page, make_count_cache
+from app.services.reservation_index import ReservationIntervalIndex, to_date, to_minutes
+from app.services.availability import busy_by_date, format_minutes, free_slots
+from app.services.cache import TTLCache
+from app.services.change_feed import change_feed
+from app.services.recurrence import expand_occurrences
+from app.services.user_search import search_condition
+from datetime import date, datetime, timedelta
+import os
+
+_count_cache = make_count_cache()
+
+# Busy blocks per date for the availability API, dropped on commit of any write touching the date
+_busy_cache = TTLCache(ttl=float(os.environ.get('AVAILABILITY_CACHE_TTL', 30)), max_size=400)
+
+LAB_OPENING_TIME = os.environ.get('LAB_OPENING_TIME', '07:00')
+LAB_CLOSING_TIME = os.environ.get('LAB_CLOSING_TIME', '21:00')
+MAX_RANGE_DAYS = 62
+
+# Pending reservations are expired this long after their slot ended, leaving time to confirm usage
+EXPIRE_PENDING_GRACE_HOURS = int(os.environ.get('EXPIRE_PENDING_GRACE_HOURS', 24))
+
+# Lists without an explicit date range only look this far back, so they touch recent partitions only
+RESERVATION_HISTORY_DAYS = int(os.environ.get('RESERVATION_HISTORY_DAYS', 180))
+
+ACTIVE_STATUSES = ('pending', 'confirmed')
+
+CONFLICT_MESSAGE = "Conflicto de horario: Ya existe una reserva en este horario."
+TIME_ORDER_MESSAGE = "La hora de fin debe ser posterior a la hora de inicio"
+
+class _SeriesRejected(Exception):
+    """Rolls back an all-or-nothing recurring booking that hit a conflict"""
 
 class ReservationService:
     
     @staticmethod
-    def get_all_reservations(search=None, status=None, date_filter=None, page=1, per_page=15):
-        """Get all reservations with optional filtering and pagination"""
+    @db.read_only
+    def get_all_reservations(search=None, status=None, date_filter=None, page=1, per_page=15, cursor=None,
+                             count_mode='window', date_from=None, date_to=None, include_history=False):
+        """Get all reservations with optional filtering and pagination (keyset when cursor is given)
+
+        Without date_filter, date_from or include_history only the last
+        RESERVATION_HISTORY_DAYS days onward are listed.
+        """
         query = """
             SELECT r.id, r.user_id, r.reservation_date, r.start_time, r.end_time, r.status, r.created_at,
                    u.username, u.full_name, u.email
@@ -22,10 +61,10 @@ class ReservationService:
         params = []
         
         if search:
-            query += " AND (u.username ILIKE %s OR u.full_name ILIKE %s OR u.email ILIKE %s)"
-            count_query += " AND (u.username ILIKE %s OR u.full_name ILIKE %s OR u.email ILIKE %s)"
-            search_term = f"%{search}%"
-            params.extend([search_term, search_term, search_term])
+            condition, search_params = search_condition(search, 'u')
+            query += f" AND {condition}"
+            count_query += f" AND {condition}"
+            params.extend(search_params)
         
         if status and status != 'all':
             query += " AND r.status = %s"
@@ -36,65 +75,221 @@ class ReservationService:
             query += " AND r.reservation_date = %s"
             count_query += " AND r.reservation_date = %s"
             params.append(date_filter)
+        else:
+            lower_bound = date_from or (None if include_history else ReservationService._history_start())
+            if lower_bound:
+                query += " AND r.reservation_date >= %s"
+                count_query += " AND r.reservation_date >= %s"
+                params.append(lower_bound)
+            if date_to:
+                query += " AND r.reservation_date <= %s"
+                count_query += " AND r.reservation_date <= %s"
+                params.append(date_to)
         
-        query += " ORDER BY r.reservation_date, r.start_time"
-        
-        offset = (page - 1) * per_page
-        query += " LIMIT %s OFFSET %s"
-        params.extend([per_page, offset])
-        
-        with db.get_cursor() as cursor:
-            cursor.execute(count_query, params[:len(params)-2])
-            total_count = cursor.fetchone()[0]
-            
-            cursor.execute(query, params)
-            reservations = cursor.fetchall()
-            
+        if cursor is not None:
+            reservations, next_cursor, has_more = fetch_keyset_page(
+                'reservations_keyset', query, params,
+                ['r.reservation_date', 'r.start_time', 'r.id'],
+                ['reservation_date', 'start_time', 'id'],
+                cursor, per_page
+            )
             return {
-                'reservations': [dict(reservation) for reservation in reservations],
-                'total_count': total_count,
-                'page': page,
+                'reservations': reservations,
                 'per_page': per_page,
-                'total_pages': (total_count + per_page - 1) // per_page
+                'next_cursor': next_cursor,
+                'has_more': has_more
             }
+        
+        result = fetch_offset_page(
+            'reservations_page', query, count_query, params, 'r.reservation_date, r.start_time', page, per_page,
+            count_cache=_count_cache,
+            # The default history window is a filter too; its total is the planner's estimate
+            estimate_table='reservations' if count_mode == 'estimate' else None
+        )
+        result['reservations'] = result.pop('rows')
+        return result
     
+    @staticmethod
+    def _history_start():
+        return date.today() - timedelta(days=RESERVATION_HISTORY_DAYS)
+
     @staticmethod
     def create_reservation(user_id, reservation_date, start_time, end_time):
-        """Create new reservation"""
-        conflict = ReservationService._check_time_conflict(reservation_date, start_time, end_time)
-        if conflict:
-            return None, "Conflicto de horario: Ya existe una reserva en este horario."
+        """Create new reservation in a single statement
+
+        The NOT EXISTS guard covers databases without the overlap exclusion
+        constraint; with it (migration 0004) concurrent bookings of the same
+        slot are rejected by ON CONFLICT DO NOTHING instead of double-booking.
+        The statement alone decides; the interval index is not consulted
+        since it may still hold bookings cancelled on other workers.
+        """
+        try:
+            with db.get_cursor() as cursor:
+                db.prepared.execute(cursor, 'create_reservation', """
+                    INSERT INTO reservations (user_id, reservation_date, start_time, end_time, status)
+                    SELECT %s::integer, %s::date, %s::time, %s::time, 'pending'
+                    WHERE NOT EXISTS (
+                        SELECT 1 FROM reservations
+                        WHERE reservation_date = %s
+                        AND status IN ('pending', 'confirmed')
+                        AND start_time < %s AND end_time > %s
+                    )
+                    ON CONFLICT DO NOTHING
+                    RETURNING id, user_id, reservation_date, start_time, end_time, status, created_at
+                """, (user_id, reservation_date, start_time, end_time,
+                      reservation_date, end_time, start_time))
+                
+                reservation = cursor.fetchone()
+        except psycopg2.errors.CheckViolation:
+            return None, TIME_ORDER_MESSAGE
         
-        with db.get_cursor() as cursor:
-            cursor.execute("""
-                INSERT INTO reservations (user_id, reservation_date, start_time, end_time, status)
-                VALUES (%s, %s, %s, %s, 'pending')
-                RETURNING id, user_id, reservation_date, start_time, end_time, status, created_at
-            """, (user_id, reservation_date, start_time, end_time))
-            
-            reservation = cursor.fetchone()
-            return dict(reservation), "Reservación creada exitosamente"
+        if not reservation:
+            _interval_index.invalidate(reservation_date)
+            return None, CONFLICT_MESSAGE
+        
+        reservation = dict(reservation)
+        _count_cache.clear()
+        db.on_commit(lambda: _interval_index.add(
+            reservation['id'], reservation['reservation_date'],
+            reservation['start_time'], reservation['end_time']
+        ))
+        db.on_commit(lambda: _busy_cache.delete(reservation['reservation_date']))
+        change_feed.publish('reservations', 'created', reservation['id'])
+        return reservation, "Reservación creada exitosamente"
     
+    @staticmethod
+    def create_recurring_reservations(user_id, start_date, until_date, start_time, end_time,
+                                      frequency='weekly', exceptions=None, atomic=False):
+        """Book the same slot on every occurrence of a weekly/biweekly series
+
+        All occurrences are checked and inserted by one INSERT ... SELECT over
+        the date array, in one transaction; dates that are taken are left out
+        (or, when atomic, roll the whole series back). Returns the
+        per-occurrence outcome list and a message.
+        """
+        occurrences = expand_occurrences(start_date, until_date, frequency, exceptions)
+        if to_minutes(end_time) <= to_minutes(start_time):
+            return None, TIME_ORDER_MESSAGE
+        dates = [day for day, skipped in occurrences if not skipped]
+
+        inserted = {}
+        rolled_back = False
+        try:
+            with db.transaction():
+                if dates:
+                    with db.get_cursor() as cursor:
+                        cursor.execute("""
+                            INSERT INTO reservations (user_id, reservation_date, start_time, end_time, status)
+                            SELECT %s, day, %s::time, %s::time, 'pending'
+                            FROM unnest(%s::date[]) AS day
+                            WHERE NOT EXISTS (
+                                SELECT 1 FROM reservations
+                                WHERE reservation_date = day
+                                AND status IN ('pending', 'confirmed')
+                                AND start_time < %s::time AND end_time > %s::time
+                            )
+                            ORDER BY day
+                            ON CONFLICT DO NOTHING
+                            RETURNING id, user_id, reservation_date, start_time, end_time, status, created_at
+                        """, (user_id, start_time, end_time, dates, end_time, start_time))
+                        inserted = {row['reservation_date']: dict(row) for row in cursor.fetchall()}
+                if atomic and len(inserted) < len(dates):
+                    # Raising rolls back the occurrences that did fit
+                    raise _SeriesRejected()
+        except _SeriesRejected:
+            rolled_back = True
+        except psycopg2.errors.CheckViolation:
+            return None, TIME_ORDER_MESSAGE
+        created = {} if rolled_back else inserted
+
+        results = []
+        for day, skipped in occurrences:
+            if skipped:
+                outcome = 'skipped'
+            elif day not in inserted:
+                outcome = 'conflict'
+            elif rolled_back:
+                outcome = 'rolled_back'
+            else:
+                outcome = 'created'
+            results.append({
+                'reservation_date': day,
+                'status': outcome,
+                'reservation': created.get(day)
+            })
+
+        if created:
+            _count_cache.clear()
+            for reservation in created.values():
+                db.on_commit(lambda reservation=reservation: _interval_index.add(
+                    reservation['id'], reservation['reservation_date'],
+                    reservation['start_time'], reservation['end_time']
+                ))
+                db.on_commit(lambda day=reservation['reservation_date']: _busy_cache.delete(day))
+            # One event for the whole series; clients reload the page they are showing
+            change_feed.publish('reservations', 'created', count=len(created))
+
+        conflicts = len(dates) - len(inserted)
+        if not created:
+            message = "No se creó ninguna reservación" + (
+                f": {conflicts} fecha(s) en conflicto" if conflicts else "")
+        else:
+            message = f"{len(created)} reservación(es) creada(s)" + (
+                f", {conflicts} fecha(s) en conflicto" if conflicts else "")
+        return results, message
+
     @staticmethod
     def update_reservation(reservation_id, reservation_date, start_time, end_time, status):
-        """Update reservation"""
-        conflict = ReservationService._check_time_conflict(reservation_date, start_time, end_time, reservation_id)
-        if conflict:
-            return None, "Conflicto de horario: Ya existe una reserva en este horario."
+        """Update reservation in a single statement that skips it when the new slot is taken"""
+        try:
+            with db.get_cursor() as cursor:
+                db.prepared.execute(cursor, 'update_reservation', """
+                    UPDATE reservations 
+                    SET reservation_date = %s, start_time = %s, end_time = %s, status = %s
+                    WHERE id = %s
+                    AND reservation_date = (SELECT reservation_date FROM reservation_locator WHERE id = %s)
+                    AND (
+                        %s NOT IN ('pending', 'confirmed')
+                        OR NOT EXISTS (
+                            SELECT 1 FROM reservations other
+                            WHERE other.id != %s
+                            AND other.reservation_date = %s
+                            AND other.status IN ('pending', 'confirmed')
+                            AND other.start_time < %s AND other.end_time > %s
+                        )
+                    )
+                    RETURNING id, user_id, reservation_date, start_time, end_time, status, created_at
+                """, (reservation_date, start_time, end_time, status, reservation_id, reservation_id,
+                      status, reservation_id, reservation_date, end_time, start_time))
+                
+                reservation = cursor.fetchone()
+                if not reservation:
+                    # Only the failure path pays for telling "missing" from "slot taken"
+                    cursor.execute("""
+                        SELECT 1 FROM reservations
+                        WHERE id = %s
+                        AND reservation_date = (SELECT reservation_date FROM reservation_locator WHERE id = %s)
+                    """, (reservation_id, reservation_id))
+                    exists = cursor.fetchone()
+        except psycopg2.errors.ExclusionViolation:
+            _interval_index.invalidate(reservation_date)
+            return None, CONFLICT_MESSAGE
+        except psycopg2.errors.CheckViolation:
+            return None, TIME_ORDER_MESSAGE
         
-        with db.get_cursor() as cursor:
-            cursor.execute("""
-                UPDATE reservations 
-                SET reservation_date = %s, start_time = %s, end_time = %s, status = %s
-                WHERE id = %s
-                RETURNING id, user_id, reservation_date, start_time, end_time, status, created_at
-            """, (reservation_date, start_time, end_time, status, reservation_id))
-            
-            reservation = cursor.fetchone()
-            if reservation:
-                return dict(reservation), "Reservación actualizada correctamente"
-            else:
-                return None, "Reservación no encontrada"
+        if not reservation:
+            if exists:
+                _interval_index.invalidate(reservation_date)
+                return None, CONFLICT_MESSAGE
+            return None, "Reservación no encontrada"
+        
+        reservation = dict(reservation)
+        _count_cache.clear()
+        db.on_commit(lambda: ReservationService._reindex(reservation))
+        # The previous date is not known here, so every cached day is dropped
+        db.on_commit(_busy_cache.clear)
+        change_feed.publish('reservations', 'updated', reservation['id'])
+        return reservation, "Reservación actualizada correctamente"
     
     @staticmethod
     def cancel_reservation(reservation_id):
@@ -104,18 +299,173 @@ class ReservationService:
                 UPDATE reservations 
                 SET status = 'cancelled'
                 WHERE id = %s
-                RETURNING id
-            """, (reservation_id,))
+                AND reservation_date = (SELECT reservation_date FROM reservation_locator WHERE id = %s)
+                RETURNING id, reservation_date
+            """, (reservation_id, reservation_id))
             
             cancelled = cursor.fetchone()
-            if cancelled:
-                return True, "Reservación cancelada correctamente"
-            else:
-                return False, "Reservación no encontrada"
+        if not cancelled:
+            return False, "Reservación no encontrada"
+
+        _count_cache.clear()
+        db.on_commit(lambda: _interval_index.remove(reservation_id))
+        db.on_commit(lambda: _busy_cache.delete(cancelled['reservation_date']))
+        change_feed.publish('reservations', 'updated', reservation_id)
+        return True, "Reservación cancelada correctamente"
     
+    @staticmethod
+    def has_time_conflict(reservation_date, start_time, end_time, exclude_reservation_id=None):
+        """Advisory conflict check for the booking form, answered from the in-memory interval index
+
+        The index only sees other workers' changes after RESERVATION_INDEX_TTL,
+        so both answers can be stale. A reported conflict is confirmed in the
+        database (and the date reloaded when it disagrees), a free slot is
+        not: a booking made meanwhile on another worker can still be missed.
+        Bookings themselves never rely on this; create_reservation and
+        update_reservation are decided by the database.
+        """
+        try:
+            if not _interval_index.has_conflict(reservation_date, start_time, end_time, exclude_reservation_id):
+                return False
+            indexed = True
+        except (TypeError, ValueError):
+            # Unparseable input: let the database report it as before
+            indexed = False
+        conflict = ReservationService._check_time_conflict(
+            reservation_date, start_time, end_time, exclude_reservation_id
+        )
+        if indexed and not conflict:
+            _interval_index.invalidate(reservation_date)
+        return conflict
+
+    @staticmethod
+    def _date_range(date_from, date_to):
+        date_from, date_to = to_date(date_from), to_date(date_to)
+        if date_to < date_from:
+            raise ValueError("La fecha final debe ser posterior a la inicial")
+        if (date_to - date_from).days >= MAX_RANGE_DAYS:
+            raise ValueError(f"El rango no puede exceder {MAX_RANGE_DAYS} días")
+        return date_from, date_to
+
+    @staticmethod
+    @db.read_only
+    def get_calendar(date_from, date_to, user_id=None):
+        """Active reservations in [date_from, date_to] as parallel arrays plus a user table
+
+        Days are offsets from date_from and times are minutes since midnight.
+        With user_id, only that user's details are included; the others' user
+        ids come back as null.
+        """
+        date_from, date_to = ReservationService._date_range(date_from, date_to)
+        with db.get_cursor() as cursor:
+            db.prepared.execute(cursor, 'calendar_range', """
+                SELECT id, user_id, reservation_date, start_time, end_time, status
+                FROM reservations
+                WHERE reservation_date BETWEEN %s AND %s
+                AND status IN ('pending', 'confirmed')
+                ORDER BY reservation_date, start_time, id
+            """, (date_from, date_to))
+            rows = cursor.fetchall()
+
+        calendar = {
+            'from': date_from.isoformat(),
+            'to': date_to.isoformat(),
+            'status_codes': list(ACTIVE_STATUSES),
+            'ids': [],
+            'days': [],
+            'starts': [],
+            'ends': [],
+            'statuses': [],
+            'user_ids': [],
+            'users': {}
+        }
+        for row in rows:
+            calendar['ids'].append(row['id'])
+            calendar['days'].append((row['reservation_date'] - date_from).days)
+            calendar['starts'].append(int(to_minutes(row['start_time'])))
+            calendar['ends'].append(int(to_minutes(row['end_time'])))
+            calendar['statuses'].append(ACTIVE_STATUSES.index(row['status']))
+            visible = user_id is None or row['user_id'] == user_id
+            calendar['user_ids'].append(row['user_id'] if visible else None)
+
+        user_ids = sorted({uid for uid in calendar['user_ids'] if uid is not None})
+        if user_ids:
+            with db.get_cursor() as cursor:
+                cursor.execute("SELECT id, full_name FROM users WHERE id = ANY(%s)", (user_ids,))
+                for row in cursor.fetchall():
+                    initials = ''.join([name[0].upper() for name in row['full_name'].split()[:2]])
+                    calendar['users'][str(row['id'])] = [row['full_name'], initials]
+        return calendar
+
+    @staticmethod
+    @db.read_only
+    def get_availability(date_from, date_to, granularity=30):
+        """Free slots within lab hours for every date in [date_from, date_to]
+
+        Dates missing from the busy cache are loaded with one range query and
+        merged in a single sweep; each day maps to compact [start, end] pairs.
+        """
+        date_from, date_to = ReservationService._date_range(date_from, date_to)
+        granularity = int(granularity)
+        if not 5 <= granularity <= 240:
+            raise ValueError("La granularidad debe estar entre 5 y 240 minutos")
+
+        days = [date_from + timedelta(days=offset) for offset in range((date_to - date_from).days + 1)]
+        busy = {day: _busy_cache.get(day) for day in days}
+        missing = [day for day, blocks in busy.items() if blocks is None]
+        if missing:
+            with db.get_cursor() as cursor:
+                db.prepared.execute(cursor, 'busy_intervals_by_range', """
+                    SELECT reservation_date, start_time, end_time
+                    FROM reservations
+                    WHERE reservation_date BETWEEN %s AND %s
+                    AND status IN ('pending', 'confirmed')
+                    ORDER BY reservation_date, start_time
+                """, (missing[0], missing[-1]))
+                loaded = busy_by_date(
+                    (row['reservation_date'], row['start_time'], row['end_time']) for row in cursor.fetchall()
+                )
+            for day in missing:
+                busy[day] = loaded.get(day, [])
+                _busy_cache.set(day, busy[day])
+
+        opening, closing = to_minutes(LAB_OPENING_TIME), to_minutes(LAB_CLOSING_TIME)
+        return {
+            day.isoformat(): [
+                [format_minutes(start), format_minutes(end)]
+                for start, end in free_slots(busy[day], opening, closing, granularity)
+            ]
+            for day in days
+        }
+
+    @staticmethod
+    def _load_active_intervals(reservation_date):
+        """Active reservations of one date for the interval index"""
+        with db.get_cursor() as cursor:
+            db.prepared.execute(cursor, 'active_intervals_by_date', """
+                SELECT id, start_time, end_time
+                FROM reservations
+                WHERE reservation_date = %s AND status IN ('pending', 'confirmed')
+            """, (reservation_date,))
+            return [(row['id'], row['start_time'], row['end_time']) for row in cursor.fetchall()]
+
+    @staticmethod
+    def _reindex(reservation):
+        _interval_index.remove(reservation['id'])
+        if reservation['status'] in ACTIVE_STATUSES:
+            _interval_index.add(
+                reservation['id'], reservation['reservation_date'],
+                reservation['start_time'], reservation['end_time']
+            )
+
+    @staticmethod
+    def get_interval_index_stats():
+        """Get usage statistics of the conflict interval index"""
+        return dict(_interval_index.stats(), availability_cache=_busy_cache.stats())
+
     @staticmethod
     def _check_time_conflict(reservation_date, start_time, end_time, exclude_reservation_id=None):
-        """Check if there's a time conflict with existing reservations"""
+        """Check if there's a time conflict with existing reservations (authoritative, in the database)"""
         query = """
             SELECT COUNT(*) as conflicts
             FROM reservations
@@ -134,25 +484,29 @@ class ReservationService:
             params.append(exclude_reservation_id)
         
         with db.get_cursor() as cursor:
-            cursor.execute(query, params)
+            db.prepared.execute(cursor, statement_name('reservation_conflicts', query), query, params)
             result = cursor.fetchone()
             return result['conflicts'] > 0
     
     @staticmethod
+    @db.read_only
     def get_reservation_by_id(reservation_id):
         """Get reservation by ID"""
         with db.get_cursor() as cursor:
+            # The id alone would probe every monthly partition; the locator (migration 0011) names the one to read
             cursor.execute("""
                 SELECT r.id, r.user_id, r.reservation_date, r.start_time, r.end_time, r.status, r.created_at,
                        u.username, u.full_name, u.email
                 FROM reservations r
                 JOIN users u ON r.user_id = u.id
                 WHERE r.id = %s
-            """, (reservation_id,))
+                AND r.reservation_date = (SELECT reservation_date FROM reservation_locator WHERE id = %s)
+            """, (reservation_id, reservation_id))
             reservation = cursor.fetchone()
             return dict(reservation) if reservation else None
     
     @staticmethod
+    @db.read_only
     def get_todays_reservations():
         """Get today's reservations"""
         today = date.today()
@@ -169,8 +523,13 @@ class ReservationService:
             return [dict(reservation) for reservation in reservations]
         
     @staticmethod
-    def get_user_reservations(user_id, page=1, per_page=15, status=None, date_filter=None):
-        """Get reservations for a specific user with pagination"""
+    @db.read_only
+    def get_user_reservations(user_id, page=1, per_page=15, status=None, date_filter=None, cursor=None,
+                              date_from=None, date_to=None, include_history=False):
+        """Get reservations for a specific user with pagination (keyset when cursor is given)
+
+        The date window works as in get_all_reservations.
+        """
         query = """
             SELECT r.id, r.user_id, r.reservation_date, r.start_time, r.end_time, r.status, r.created_at,
                 u.username, u.full_name, u.email
@@ -180,42 +539,68 @@ class ReservationService:
         """
         count_query = "SELECT COUNT(*) FROM reservations WHERE user_id = %s"
         params = [user_id]
-        count_params = [user_id]
         
         if status and status != 'all':
             query += " AND r.status = %s"
             count_query += " AND status = %s"
             params.append(status)
-            count_params.append(status)
         
         if date_filter:
             query += " AND r.reservation_date = %s"
             count_query += " AND reservation_date = %s"
             params.append(date_filter)
-            count_params.append(date_filter)
+        else:
+            lower_bound = date_from or (None if include_history else ReservationService._history_start())
+            if lower_bound:
+                query += " AND r.reservation_date >= %s"
+                count_query += " AND reservation_date >= %s"
+                params.append(lower_bound)
+            if date_to:
+                query += " AND r.reservation_date <= %s"
+                count_query += " AND reservation_date <= %s"
+                params.append(date_to)
         
-        query += " ORDER BY r.reservation_date, r.start_time"
-        
-        offset = (page - 1) * per_page
-        query += " LIMIT %s OFFSET %s"
-        params.extend([per_page, offset])
-        
-        with db.get_cursor() as cursor:
-            cursor.execute(count_query, count_params)
-            total_count = cursor.fetchone()[0]
-            
-            cursor.execute(query, params)
-            reservations = cursor.fetchall()
-            
+        if cursor is not None:
+            reservations, next_cursor, has_more = fetch_keyset_page(
+                'user_reservations_keyset', query, params,
+                ['r.reservation_date', 'r.start_time', 'r.id'],
+                ['reservation_date', 'start_time', 'id'],
+                cursor, per_page
+            )
             return {
-                'reservations': [dict(reservation) for reservation in reservations],
-                'total_count': total_count,
-                'page': page,
+                'reservations': reservations,
                 'per_page': per_page,
-                'total_pages': (total_count + per_page - 1) // per_page
+                'next_cursor': next_cursor,
+                'has_more': has_more
             }
+        
+        result = fetch_offset_page(
+            'user_reservations_page', query, count_query, params, 'r.reservation_date, r.start_time',
+            page, per_page, count_cache=_count_cache
+        )
+        result['reservations'] = result.pop('rows')
+        return result
+
+    @staticmethod
+    @db.read_only
+    def get_user_reservation_summary(user_id):
+        """Get the dashboard counters of a user from one aggregate over their reservations"""
+        with db.get_cursor() as cursor:
+            db.prepared.execute(cursor, 'user_reservation_summary', """
+                SELECT COUNT(*) AS total_count,
+                    COUNT(*) FILTER (
+                        WHERE reservation_date >= %s AND status IN ('pending', 'confirmed')
+                    ) AS upcoming_count,
+                    COUNT(*) FILTER (WHERE status = 'pending') AS pending_count,
+                    COUNT(*) FILTER (WHERE status = 'confirmed') AS confirmed_count,
+                    COUNT(*) FILTER (WHERE status = 'cancelled') AS cancelled_count
+                FROM reservations
+                WHERE user_id = %s
+            """, (date.today(), user_id))
+            return dict(cursor.fetchone())
 
     @staticmethod
+    @db.read_only
     def get_user_upcoming_reservations(user_id, limit=5):
         """Get upcoming reservations for a user"""
         today = date.today()
@@ -242,14 +627,19 @@ class ReservationService:
                 UPDATE reservations 
                 SET status = 'cancelled'
                 WHERE id = %s AND user_id = %s
-                RETURNING id
-            """, (reservation_id, user_id))
+                AND reservation_date = (SELECT reservation_date FROM reservation_locator WHERE id = %s)
+                RETURNING id, reservation_date
+            """, (reservation_id, user_id, reservation_id))
             
             cancelled = cursor.fetchone()
-            if cancelled:
-                return True, "Reservación cancelada exitosamente"
-            else:
-                return False, "Reservación no encontrada"
+        if not cancelled:
+            return False, "Reservación no encontrada"
+
+        _count_cache.clear()
+        db.on_commit(lambda: _interval_index.remove(reservation_id))
+        db.on_commit(lambda: _busy_cache.delete(cancelled['reservation_date']))
+        change_feed.publish('reservations', 'updated', reservation_id)
+        return True, "Reservación cancelada exitosamente"
 
     @staticmethod
     def confirm_reservation_usage(reservation_id, user_id):
@@ -259,30 +649,74 @@ class ReservationService:
                 UPDATE reservations 
                 SET status = 'confirmed'
                 WHERE id = %s AND user_id = %s AND status = 'pending'
+                AND reservation_date = (SELECT reservation_date FROM reservation_locator WHERE id = %s)
                 RETURNING id
-            """, (reservation_id, user_id))
+            """, (reservation_id, user_id, reservation_id))
             
             confirmed = cursor.fetchone()
-            if confirmed:
-                return True, "Reservación confirmada exitosamente"
-            else:
-                return False, "Reservación no encontrada o ya no está pendiente"
+        if not confirmed:
+            return False, "Reservación no encontrada o ya no está pendiente"
+
+        _count_cache.clear()
+        change_feed.publish('reservations', 'updated', reservation_id)
+        return True, "Reservación confirmada exitosamente"
+
+    @staticmethod
+    def expire_pending_reservations(batch_size=500, grace_hours=None):
+        """Mark pending reservations whose slot ended before the grace period as expired
+
+        Runs one UPDATE per batch, each committed on its own so row locks stay
+        short; rows locked by a concurrent write are left for the next run.
+        """
+        grace_hours = EXPIRE_PENDING_GRACE_HOURS if grace_hours is None else grace_hours
+        cutoff = datetime.now() - timedelta(hours=grace_hours)
+        expired = 0
+        while True:
+            with db.get_cursor() as cursor:
+                cursor.execute("""
+                    UPDATE reservations
+                    SET status = 'expired'
+                    WHERE (id, reservation_date) IN (
+                        SELECT id, reservation_date
+                        FROM reservations
+                        WHERE status = 'pending'
+                        AND reservation_date <= %s
+                        AND reservation_date + end_time < %s
+                        ORDER BY reservation_date
+                        LIMIT %s
+                        FOR UPDATE SKIP LOCKED
+                    )
+                    RETURNING id, reservation_date
+                """, (cutoff.date(), cutoff, batch_size))
+                rows = cursor.fetchall()
+
+            for row in rows:
+                _interval_index.remove(row['id'])
+            for day in {row['reservation_date'] for row in rows}:
+                _busy_cache.delete(day)
+            expired += len(rows)
+            if len(rows) < batch_size:
+                break
+
+        if expired:
+            _count_cache.clear()
+            change_feed.publish('reservations', 'updated', count=expired)
+        return expired
 
     @staticmethod
+    @db.read_only
     def get_total_reservations_count():
         """Get total number of reservations"""
-        with db.get_cursor() as cursor:
-            cursor.execute("SELECT COUNT(*) FROM reservations")
-            return cursor.fetchone()[0]
+        return CounterService.get_counters('reservations').get('total', 0)
 
     @staticmethod
+    @db.read_only
     def get_pending_reservations_count():
         """Get count of pending reservations"""
-        with db.get_cursor() as cursor:
-            cursor.execute("SELECT COUNT(*) FROM reservations WHERE status = 'pending'")
-            return cursor.fetchone()[0]
+        return CounterService.get_counters('reservations').get('pending', 0)
 
     @staticmethod
+    @db.read_only
     def get_recent_reservations(limit=5):
         """Get recent reservations with user info"""
         with db.get_cursor() as cursor:
@@ -296,3 +730,8 @@ class ReservationService:
             """, (limit,))
             reservations = cursor.fetchall()
             return [dict(reservation) for reservation in reservations]
+
+_interval_index = ReservationIntervalIndex(
+    ReservationService._load_active_intervals,
+    ttl=float(os.environ.get('RESERVATION_INDEX_TTL', 30))
+)
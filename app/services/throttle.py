@@ -0,0 +1,105 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+
+# Login attempts: a burst allowance plus a steady refill rate, per username and per client IP (failures only)
+LOGIN_THROTTLE_USER_BURST = int(os.environ.get('LOGIN_THROTTLE_USER_BURST', 5))
+LOGIN_THROTTLE_USER_PER_MINUTE = float(os.environ.get('LOGIN_THROTTLE_USER_PER_MINUTE', 2))
+LOGIN_THROTTLE_IP_BURST = int(os.environ.get('LOGIN_THROTTLE_IP_BURST', 30))
+LOGIN_THROTTLE_IP_PER_MINUTE = float(os.environ.get('LOGIN_THROTTLE_IP_PER_MINUTE', 20))
+
+
+class TokenBucketThrottle:
+    """Process-local token buckets keyed by an arbitrary string
+
+    Each key holds up to `burst` tokens refilled at `per_minute`; least
+    recently used keys are dropped past max_keys, which at worst hands a
+    forgotten key a full bucket again.
+    """
+
+    def __init__(self, burst, per_minute, max_keys=10000):
+        self.burst = burst
+        self.rate = per_minute / 60.0
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()  # key -> (tokens, updated_at)
+        self.allowed = 0
+        self.throttled = 0
+
+    def _refill(self, key, now):
+        tokens, updated_at = self._buckets.get(key, (self.burst, now))
+        return min(self.burst, tokens + (now - updated_at) * self.rate)
+
+    def retry_after(self, key):
+        """Seconds until key has a token again, 0 when it has one now"""
+        with self._lock:
+            tokens = self._refill(key, time.monotonic())
+        if tokens >= 1:
+            return 0
+        return (1 - tokens) / self.rate if self.rate > 0 else float('inf')
+
+    def consume(self, key):
+        """Take one token; False when the bucket is empty"""
+        now = time.monotonic()
+        with self._lock:
+            tokens = self._refill(key, now)
+            allowed = tokens >= 1
+            if allowed:
+                tokens -= 1
+                self.allowed += 1
+            else:
+                self.throttled += 1
+            self._buckets[key] = (tokens, now)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+            return allowed
+
+    def reset(self, key):
+        with self._lock:
+            self._buckets.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'keys': len(self._buckets),
+                'burst': self.burst,
+                'per_minute': self.rate * 60,
+                'allowed': self.allowed,
+                'throttled': self.throttled
+            }
+
+
+login_user_throttle = TokenBucketThrottle(LOGIN_THROTTLE_USER_BURST, LOGIN_THROTTLE_USER_PER_MINUTE)
+login_ip_throttle = TokenBucketThrottle(LOGIN_THROTTLE_IP_BURST, LOGIN_THROTTLE_IP_PER_MINUTE)
+
+
+def _username_key(username):
+    return (username or '').strip().lower()
+
+
+def check_login_throttle(username, ip):
+    """Charge one login attempt to the username bucket; returns seconds to wait, or 0 when allowed
+
+    The IP bucket is only read here and charged by record_failed_login,
+    so a classroom behind one address logging in correctly never drains it.
+    """
+    user_key = _username_key(username)
+    if not login_user_throttle.consume(user_key):
+        return login_user_throttle.retry_after(user_key)
+    return login_ip_throttle.retry_after(ip or '')
+
+
+def record_failed_login(ip):
+    """Charge a failed attempt to the bucket of the client IP"""
+    login_ip_throttle.consume(ip or '')
+
+
+def clear_login_throttle(username):
+    """Forget the failed attempts of a user who just logged in"""
+    login_user_throttle.reset(_username_key(username))
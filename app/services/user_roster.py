@@ -0,0 +1,44 @@
+import re
+import secrets
+
+ROSTER_FIELDS = ('username', 'email', 'full_name', 'password')
+MIN_PASSWORD_LENGTH = 8
+
+_EMAIL = re.compile(r"^[^@\s]+@[^@\s]+\.[^@\s]+$")
+
+
+def generate_password():
+    """Temporary password for roster rows that do not bring one"""
+    return secrets.token_urlsafe(9)
+
+
+def validate_roster_row(row):
+    """Return (values, None) for a valid student row or (None, message) for an invalid one
+
+    values is a dict of ROSTER_FIELDS; password is None when the row left
+    it empty and one has to be generated.
+    """
+    if not isinstance(row, dict):
+        return None, "Fila con formato inválido"
+
+    values = {}
+    for field in ROSTER_FIELDS:
+        value = row.get(field)
+        if isinstance(value, str):
+            value = value.strip()
+        values[field] = str(value) if value not in ('', None) else None
+
+    for field in ('username', 'email', 'full_name'):
+        if not values[field]:
+            return None, f"Campo requerido faltante: {field}"
+
+    if len(values['username']) > 50 or any(char.isspace() for char in values['username']):
+        return None, "El username debe tener hasta 50 caracteres y no contener espacios"
+    if len(values['email']) > 100 or not _EMAIL.match(values['email']):
+        return None, f"Correo electrónico inválido: {values['email']}"
+    if len(values['full_name']) > 100:
+        return None, "El campo full_name excede 100 caracteres"
+    if values['password'] is not None and len(values['password']) < MIN_PASSWORD_LENGTH:
+        return None, f"La contraseña debe tener al menos {MIN_PASSWORD_LENGTH} caracteres"
+
+    return values, None
@@ -0,0 +1,39 @@
+# Shortest term the trigram indexes can serve; shorter terms still match but scan
+MIN_TRIGRAM_LENGTH = 3
+
+# Each column has its own trigram index (migration 0012), so a term never matches across two fields
+SEARCH_COLUMNS = ('username', 'full_name', 'email')
+
+
+def search_columns(alias=''):
+    """Expressions indexed by idx_users_<column>_trgm, optionally qualified with a table alias"""
+    prefix = f"{alias}." if alias else ''
+    return [f"lower({prefix}{column})" for column in SEARCH_COLUMNS]
+
+
+def escape_like(term):
+    return term.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+
+
+def normalize_term(term):
+    return ' '.join((term or '').split()).lower()
+
+
+def prefix_condition(term, alias=''):
+    """Starts-with match on username, full name or email, served by the lower() pattern indexes"""
+    pattern = f"{escape_like(term)}%"
+    columns = search_columns(alias)
+    return "(" + " OR ".join(f"{column} LIKE %s" for column in columns) + ")", [pattern] * len(columns)
+
+
+def search_condition(term, alias=''):
+    """SQL condition and params for the list filters' `search` argument
+
+    A case-insensitive contains match on username, full name or email,
+    like the ILIKE filters it replaces. Terms of MIN_TRIGRAM_LENGTH or more
+    are served by the per-column trigram indexes; shorter ones, which
+    trigrams cannot narrow down, scan.
+    """
+    pattern = f"%{escape_like(normalize_term(term))}%"
+    columns = search_columns(alias)
+    return "(" + " OR ".join(f"{column} LIKE %s" for column in columns) + ")", [pattern] * len(columns)
@@ -1,11 +1,61 @@
+import os
+import psycopg2.extras
 from app.database import db
-from werkzeug.security import generate_password_hash, check_password_hash
+from app.services.cache import TTLCache, VersionCache
+from app.services.change_feed import ChangeListener
+from app.services.counter_service import CounterService
+from app.services.pagination import fetch_keyset_page, fetch_offset_page, make_count_cache
+from app.services.password_hashing import PasswordPoolBusy, password_hasher
+from app.services.user_roster import generate_password, validate_roster_row
+from app.services.user_search import (
+    MIN_TRIGRAM_LENGTH, escape_like, normalize_term, prefix_condition, search_columns, search_condition
+)
+
+_count_cache = make_count_cache()
+
+# Users loaded by the auth middleware on every request; the TTL bounds how long
+# another worker may keep serving a changed user without cross-worker invalidation
+_user_cache = TTLCache(
+    ttl=float(os.environ.get('USER_CACHE_TTL', 30)),
+    max_size=int(os.environ.get('USER_CACHE_MAX_SIZE', 2048))
+)
+
+# 'postgres' sends invalidations to every worker through LISTEN/NOTIFY, 'none' relies on the TTL
+USER_CACHE_INVALIDATION = os.environ.get('USER_CACHE_INVALIDATION', 'none').lower()
+USER_CACHE_CHANNEL = 'user_cache'
+
+_user_cache_listener = ChangeListener(
+    USER_CACHE_CHANNEL,
+    lambda payload: _user_cache.delete(int(payload)),
+    on_reconnect=_user_cache.clear
+) if USER_CACHE_INVALIDATION == 'postgres' else None
+
+# Versions checked against signed session snapshots; a snapshot whose user changed
+# on another worker is rejected at most this many seconds later
+AUTH_VERSION_MAX_STALENESS = float(os.environ.get('AUTH_VERSION_MAX_STALENESS', 5))
+_auth_versions = VersionCache(
+    lambda user_ids: UserService.get_auth_versions(user_ids),
+    max_age=AUTH_VERSION_MAX_STALENESS
+)
+
+# Dedicated processes hashing a roster's passwords; unset shares the login pool, as web workers should.
+# scripts/provision_students.py uses every core unless told otherwise
+PROVISION_HASH_WORKERS = int(os.environ['PROVISION_HASH_WORKERS']) if os.environ.get('PROVISION_HASH_WORKERS') else None
+# Optional cheaper method for roster hashes (e.g. 'pbkdf2:sha256:100000'); each one is
+# replaced with PASSWORD_HASH_METHOD the first time its student logs in
+PROVISION_HASH_METHOD = os.environ.get('PROVISION_HASH_METHOD') or None
+
+SNAPSHOT_FIELDS = ('id', 'username', 'email', 'full_name', 'is_admin', 'is_active', 'auth_version')
 
 class UserService:
 
     @staticmethod
     def authenticate(username, password):
-        """Authenticate user"""
+        """Authenticate user, verifying the password in the hashing pool
+
+        Raises PasswordPoolBusy (or TimeoutError) when the pool is saturated.
+        Hashes made with outdated parameters are replaced on success.
+        """
         with db.get_cursor() as cursor:
             cursor.execute("""
                 SELECT id, username, email, full_name, password_hash, is_admin, is_active
@@ -14,19 +64,38 @@ class UserService:
             """, (username,))
             
             user = cursor.fetchone()
-            if user and check_password_hash(user['password_hash'], password):
-                return {
-                    'id': user['id'],
-                    'username': user['username'],
-                    'email': user['email'],
-                    'full_name': user['full_name'],
-                    'is_admin': user['is_admin']
-                }
+        if not user or not password_hasher.verify(user['password_hash'], password):
             return None
+        
+        if password_hasher.needs_rehash(user['password_hash']):
+            UserService._rehash_password(user['id'], user['password_hash'], password)
+        return {
+            'id': user['id'],
+            'username': user['username'],
+            'email': user['email'],
+            'full_name': user['full_name'],
+            'is_admin': user['is_admin']
+        }
+
+    @staticmethod
+    def _rehash_password(user_id, old_hash, password):
+        """Store a hash with the current parameters unless the password changed meanwhile"""
+        try:
+            new_hash = password_hasher.hash(password)
+        except (PasswordPoolBusy, TimeoutError):
+            # The old hash still works; the next login tries again
+            return
+        with db.get_cursor() as cursor:
+            # Same password, so auth_version is left alone and sessions stay valid
+            cursor.execute("""
+                UPDATE users SET password_hash = %s
+                WHERE id = %s AND password_hash = %s
+            """, (new_hash, user_id, old_hash))
     
     @staticmethod
-    def get_all_users(search=None, status=None, role=None, page=1, per_page=15):
-        """Get all users with optional filtering and pagination"""
+    @db.read_only
+    def get_all_users(search=None, status=None, role=None, page=1, per_page=15, cursor=None, count_mode='window'):
+        """Get all users with optional filtering and pagination (keyset when cursor is given)"""
         query = """
             SELECT id, username, email, full_name, is_admin, is_active, created_at
             FROM users 
@@ -36,10 +105,10 @@ class UserService:
         params = []
         
         if search:
-            query += " AND (username ILIKE %s OR email ILIKE %s OR full_name ILIKE %s)"
-            count_query += " AND (username ILIKE %s OR email ILIKE %s OR full_name ILIKE %s)"
-            search_term = f"%{search}%"
-            params.extend([search_term, search_term, search_term])
+            condition, search_params = search_condition(search)
+            query += f" AND {condition}"
+            count_query += f" AND {condition}"
+            params.extend(search_params)
         
         if status == 'active':
             query += " AND is_active = TRUE"
@@ -55,108 +124,348 @@ class UserService:
             query += " AND is_admin = FALSE"
             count_query += " AND is_admin = FALSE"
         
-        query += " ORDER BY id ASC"
-        
-        offset = (page - 1) * per_page
-        query += " LIMIT %s OFFSET %s"
-        params.extend([per_page, offset])
-        
-        with db.get_cursor() as cursor:
-            cursor.execute(count_query, params[:len(params)-2])  # Exclude LIMIT and OFFSET params
-            total_count = cursor.fetchone()[0]
-
-            cursor.execute(query, params)
-            users = cursor.fetchall()
-            
+        if cursor is not None:
+            users, next_cursor, has_more = fetch_keyset_page(
+                'users_keyset', query, params, ['id'], ['id'], cursor, per_page
+            )
             return {
-                'users': [dict(user) for user in users],
-                'total_count': total_count,
-                'page': page,
+                'users': users,
                 'per_page': per_page,
-                'total_pages': (total_count + per_page - 1) // per_page
+                'next_cursor': next_cursor,
+                'has_more': has_more
             }
+        
+        filtered = bool(search) or status in ('active', 'inactive') or role in ('admin', 'user')
+        result = fetch_offset_page(
+            'users_page', query, count_query, params, 'id ASC', page, per_page,
+            count_cache=_count_cache,
+            estimate_table='users' if count_mode == 'estimate' and not filtered else None
+        )
+        result['users'] = result.pop('rows')
+        return result
     
     @staticmethod
+    @db.read_only
+    def search_users(term, limit=10, active_only=False):
+        """Ranked type-ahead matches for term
+
+        Prefix matches come first and are answered from the btree prefix
+        indexes alone; only when they do not fill the limit, terms long
+        enough for trigrams add contains and fuzzy matches ranked by word
+        similarity.
+        """
+        term = normalize_term(term)
+        if not term:
+            return []
+        active_filter = " AND is_active = TRUE" if active_only else ""
+        columns = "id, username, email, full_name, is_admin, is_active"
+
+        condition, params = prefix_condition(term)
+        pattern = params[0]
+        with db.get_cursor() as cursor:
+            cursor.execute(f"""
+                SELECT {columns}
+                FROM users
+                WHERE {condition}{active_filter}
+                ORDER BY
+                    CASE
+                        WHEN lower(username) = %s THEN 0
+                        WHEN lower(username) LIKE %s THEN 1
+                        WHEN lower(full_name) LIKE %s THEN 2
+                        ELSE 3
+                    END,
+                    full_name, id
+                LIMIT %s
+            """, params + [term, pattern, pattern, limit])
+            users = [dict(user) for user in cursor.fetchall()]
+
+        if len(users) >= limit or len(term) < MIN_TRIGRAM_LENGTH:
+            return users
+
+        texts = search_columns()
+        matches = " OR ".join(f"{text} LIKE %s OR %s <%% {text}" for text in texts)
+        similarity = ", ".join(f"word_similarity(%s, {text})" for text in texts)
+        with db.get_cursor() as cursor:
+            # <% is pg_trgm's word similarity operator: it also catches small typos
+            cursor.execute(f"""
+                SELECT {columns}
+                FROM users
+                WHERE ({matches})
+                AND id <> ALL(%s){active_filter}
+                ORDER BY GREATEST({similarity}) DESC, full_name, id
+                LIMIT %s
+            """, [f"%{escape_like(term)}%", term] * len(texts) + [[user['id'] for user in users]]
+                 + [term] * len(texts) + [limit - len(users)])
+            users.extend(dict(user) for user in cursor.fetchall())
+        return users
+
+    @staticmethod
+    @db.read_only
     def get_user_by_id(user_id):
         """Get user by ID"""
+        return UserService.get_user_for_auth(user_id)
+
+    @staticmethod
+    def get_user_for_auth(user_id):
+        """Get user by ID from the primary
+
+        Not read_only on purpose: a replica may still show a deactivated
+        user as active, and the answer is then cached or trusted for a while.
+        """
         with db.get_cursor() as cursor:
-            cursor.execute("""
-                SELECT id, username, email, full_name, is_admin, is_active, created_at
+            db.prepared.execute(cursor, 'user_by_id', """
+                SELECT id, username, email, full_name, is_admin, is_active, auth_version, created_at
                 FROM users 
                 WHERE id = %s
             """, (user_id,))
             user = cursor.fetchone()
             return dict(user) if user else None
+
+    @staticmethod
+    def get_authenticated_user(user_id):
+        """Get the user for the auth middleware, served from the process-local cache when fresh"""
+        if _user_cache_listener is not None:
+            _user_cache_listener.ensure_started()
+        user = _user_cache.get(user_id)
+        if user is None:
+            user = UserService.get_user_for_auth(user_id)
+            if user is None:
+                return None
+            _user_cache.set(user_id, user)
+        # Callers get their own copy so nothing leaks into the shared entry
+        return dict(user)
+
+    @staticmethod
+    def get_auth_versions(user_ids):
+        """Current auth_version of each of the given users that still exists
+
+        Read from the primary: replica lag would add to AUTH_VERSION_MAX_STALENESS.
+        """
+        with db.get_cursor() as cursor:
+            db.prepared.execute(cursor, 'user_auth_versions', """
+                SELECT id, auth_version FROM users WHERE id = ANY(%s)
+            """, (list(user_ids),))
+            return {row['id']: row['auth_version'] for row in cursor.fetchall()}
+
+    @staticmethod
+    def get_auth_version(user_id):
+        """auth_version of a user, at most AUTH_VERSION_MAX_STALENESS seconds old"""
+        return _auth_versions.get(user_id)
+
+    @staticmethod
+    def remember_auth_version(user_id, auth_version):
+        _auth_versions.set(user_id, auth_version)
+
+    @staticmethod
+    def session_snapshot(user):
+        """Compact copy of a user to keep in the signed session cookie"""
+        return {field: user[field] for field in SNAPSHOT_FIELDS}
+
+    @staticmethod
+    def invalidate_cached_user(user_id, auth_version=None):
+        """Drop a user from the cache of this worker and, when enabled, of every other worker
+
+        auth_version is the bumped version, recorded locally on commit so this
+        worker rejects older session snapshots right away.
+        """
+        _user_cache.delete(user_id)
+
+        def on_commit():
+            # Dropped again on commit so a request racing the write cannot re-cache the old row
+            _user_cache.delete(user_id)
+            if auth_version is not None:
+                _auth_versions.set(user_id, auth_version)
+
+        db.on_commit(on_commit)
+        if _user_cache_listener is not None:
+            # NOTIFY is delivered on commit, together with the change itself
+            with db.get_cursor() as cursor:
+                cursor.execute("SELECT pg_notify(%s, %s)", (USER_CACHE_CHANNEL, str(user_id)))
+
+    @staticmethod
+    def get_user_cache_stats():
+        return dict(
+            _user_cache.stats(),
+            invalidation=USER_CACHE_INVALIDATION,
+            auth_versions=_auth_versions.stats()
+        )
     
+    @staticmethod
+    def provision_users(rows, batch_size=500, dry_run=False, hash_workers=None):
+        """Create student accounts from (row_number, row) pairs and report the outcome of every row
+
+        Rows are validated in one pass, duplicates inside the roster and
+        against existing users are found with a single set-based query,
+        passwords are hashed in parallel and the new users are inserted in
+        batches inside one transaction. Row statuses are created, invalid,
+        duplicate (repeated in the roster), exists (already registered) or,
+        with dry_run, ready.
+        """
+        report = {'total_rows': 0, 'created': 0, 'error_count': 0, 'duplicate_count': 0, 'rows': []}
+        pending = []
+        seen_usernames, seen_emails = set(), set()
+
+        for row_number, row in rows:
+            report['total_rows'] += 1
+            values, error = validate_roster_row(row)
+            entry = {'row': row_number, 'username': row.get('username') if isinstance(row, dict) else None}
+            report['rows'].append(entry)
+            if error:
+                entry.update(status='invalid', message=error)
+                report['error_count'] += 1
+                continue
+
+            username_key, email_key = values['username'].lower(), values['email'].lower()
+            if username_key in seen_usernames or email_key in seen_emails:
+                entry.update(status='duplicate', message="Username o correo repetido en el archivo")
+                report['duplicate_count'] += 1
+                continue
+            seen_usernames.add(username_key)
+            seen_emails.add(email_key)
+            pending.append((entry, values))
+
+        if pending:
+            with db.get_cursor() as cursor:
+                # Served by the lower() indexes on username and email
+                cursor.execute("""
+                    SELECT lower(username) AS username, lower(email) AS email
+                    FROM users
+                    WHERE lower(username) = ANY(%s) OR lower(email) = ANY(%s)
+                """, ([values['username'].lower() for _, values in pending],
+                      [values['email'].lower() for _, values in pending]))
+                existing = cursor.fetchall()
+            taken_usernames = {row['username'] for row in existing}
+            taken_emails = {row['email'] for row in existing}
+
+            fresh = []
+            for entry, values in pending:
+                if values['username'].lower() in taken_usernames or values['email'].lower() in taken_emails:
+                    entry.update(status='exists', message="El username o el correo electrónico ya existen")
+                    report['duplicate_count'] += 1
+                else:
+                    fresh.append((entry, values))
+            pending = fresh
+
+        if dry_run or not pending:
+            for entry, _ in pending:
+                entry['status'] = 'ready'
+            return report
+
+        for entry, values in pending:
+            if values['password'] is None:
+                values['password'] = generate_password()
+                entry['temporary_password'] = values['password']
+        hashes = password_hasher.hash_many(
+            [values['password'] for _, values in pending],
+            workers=PROVISION_HASH_WORKERS if hash_workers is None else hash_workers,
+            method=PROVISION_HASH_METHOD
+        )
+
+        created = {}
+        with db.transaction():
+            with db.get_cursor() as cursor:
+                for offset in range(0, len(pending), batch_size):
+                    batch = pending[offset:offset + batch_size]
+                    rows_created = psycopg2.extras.execute_values(cursor, """
+                        INSERT INTO users (username, email, password_hash, full_name)
+                        VALUES %s
+                        ON CONFLICT DO NOTHING
+                        RETURNING id, username
+                    """, [(values['username'], values['email'], password_hash, values['full_name'])
+                          for (_, values), password_hash in zip(batch, hashes[offset:offset + batch_size])],
+                        page_size=batch_size, fetch=True)
+                    created.update({row['username']: row['id'] for row in rows_created})
+
+        for entry, values in pending:
+            if values['username'] in created:
+                entry.update(status='created', id=created[values['username']])
+                report['created'] += 1
+            else:
+                # Registered by someone else between the duplicate check and the insert
+                entry.update(status='exists', message="El username o el correo electrónico ya existen")
+                entry.pop('temporary_password', None)
+                report['duplicate_count'] += 1
+
+        if report['created']:
+            _count_cache.clear()
+        return report
+
     @staticmethod
     def create_user(username, email, password, full_name, is_admin=False):
         """Create new user"""
-        with db.get_cursor() as cursor:
-            cursor.execute("""
-                SELECT id FROM users WHERE username = %s OR email = %s
-            """, (username, email))
-            existing_user = cursor.fetchone()
-            
-            if existing_user:
-                return None, "El username o el correo electrónico ya existen"
-        
-        password_hash = generate_password_hash(password)
-        
-        with db.get_cursor() as cursor:
-            cursor.execute("""
-                INSERT INTO users (username, email, password_hash, full_name, is_admin)
-                VALUES (%s, %s, %s, %s, %s)
-                RETURNING id, username, email, full_name, is_admin, is_active, created_at
-            """, (username, email, password_hash, full_name, is_admin))
+        password_hash = password_hasher.hash(password)
+
+        with db.transaction():
+            with db.get_cursor() as cursor:
+                cursor.execute("""
+                    SELECT id FROM users WHERE username = %s OR email = %s
+                """, (username, email))
+                existing_user = cursor.fetchone()
+                
+                if existing_user:
+                    return None, "El username o el correo electrónico ya existen"
             
-            user = cursor.fetchone()
-            return dict(user), "Usuario creado exitosamente"
+            with db.get_cursor() as cursor:
+                cursor.execute("""
+                    INSERT INTO users (username, email, password_hash, full_name, is_admin)
+                    VALUES (%s, %s, %s, %s, %s)
+                    RETURNING id, username, email, full_name, is_admin, is_active, created_at
+                """, (username, email, password_hash, full_name, is_admin))
+                
+                user = cursor.fetchone()
+                _count_cache.clear()
+                return dict(user), "Usuario creado exitosamente"
     
     @staticmethod
     def update_user(user_id, username, email, full_name, is_admin, is_active):
         """Update user information"""
-        with db.get_cursor() as cursor:
-            cursor.execute("""
-                SELECT id FROM users 
-                WHERE (username = %s OR email = %s) AND id != %s
-            """, (username, email, user_id))
-            existing_user = cursor.fetchone()
-            
-            if existing_user:
-                return None, "El username o el correo electrónico ya existen"
+        with db.transaction():
+            with db.get_cursor() as cursor:
+                cursor.execute("""
+                    SELECT id FROM users 
+                    WHERE (username = %s OR email = %s) AND id != %s
+                """, (username, email, user_id))
+                existing_user = cursor.fetchone()
+                
+                if existing_user:
+                    return None, "El username o el correo electrónico ya existen"
 
-        with db.get_cursor() as cursor:
-            cursor.execute("""
-                UPDATE users 
-                SET username = %s, email = %s, full_name = %s, is_admin = %s, is_active = %s
-                WHERE id = %s
-                RETURNING id, username, email, full_name, is_admin, is_active, created_at
-            """, (username, email, full_name, is_admin, is_active, user_id))
-            
-            user = cursor.fetchone()
-            if user:
-                return dict(user), "Usuario actualizado exitosamente"
-            else:
+            with db.get_cursor() as cursor:
+                cursor.execute("""
+                    UPDATE users 
+                    SET username = %s, email = %s, full_name = %s, is_admin = %s, is_active = %s,
+                        auth_version = auth_version + 1
+                    WHERE id = %s
+                    RETURNING id, username, email, full_name, is_admin, is_active, auth_version, created_at
+                """, (username, email, full_name, is_admin, is_active, user_id))
+                
+                user = cursor.fetchone()
+            if not user:
                 return None, "Usuario no encontrado"
+
+            _count_cache.clear()
+            UserService.invalidate_cached_user(user_id, user['auth_version'])
+            return dict(user), "Usuario actualizado exitosamente"
     
     @staticmethod
     def change_password(user_id, new_password):
         """Change user password"""
-        password_hash = generate_password_hash(new_password)
+        password_hash = password_hasher.hash(new_password)
         
         with db.get_cursor() as cursor:
             cursor.execute("""
                 UPDATE users 
-                SET password_hash = %s 
+                SET password_hash = %s, auth_version = auth_version + 1
                 WHERE id = %s
-                RETURNING id
+                RETURNING id, auth_version
             """, (password_hash, user_id))
             
             updated = cursor.fetchone()
-            if updated:
-                return True, "Contraseña actualizada exitosamente"
-            else:
-                return False, "Usuario no encontrado"
+        if not updated:
+            return False, "Usuario no encontrado"
+
+        UserService.invalidate_cached_user(user_id, updated['auth_version'])
+        return True, "Contraseña actualizada exitosamente"
     
     @staticmethod
     def toggle_user_status(user_id):
@@ -164,17 +473,19 @@ class UserService:
         with db.get_cursor() as cursor:
             cursor.execute("""
                 UPDATE users 
-                SET is_active = NOT is_active 
+                SET is_active = NOT is_active, auth_version = auth_version + 1
                 WHERE id = %s
-                RETURNING id, is_active
+                RETURNING id, is_active, auth_version
             """, (user_id,))
             
             result = cursor.fetchone()
-            if result:
-                new_status = "activado" if result['is_active'] else "desactivado"
-                return True, f"Usuario {new_status} exitosamente"
-            else:
-                return False, "Usuario no encontrado"
+        if not result:
+            return False, "Usuario no encontrado"
+
+        _count_cache.clear()
+        UserService.invalidate_cached_user(user_id, result['auth_version'])
+        new_status = "activado" if result['is_active'] else "desactivado"
+        return True, f"Usuario {new_status} exitosamente"
     
     @staticmethod
     def delete_user(user_id):
@@ -182,20 +493,49 @@ class UserService:
         with db.get_cursor() as cursor:
             cursor.execute("""
                 UPDATE users 
-                SET is_active = FALSE 
+                SET is_active = FALSE, auth_version = auth_version + 1
                 WHERE id = %s
-                RETURNING id
+                RETURNING id, auth_version
             """, (user_id,))
             
             deleted = cursor.fetchone()
-            if deleted:
-                return True, "Usuario desactivado correctamente"
-            else:
-                return False, "Usuario no encontrado"
+        if not deleted:
+            return False, "Usuario no encontrado"
+
+        _count_cache.clear()
+        UserService.invalidate_cached_user(user_id, deleted['auth_version'])
+        return True, "Usuario desactivado correctamente"
             
     @staticmethod
+    @db.read_only
+    def get_user_picker_page(search=None, cursor=None, per_page=20):
+        """One keyset page of active users ordered by name, optionally filtered by search"""
+        query = """
+            SELECT id, full_name
+            FROM users
+            WHERE is_active = TRUE
+        """
+        params = []
+        
+        if search:
+            condition, search_params = search_condition(search)
+            query += f" AND {condition}"
+            params.extend(search_params)
+        
+        users, next_cursor, has_more = fetch_keyset_page(
+            'user_picker', query, params, ['full_name', 'id'], ['full_name', 'id'], cursor, per_page
+        )
+        return {
+            'users': users,
+            'per_page': per_page,
+            'next_cursor': next_cursor,
+            'has_more': has_more
+        }
+
+    @staticmethod
+    @db.read_only
     def get_active_users():
-        """Get all active users for dropdowns"""
+        """Get all active users for dropdowns (legacy full list, see get_user_picker_page)"""
         with db.get_cursor() as cursor:
             cursor.execute("""
                 SELECT id, username, email, full_name
@@ -207,8 +547,7 @@ class UserService:
             return [dict(user) for user in users]
 
     @staticmethod
+    @db.read_only
     def get_total_users_count():
         """Get total number of users"""
-        with db.get_cursor() as cursor:
-            cursor.execute("SELECT COUNT(*) FROM users")
-            return cursor.fetchone()[0]
+        return CounterService.get_counters('users').get('total', 0)
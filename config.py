@@ -8,6 +8,12 @@ class Config:
     DEBUG = False
     TESTING = False
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY') 
+    DB_SERVER_TIMING = os.getenv('DB_SERVER_TIMING', 'true').lower() == 'true'
+    DB_REQUEST_SCOPED = os.getenv('DB_REQUEST_SCOPED', 'true').lower() == 'true'
+    JOBS_ENABLED = os.getenv('JOBS_ENABLED', 'false').lower() == 'true'
+    SESSION_USER_SNAPSHOT = os.getenv('SESSION_USER_SNAPSHOT', 'false').lower() == 'true'
+    # Reverse proxies (e.g. nginx) in front of the app whose X-Forwarded-For/-Proto are trusted
+    TRUSTED_PROXY_COUNT = int(os.getenv('TRUSTED_PROXY_COUNT', 0))
 
 class DevelopmentConfig(Config):
     DEBUG = True
@@ -0,0 +1,70 @@
+import sys
+import os
+import time
+import random
+import argparse
+import threading
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from app.database import db
+from app.services.reservation_service import ReservationService
+
+def burst(check, dates, threads, checks_per_thread):
+    """Fire concurrent conflict checks and return per-call latencies in ms"""
+    samples = []
+    lock = threading.Lock()
+    start_signal = threading.Event()
+
+    def worker(seed):
+        rng = random.Random(seed)
+        local = []
+        start_signal.wait()
+        for _ in range(checks_per_thread):
+            hour = rng.randint(7, 19)
+            started = time.perf_counter()
+            check(rng.choice(dates), f"{hour:02d}:00", f"{hour + 1:02d}:00")
+            local.append((time.perf_counter() - started) * 1000)
+        with lock:
+            samples.extend(local)
+
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    start_signal.set()
+    for thread in workers:
+        thread.join()
+    return sorted(samples)
+
+def report(label, samples):
+    print(f"  {label:<14} p50={samples[len(samples) // 2]:.3f}ms "
+          f"p95={samples[int(len(samples) * 0.95) - 1]:.3f}ms "
+          f"p99={samples[int(len(samples) * 0.99) - 1]:.3f}ms max={samples[-1]:.3f}ms")
+
+def main():
+    """Compare conflict-check latency of the database query and the interval index under bursts"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--threads', type=int, default=16)
+    parser.add_argument('--checks', type=int, default=200, help='Checks per thread')
+    parser.add_argument('--days', type=int, default=5, help='Distinct dates the burst targets')
+    args = parser.parse_args()
+
+    dates = [(date.today() + timedelta(days=i)).isoformat() for i in range(args.days)]
+
+    try:
+        print(f"{args.threads} threads x {args.checks} checks over {args.days} dates")
+        report('database', burst(ReservationService._check_time_conflict, dates, args.threads, args.checks))
+        report('interval index', burst(ReservationService.has_time_conflict, dates, args.threads, args.checks))
+        print(f"  index stats: {ReservationService.get_interval_index_stats()}")
+    except Exception as e:
+        print(f"Error running benchmark: {e}")
+        sys.exit(1)
+    finally:
+        db.close_pool()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+import sys
+import os
+import time
+import argparse
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import psycopg2.extras
+from app.database import db
+from app.services.counter_service import CounterService
+
+USERNAME_PREFIX = 'bench-counters-'
+
+LEGACY_QUERIES = [
+    "SELECT COUNT(*) FROM users",
+    "SELECT COUNT(*) FROM reservations",
+    "SELECT COUNT(*) FROM reservations WHERE status = 'pending'",
+    "SELECT item_type, COUNT(*) FROM inventory_items GROUP BY item_type",
+    "SELECT status, COUNT(*) FROM inventory_items GROUP BY status",
+]
+
+def seed(rows, batch_size):
+    """Insert `rows` cancelled reservations for a throwaway user; returns (user_id, seconds)"""
+    with db.get_cursor() as cursor:
+        tag = f"{USERNAME_PREFIX}{int(time.time() * 1000)}"
+        cursor.execute("""
+            INSERT INTO users (username, email, password_hash, full_name)
+            VALUES (%s, %s, 'x', 'Benchmark Counters')
+            RETURNING id
+        """, (tag, f"{tag}@bench.local"))
+        user_id = cursor.fetchone()['id']
+
+    # Cancelled rows are outside the overlap constraint, so they can share slots
+    base_date = date.today() + timedelta(days=3650)
+    started = time.perf_counter()
+    for offset in range(0, rows, batch_size):
+        count = min(batch_size, rows - offset)
+        with db.get_cursor() as cursor:
+            psycopg2.extras.execute_values(cursor, """
+                INSERT INTO reservations (user_id, reservation_date, start_time, end_time, status)
+                VALUES %s
+            """, [(user_id, base_date + timedelta(days=(offset + i) % 365), '10:00', '11:00', 'cancelled')
+                  for i in range(count)], page_size=batch_size)
+    return user_id, time.perf_counter() - started
+
+def timed(func, iterations):
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2], samples[int(len(samples) * 0.95) - 1]
+
+def legacy_dashboard():
+    with db.get_cursor() as cursor:
+        for query in LEGACY_QUERIES:
+            cursor.execute(query)
+            cursor.fetchall()
+
+def cleanup(user_id):
+    with db.get_cursor() as cursor:
+        cursor.execute("DELETE FROM reservations WHERE user_id = %s", (user_id,))
+        cursor.execute("DELETE FROM users WHERE id = %s", (user_id,))
+
+def main():
+    """Compare full-table dashboard counts with the trigger-maintained counters"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--rows', type=int, default=1000000, help='Reservations to add before measuring')
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--iterations', type=int, default=20)
+    args = parser.parse_args()
+
+    user_id = None
+    try:
+        user_id, elapsed = seed(args.rows, args.batch_size)
+        print(f"seeded {args.rows} reservations in {elapsed:.1f}s (triggers included)")
+
+        legacy_p50, legacy_p95 = timed(legacy_dashboard, args.iterations)
+        counters_p50, counters_p95 = timed(CounterService.get_counters, args.iterations)
+        print(f"COUNT/GROUP BY: p50={legacy_p50:.2f}ms p95={legacy_p95:.2f}ms")
+        print(f"counters:       p50={counters_p50:.2f}ms p95={counters_p95:.2f}ms")
+
+        drift = CounterService.check_consistency()
+        print("counters consistent" if not drift else f"drift: {drift}")
+    except Exception as e:
+        print(f"Error running benchmark: {e}")
+        sys.exit(1)
+    finally:
+        if user_id is not None:
+            cleanup(user_id)
+        db.close_pool()
+
+if __name__ == '__main__':
+    main()
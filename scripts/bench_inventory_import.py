@@ -0,0 +1,62 @@
+import sys
+import os
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from app.database import db
+from app.services.inventory_service import InventoryService
+
+PREFIX = 'bench-import-'
+
+def generate_rows(count, tag):
+    item_types = list(InventoryService.ITEM_TYPES)
+    for i in range(count):
+        yield i + 1, {
+            'identificador': f"{PREFIX}{tag}-{i:06d}",
+            'item_type': item_types[i % len(item_types)],
+            'brand': 'Bench',
+            'model': f"M{i % 50}",
+            'status': 'available'
+        }
+
+def cleanup():
+    with db.get_cursor() as cursor:
+        cursor.execute("DELETE FROM inventory_items WHERE identificador LIKE %s", (f"{PREFIX}%",))
+
+def main():
+    """Compare the per-row create_item path with the batched import"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--per-row-sample', type=int, default=500,
+                        help='Rows inserted one by one; the total is extrapolated')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    args = parser.parse_args()
+
+    try:
+        sample = min(args.per_row_sample, args.rows)
+        started = time.perf_counter()
+        for _, row in generate_rows(sample, 'single'):
+            InventoryService.create_item(**row)
+        per_row = (time.perf_counter() - started) / sample
+        print(f"create_item:  {per_row * 1000:.3f} ms/row, "
+              f"~{per_row * args.rows:.1f}s estimated for {args.rows} rows")
+
+        started = time.perf_counter()
+        report = InventoryService.import_items(generate_rows(args.rows, 'bulk'), batch_size=args.batch_size)
+        elapsed = time.perf_counter() - started
+        print(f"import_items: {elapsed:.2f}s for {report['inserted']} rows "
+              f"({report['inserted'] / elapsed:.0f} rows/s, batch size {args.batch_size})")
+    except Exception as e:
+        print(f"Error running benchmark: {e}")
+        sys.exit(1)
+    finally:
+        cleanup()
+        db.close_pool()
+
+if __name__ == '__main__':
+    main()
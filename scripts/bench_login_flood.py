@@ -0,0 +1,121 @@
+import sys
+import os
+import time
+import argparse
+import threading
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import psycopg2.extras
+from app import create_app
+from app.database import db
+from app.services.password_hashing import password_hasher
+from app.services.throttle import login_ip_throttle, login_user_throttle
+
+USERNAME_PREFIX = 'bench-login-'
+PASSWORD = 'bench-password'
+
+OUTCOMES = {302: 'ok', 200: 'rejected', 429: 'throttled', 503: 'busy'}
+
+def seed(users):
+    """Insert throwaway users sharing one password hash; returns their usernames"""
+    tag = f"{USERNAME_PREFIX}{int(time.time() * 1000)}-"
+    password_hash = password_hasher.hash(PASSWORD)
+    usernames = [f"{tag}{i}" for i in range(users)]
+    with db.get_cursor() as cursor:
+        psycopg2.extras.execute_values(cursor, """
+            INSERT INTO users (username, email, password_hash, full_name)
+            VALUES %s
+        """, [(username, f"{username}@bench.local", password_hash, 'Benchmark Login') for username in usernames])
+    return usernames
+
+def scenario_requests(name, usernames, count):
+    """(username, password, client ip) for every request of a scenario"""
+    if name == 'class-start':
+        # Students of one class logging in correctly from their own machines
+        return [(usernames[i % len(usernames)], PASSWORD, f"10.0.{i // 250 % 250}.{i % 250}") for i in range(count)]
+    if name == 'stuffing':
+        # Wrong passwords for many accounts from a single address
+        return [(usernames[i % len(usernames)], f"guess-{i}", '203.0.113.7') for i in range(count)]
+    if name == 'single-account':
+        # Guessing one account's password from rotating addresses
+        return [(usernames[0], f"guess-{i}", f"198.51.100.{i % 250}") for i in range(count)]
+    raise ValueError(f"Unknown scenario: {name}")
+
+def run(app, attempts, concurrency):
+    """Send the attempts from `concurrency` threads; returns (seconds, latencies in ms, status counts)"""
+    latencies = []
+    statuses = Counter()
+    lock = threading.Lock()
+    position = iter(range(len(attempts)))
+
+    def worker():
+        client = app.test_client()
+        while True:
+            with lock:
+                index = next(position, None)
+            if index is None:
+                return
+            username, password, ip = attempts[index]
+            started = time.perf_counter()
+            response = client.post('/login', data={'username': username, 'password': password},
+                                   environ_base={'REMOTE_ADDR': ip})
+            elapsed = (time.perf_counter() - started) * 1000
+            with lock:
+                latencies.append(elapsed)
+                statuses[OUTCOMES.get(response.status_code, response.status_code)] += 1
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - started, sorted(latencies), statuses
+
+def cleanup(usernames):
+    with db.get_cursor() as cursor:
+        cursor.execute("DELETE FROM users WHERE username = ANY(%s)", (usernames,))
+
+def main():
+    """Flood /login with concurrent attempts and report throughput, latency and how requests were turned away"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--requests', type=int, default=300, help='Login attempts per scenario')
+    parser.add_argument('--concurrency', type=int, default=32, help='Request threads')
+    parser.add_argument('--users', type=int, default=100, help='Throwaway accounts to create')
+    parser.add_argument('--scenario', choices=['class-start', 'stuffing', 'single-account', 'all'], default='all')
+    parser.add_argument('--no-throttle', action='store_true', help='Lift the login token buckets to see raw pool behaviour')
+    args = parser.parse_args()
+
+    usernames = []
+    try:
+        app = create_app()
+        usernames = seed(args.users)
+        if args.no_throttle:
+            login_user_throttle.burst = login_ip_throttle.burst = 10 ** 9
+
+        print(f"password pool: {password_hasher.stats()}")
+        scenarios = ['class-start', 'stuffing', 'single-account'] if args.scenario == 'all' else [args.scenario]
+        for name in scenarios:
+            login_user_throttle.clear()
+            login_ip_throttle.clear()
+            elapsed, latencies, statuses = run(app, scenario_requests(name, usernames, args.requests), args.concurrency)
+            p50 = latencies[len(latencies) // 2]
+            p95 = latencies[max(int(len(latencies) * 0.95) - 1, 0)]
+            outcome = ', '.join(f"{key}={value}" for key, value in sorted(statuses.items(), key=str))
+            print(f"{name:15} {len(latencies) / elapsed:8.1f} req/s  p50={p50:.1f}ms p95={p95:.1f}ms  {outcome}")
+    except Exception as e:
+        print(f"Error running benchmark: {e}")
+        sys.exit(1)
+    finally:
+        if usernames:
+            cleanup(usernames)
+        password_hasher.shutdown()
+        db.close_pool()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+import sys
+import os
+import time
+import statistics
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from app.database import db
+from app.services.user_service import UserService
+from app.services.reservation_service import ReservationService
+
+def measure(label, func, iterations):
+    """Run func repeatedly and print latency percentiles in milliseconds"""
+    func()  # Warm up the pool and, when enabled, prepare the statement
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    print(f"  {label:<10} mean={statistics.mean(samples):.3f}ms "
+          f"p50={samples[len(samples) // 2]:.3f}ms "
+          f"p95={samples[int(len(samples) * 0.95) - 1]:.3f}ms")
+
+def main():
+    """Compare hot query latency with and without server-side prepared statements"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--iterations', type=int, default=2000)
+    parser.add_argument('--user-id', type=int, default=1)
+    args = parser.parse_args()
+
+    workloads = {
+        'get_user_by_id': lambda: UserService.get_user_by_id(args.user_id),
+        '_check_time_conflict': lambda: ReservationService._check_time_conflict('2030-01-07', '10:00', '11:00'),
+        'get_all_reservations': lambda: ReservationService.get_all_reservations(status='pending', page=3),
+        'get_all_users': lambda: UserService.get_all_users(search='a', page=2)
+    }
+
+    try:
+        for name, func in workloads.items():
+            print(name)
+            for enabled in (False, True):
+                db.prepared.enabled = enabled
+                measure('prepared' if enabled else 'plain', func, args.iterations)
+    except Exception as e:
+        print(f"Error running benchmark: {e}")
+        sys.exit(1)
+    finally:
+        db.close_pool()
+
+if __name__ == '__main__':
+    main()
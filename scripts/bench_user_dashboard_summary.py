@@ -0,0 +1,98 @@
+import sys
+import os
+import time
+import argparse
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import psycopg2.extras
+from app.database import db
+from app.services.reservation_service import ReservationService
+
+USERNAME_PREFIX = 'bench-summary-'
+STATUSES = ('confirmed', 'cancelled', 'cancelled', 'pending')
+
+def seed_user(history):
+    """Create a throwaway user with `history` reservations, twelve per day"""
+    with db.transaction():
+        with db.get_cursor() as cursor:
+            tag = f"{USERNAME_PREFIX}{int(time.time() * 1000)}"
+            cursor.execute("""
+                INSERT INTO users (username, email, password_hash, full_name)
+                VALUES (%s, %s, 'x', 'Benchmark Summary')
+                RETURNING id
+            """, (tag, f"{tag}@bench.local"))
+            user_id = cursor.fetchone()['id']
+
+            # Far from real bookings, one hour per slot so active rows never overlap
+            base_date = date.today() + timedelta(days=3650)
+            rows = []
+            for i in range(history):
+                reservation_date = base_date + timedelta(days=i // 12)
+                hour = 7 + i % 12
+                rows.append((user_id, reservation_date, f"{hour:02d}:00", f"{hour + 1:02d}:00",
+                             STATUSES[i % len(STATUSES)]))
+            psycopg2.extras.execute_values(cursor, """
+                INSERT INTO reservations (user_id, reservation_date, start_time, end_time, status)
+                VALUES %s
+            """, rows, page_size=1000)
+    return user_id
+
+def legacy_counts(user_id):
+    """What user_dashboard did before: hydrate up to 1000 rows and count them in Python"""
+    reservations = ReservationService.get_user_reservations(user_id=user_id, page=1, per_page=1000)['reservations']
+    today = date.today().isoformat()
+    return {
+        'upcoming_count': len([r for r in reservations
+                               if r['reservation_date'].isoformat() >= today
+                               and r['status'] in ['confirmed', 'pending']]),
+        'total_count': len(reservations),
+        'cancelled_count': len([r for r in reservations if r['status'] == 'cancelled'])
+    }
+
+def timed(func, user_id, iterations):
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func(user_id)
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2], samples[int(len(samples) * 0.95) - 1]
+
+def cleanup(user_ids):
+    with db.get_cursor() as cursor:
+        cursor.execute("DELETE FROM reservations WHERE user_id = ANY(%s)", (user_ids,))
+        cursor.execute("DELETE FROM users WHERE id = ANY(%s)", (user_ids,))
+
+def main():
+    """Compare the row-hydrating dashboard counters with the single aggregate summary"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--history', type=int, nargs='+', default=[50, 500, 2000, 10000],
+                        help='Reservations per user to benchmark')
+    parser.add_argument('--iterations', type=int, default=50)
+    args = parser.parse_args()
+
+    user_ids = []
+    try:
+        for history in args.history:
+            user_id = seed_user(history)
+            user_ids.append(user_id)
+            legacy_p50, legacy_p95 = timed(legacy_counts, user_id, args.iterations)
+            summary_p50, summary_p95 = timed(ReservationService.get_user_reservation_summary, user_id, args.iterations)
+            print(f"{history:>6} reservations: legacy p50={legacy_p50:.2f}ms p95={legacy_p95:.2f}ms | "
+                  f"summary p50={summary_p50:.2f}ms p95={summary_p95:.2f}ms")
+        print(f"summary: {ReservationService.get_user_reservation_summary(user_ids[-1])}")
+    except Exception as e:
+        print(f"Error running benchmark: {e}")
+        sys.exit(1)
+    finally:
+        if user_ids:
+            cleanup(user_ids)
+        db.close_pool()
+
+if __name__ == '__main__':
+    main()
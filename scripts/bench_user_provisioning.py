@@ -0,0 +1,74 @@
+import sys
+import os
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from app.database import db
+from app.services.password_hashing import password_hasher
+from app.services.user_service import UserService, PROVISION_HASH_WORKERS
+
+USERNAME_PREFIX = 'bench-roster-'
+
+def roster(students, tag):
+    """(row_number, row) pairs like read_import_rows yields for a CSV roster, with a few bad rows"""
+    rows = []
+    for i in range(students):
+        username = f"{tag}{i}"
+        rows.append((i + 2, {
+            'username': username,
+            'email': f"{username}@bench.local",
+            'full_name': f"Estudiante {i}",
+            'password': '' if i % 2 else f"clave-{i:06d}"
+        }))
+    # A repeated student and an invalid row, so the report covers every path
+    rows.append((students + 2, dict(rows[0][1])))
+    rows.append((students + 3, {'username': f"{tag}bad", 'email': 'sin-arroba', 'full_name': 'X'}))
+    return rows
+
+def cleanup(tag):
+    with db.get_cursor() as cursor:
+        cursor.execute("DELETE FROM users WHERE username LIKE %s", (f"{tag}%",))
+
+def main():
+    """Time bulk provisioning of a generated roster, split into duplicate check and full run"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--students', type=int, default=2000)
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--workers', type=int, default=PROVISION_HASH_WORKERS or os.cpu_count() or 1,
+                        help='Password hashing processes')
+    args = parser.parse_args()
+
+    tag = f"{USERNAME_PREFIX}{int(time.time() * 1000)}-"
+    try:
+        rows = roster(args.students, tag)
+
+        started = time.perf_counter()
+        report = UserService.provision_users(rows, batch_size=args.batch_size, dry_run=True)
+        print(f"validation + duplicate check: {(time.perf_counter() - started) * 1000:.0f}ms "
+              f"({report['error_count']} invalid, {report['duplicate_count']} duplicates)")
+
+        started = time.perf_counter()
+        report = UserService.provision_users(rows, batch_size=args.batch_size, hash_workers=args.workers)
+        elapsed = time.perf_counter() - started
+        print(f"provisioned {report['created']} of {report['total_rows']} rows in {elapsed:.2f}s "
+              f"with {args.workers} hashing processes ({report['created'] / elapsed:.0f} users/s)")
+
+        started = time.perf_counter()
+        report = UserService.provision_users(rows, batch_size=args.batch_size, hash_workers=args.workers)
+        print(f"re-run of the same roster: {report['duplicate_count']} duplicates found in "
+              f"{(time.perf_counter() - started) * 1000:.0f}ms, {report['created']} created")
+    except Exception as e:
+        print(f"Error running benchmark: {e}")
+        sys.exit(1)
+    finally:
+        cleanup(tag)
+        password_hasher.shutdown()
+        db.close_pool()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+import sys
+import os
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+import psycopg2.extras
+from app.database import db
+from app.services.user_service import UserService
+
+USERNAME_PREFIX = 'bench-search-'
+
+FIRST_NAMES = ['Ana', 'Luis', 'María', 'José', 'Carmen', 'Jorge', 'Lucía', 'Pablo', 'Sofía', 'Diego',
+               'Valeria', 'Andrés', 'Camila', 'Miguel', 'Fernanda', 'Ricardo', 'Daniela', 'Arturo']
+LAST_NAMES = ['García', 'Hernández', 'López', 'Martínez', 'González', 'Pérez', 'Rodríguez', 'Sánchez',
+              'Ramírez', 'Torres', 'Flores', 'Rivera', 'Gómez', 'Díaz', 'Quiroga', 'Morales', 'Ortiz']
+
+# Type-ahead keystrokes from one character up to a full name, plus a typo
+TERMS = ['q', 'qu', 'quir', 'quiroga', 'ana gar', 'hernandes', 'mart', '4821']
+
+LEGACY_SEARCH = """
+    SELECT id, username, email, full_name, is_admin, is_active, created_at
+    FROM users
+    WHERE username ILIKE %s OR email ILIKE %s OR full_name ILIKE %s
+    ORDER BY id
+    LIMIT 15
+"""
+
+def seed(users, batch_size):
+    """Insert `users` throwaway users with generated names; returns the username prefix used"""
+    tag = f"{USERNAME_PREFIX}{int(time.time() * 1000)}-"
+    rng = random.Random(42)
+    for offset in range(0, users, batch_size):
+        rows = []
+        for i in range(offset, min(offset + batch_size, users)):
+            first, last = rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+            username = f"{tag}{first.lower()}{i}"
+            rows.append((username, f"{username}@bench.local", 'x', f"{first} {last} {rng.choice(LAST_NAMES)}"))
+        with db.get_cursor() as cursor:
+            psycopg2.extras.execute_values(cursor, """
+                INSERT INTO users (username, email, password_hash, full_name)
+                VALUES %s
+            """, rows, page_size=batch_size)
+    with db.get_cursor() as cursor:
+        cursor.execute("ANALYZE users")
+    return tag
+
+def timed(func, iterations):
+    samples = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - started) * 1000)
+    samples.sort()
+    return samples[len(samples) // 2], samples[int(len(samples) * 0.95) - 1]
+
+def legacy(term):
+    pattern = f"%{term}%"
+    with db.get_cursor() as cursor:
+        cursor.execute(LEGACY_SEARCH, (pattern, pattern, pattern))
+        return cursor.fetchall()
+
+def cleanup(tag):
+    with db.get_cursor() as cursor:
+        cursor.execute("DELETE FROM users WHERE username LIKE %s", (f"{tag}%",))
+
+def main():
+    """Compare ILIKE scans with the trigram/prefix user search and the type-ahead endpoint"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--users', type=int, default=50000, help='Users to add before measuring')
+    parser.add_argument('--batch-size', type=int, default=5000)
+    parser.add_argument('--iterations', type=int, default=30)
+    parser.add_argument('--limit', type=int, default=10, help='Type-ahead result limit')
+    args = parser.parse_args()
+
+    tag = None
+    try:
+        started = time.perf_counter()
+        tag = seed(args.users, args.batch_size)
+        print(f"seeded {args.users} users in {time.perf_counter() - started:.1f}s")
+
+        print(f"{'term':12} {'ILIKE p50/p95':>18} {'list p50/p95':>18} {'type-ahead p50/p95':>20}  hits")
+        for term in TERMS:
+            legacy_p50, legacy_p95 = timed(lambda: legacy(term), args.iterations)
+            list_p50, list_p95 = timed(
+                lambda: UserService.get_all_users(search=term, per_page=15, count_mode='window'), args.iterations
+            )
+            ahead_p50, ahead_p95 = timed(lambda: UserService.search_users(term, limit=args.limit), args.iterations)
+            hits = len(UserService.search_users(term, limit=args.limit))
+            print(f"{term:12} {legacy_p50:8.2f}/{legacy_p95:7.2f}ms {list_p50:8.2f}/{list_p95:7.2f}ms "
+                  f"{ahead_p50:10.2f}/{ahead_p95:7.2f}ms  {hits}")
+    except Exception as e:
+        print(f"Error running benchmark: {e}")
+        sys.exit(1)
+    finally:
+        if tag is not None:
+            cleanup(tag)
+        db.close_pool()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,43 @@
+import sys
+import os
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from app.database import db
+
+def server_identity():
+    """Return which server answered the current cursor"""
+    with db.get_cursor() as cursor:
+        cursor.execute("SELECT current_setting('port'), pg_is_in_recovery()")
+        port, in_recovery = cursor.fetchone()
+        return f"port={port} in_recovery={in_recovery}"
+
+def main():
+    """Show where reads and writes are routed when DB_REPLICA_HOST is set"""
+    try:
+        if db.replica is None:
+            print("DB_REPLICA_HOST is not set; every query uses the primary.")
+            return
+
+        print(f"Write path:            {server_identity()}")
+        with db.reading():
+            print(f"Read-only path:        {server_identity()}")
+        with db.transaction():
+            with db.reading():
+                print(f"Read inside a transaction: {server_identity()}")
+
+        stats = db.replica.stats()
+        print(f"Replica lag: {stats['lag_seconds']}s, available: {stats['available']}")
+        print(f"Replica reads: {stats['replica_reads']}, fallbacks: {stats['primary_fallbacks']}, "
+              f"lag fallbacks: {stats['lag_fallbacks']}")
+    except Exception as e:
+        print(f"Error checking replica routing: {e}")
+        sys.exit(1)
+    finally:
+        db.close_pool()
+
+if __name__ == '__main__':
+    main()
@@ -6,23 +6,23 @@ sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from dotenv import load_dotenv
 load_dotenv()
 
-from app.models.user import User
-from app.models.reservation import Reservation
-from app.models.item import InventoryItem
+from app.database import db
+from app.database.migrations import MigrationRunner
 
 def main():
-    """Create all database tables"""
+    """Create all database tables by applying every schema migration (same as scripts/migrate.py)"""
     try:
         print("Creating database tables...")
-        User.create_table()
-        print("User table created successfully.")
-        Reservation.create_table()
-        print("Reservation table created successfully.")
-        InventoryItem.create_table()
-        print("InventoryItem table created successfully.")
+        applied = MigrationRunner().run()
+        if applied:
+            print(f"Applied {len(applied)} migration(s).")
+        else:
+            print("Database is up to date.")
     except Exception as e:
         print(f"Error creating tables: {e}")
         sys.exit(1)
+    finally:
+        db.close_pool()
 
 if __name__ == '__main__':
     main()
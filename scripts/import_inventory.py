@@ -0,0 +1,49 @@
+import sys
+import os
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from app.database import db
+from app.services.inventory_service import InventoryService
+from app.services.inventory_import import read_import_rows, detect_format
+
+def main():
+    """Bulk import inventory items from a CSV, JSON or JSON Lines file"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('path')
+    parser.add_argument('--format', choices=['csv', 'json', 'jsonl'])
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--atomic', action='store_true', help='Import nothing if any row is invalid')
+    args = parser.parse_args()
+
+    fmt = args.format or detect_format(args.path)
+    if not fmt:
+        print("Could not detect the file format, use --format")
+        sys.exit(1)
+
+    try:
+        with open(args.path, 'rb') as stream:
+            report = InventoryService.import_items(
+                read_import_rows(stream, fmt), batch_size=args.batch_size, atomic=args.atomic
+            )
+
+        print(f"Rows read: {report['total_rows']}")
+        print(f"Inserted: {report['inserted']}")
+        print(f"Invalid rows: {report['error_count']}")
+        for error in report['errors']:
+            print(f"  row {error['row']}: {error['message']}")
+        if report['rolled_back']:
+            print("Import rolled back because --atomic was given and some rows were invalid.")
+            sys.exit(1)
+    except Exception as e:
+        print(f"Error importing inventory: {e}")
+        sys.exit(1)
+    finally:
+        db.close_pool()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+import sys
+import os
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from app.database import db
+from app.database.migrations import MigrationRunner
+
+def main():
+    """Apply pending schema migrations"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--dry-run', action='store_true', help='Print the pending migrations without applying them')
+    parser.add_argument('--target', type=int, help='Stop after this migration version')
+    args = parser.parse_args()
+
+    try:
+        runner = MigrationRunner()
+        if args.dry_run:
+            runner.plan(args.target)
+            return
+
+        applied = runner.run(args.target)
+        if applied:
+            print(f"Applied {len(applied)} migration(s).")
+        else:
+            print("Database is up to date.")
+    except Exception as e:
+        print(f"Error running migrations: {e}")
+        sys.exit(1)
+    finally:
+        db.close_pool()
+
+if __name__ == '__main__':
+    main()
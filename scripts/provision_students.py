@@ -0,0 +1,67 @@
+import sys
+import os
+import csv
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from app.database import db
+from app.services.inventory_import import read_import_rows, detect_format
+from app.services.password_hashing import password_hasher
+from app.services.user_service import UserService
+
+REPORT_FIELDS = ['row', 'username', 'status', 'id', 'temporary_password', 'message']
+
+def main():
+    """Create student accounts in bulk from a CSV roster (username, email, full_name[, password])"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('path')
+    parser.add_argument('--format', choices=['csv', 'json', 'jsonl'])
+    parser.add_argument('--batch-size', type=int, default=500)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1,
+                        help='Processes hashing passwords (default: every core)')
+    parser.add_argument('--dry-run', action='store_true', help='Validate and check duplicates without creating anyone')
+    parser.add_argument('--report', help='Write the per-row report, including generated passwords, to this CSV')
+    args = parser.parse_args()
+
+    fmt = args.format or detect_format(args.path)
+    if not fmt:
+        print("Could not detect the file format, use --format")
+        sys.exit(1)
+
+    try:
+        started = time.perf_counter()
+        with open(args.path, 'rb') as stream:
+            report = UserService.provision_users(
+                read_import_rows(stream, fmt), batch_size=args.batch_size,
+                dry_run=args.dry_run, hash_workers=args.workers
+            )
+        elapsed = time.perf_counter() - started
+
+        print(f"Rows read: {report['total_rows']} in {elapsed:.1f}s")
+        print(f"Created: {report['created']}")
+        print(f"Duplicates: {report['duplicate_count']}")
+        print(f"Invalid rows: {report['error_count']}")
+        for entry in report['rows']:
+            if entry['status'] in ('invalid', 'duplicate', 'exists'):
+                print(f"  row {entry['row']}: {entry['message']}")
+
+        if args.report:
+            with open(args.report, 'w', newline='', encoding='utf-8') as output:
+                writer = csv.DictWriter(output, fieldnames=REPORT_FIELDS, extrasaction='ignore')
+                writer.writeheader()
+                writer.writerows(report['rows'])
+            print(f"Report written to {args.report}")
+    except Exception as e:
+        print(f"Error provisioning students: {e}")
+        sys.exit(1)
+    finally:
+        password_hasher.shutdown()
+        db.close_pool()
+
+if __name__ == '__main__':
+    main()
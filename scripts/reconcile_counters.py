@@ -0,0 +1,41 @@
+import sys
+import os
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from app.database import db
+from app.services.counter_service import CounterService
+
+def main():
+    """Check the dashboard counters against real counts and correct any drift"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--check', action='store_true',
+                        help='Only report drift; exit with status 1 when any is found')
+    args = parser.parse_args()
+
+    try:
+        drift = CounterService.check_consistency() if args.check else CounterService.reconcile()
+        for name, (counter, actual) in drift.items():
+            print(f"{name}: counter={counter} actual={actual} ({actual - counter:+d})")
+
+        if not drift:
+            print("Counters are consistent.")
+        elif args.check:
+            print(f"{len(drift)} counter(s) drifted.")
+        else:
+            print(f"Corrected {len(drift)} counter(s).")
+    except Exception as e:
+        print(f"Error reconciling counters: {e}")
+        sys.exit(1)
+    finally:
+        db.close_pool()
+
+    if args.check and drift:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
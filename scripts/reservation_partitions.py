@@ -0,0 +1,64 @@
+import sys
+import os
+import argparse
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from app.database import db
+from app.services.reservation_partitions import ReservationPartitionService, add_months, month_start
+
+def parse_month(value):
+    year, month = value.split('-')
+    return date(int(year), int(month), 1)
+
+def main():
+    """List, create ahead or archive the monthly reservation partitions"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    commands.add_parser('list', help='Show partitions with estimated rows and size')
+
+    ensure = commands.add_parser('ensure', help='Create missing partitions for the coming months')
+    ensure.add_argument('--months-ahead', type=int, default=24)
+
+    archive = commands.add_parser('archive', help='Detach partitions older than a month')
+    archive.add_argument('--before', type=parse_month, help='First month to keep (YYYY-MM)')
+    archive.add_argument('--keep-months', type=int, default=24,
+                         help='Months to keep before the current one when --before is not given')
+    archive.add_argument('--export', metavar='DIR', help='Write each partition to DIR as gzipped CSV')
+    archive.add_argument('--drop', action='store_true', help='Drop exported partitions instead of moving them')
+    archive.add_argument('--dry-run', action='store_true', help='Only print what would be archived')
+    args = parser.parse_args()
+
+    try:
+        if args.command == 'list':
+            for partition in ReservationPartitionService.list_partitions():
+                print(f"{partition['name']:<28} ~{partition['estimated_rows']:>10} rows "
+                      f"{partition['size_bytes'] / 1024 / 1024:>9.1f} MB")
+        elif args.command == 'ensure':
+            partitions = ReservationPartitionService.ensure_partitions(args.months_ahead)
+            print(f"{len(partitions)} partition(s) in place up to {partitions[-1]}.")
+        else:
+            before = args.before or add_months(month_start(date.today()), -args.keep_months)
+            if args.export:
+                os.makedirs(args.export, exist_ok=True)
+            archived = ReservationPartitionService.archive_partitions(
+                before, export_dir=args.export, drop=args.drop, dry_run=args.dry_run
+            )
+            for entry in archived:
+                target = entry['file'] or ('dropped' if entry['action'] == 'drop' else 'archive schema')
+                print(f"{entry['name']} -> {target}" + (' (dry run)' if args.dry_run else ''))
+            print(f"{len(archived)} partition(s) older than {before:%Y-%m} "
+                  f"{'would be ' if args.dry_run else ''}archived.")
+    except Exception as e:
+        print(f"Error managing partitions: {e}")
+        sys.exit(1)
+    finally:
+        db.close_pool()
+
+if __name__ == '__main__':
+    main()
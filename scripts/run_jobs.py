@@ -0,0 +1,56 @@
+import sys
+import os
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from app.database import db
+from app.services.jobs import JOBS, JobService, scheduler
+
+def print_run(run):
+    print(f"{run['job_name']}: {run['status']} in {run['duration_ms']} ms, "
+          f"{run['rows_affected'] if run['rows_affected'] is not None else '-'} row(s)"
+          + (f" ({run['message']})" if run['message'] else ''))
+
+def main():
+    """Run housekeeping jobs once, on a loop, or show their history"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--job', choices=sorted(JOBS), help='Run only this job, even if it is not due')
+    parser.add_argument('--loop', action='store_true', help='Keep running due jobs every tick (for cron-less hosts)')
+    parser.add_argument('--history', action='store_true', help='Show the latest recorded runs')
+    args = parser.parse_args()
+
+    try:
+        if args.history:
+            for run in reversed(JobService.get_recent_runs(args.job)):
+                print(f"{run['finished_at']:%Y-%m-%d %H:%M:%S} ", end='')
+                print_run(run)
+        elif args.loop:
+            print(f"Running due jobs every {scheduler.tick}s; Ctrl+C to stop.")
+            scheduler.start()
+            scheduler.join()
+        elif args.job:
+            run = JobService.run(args.job, force=True)
+            if run:
+                print_run(run)
+            else:
+                print(f"{args.job} is already running in another worker.")
+        else:
+            runs = JobService.run_due()
+            for run in runs:
+                print_run(run)
+            if not runs:
+                print("No jobs due.")
+    except KeyboardInterrupt:
+        scheduler.stop()
+    except Exception as e:
+        print(f"Error running jobs: {e}")
+        sys.exit(1)
+    finally:
+        db.close_pool()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,73 @@
+import sys
+import os
+import argparse
+import threading
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dotenv import load_dotenv
+load_dotenv()
+
+from app.database import db
+from app.services.reservation_service import ReservationService
+
+def main():
+    """Fire parallel bookings at one slot and check that exactly one succeeds"""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument('--user-id', type=int, required=True, help='Existing user to book as')
+    parser.add_argument('--threads', type=int, default=32)
+    parser.add_argument('--rounds', type=int, default=10)
+    args = parser.parse_args()
+
+    # Far in the future so real bookings are never touched
+    base_date = date.today() + timedelta(days=3650)
+    created_ids = []
+    failures = 0
+
+    try:
+        for round_number in range(args.rounds):
+            slot_date = (base_date + timedelta(days=round_number)).isoformat()
+            results = []
+            lock = threading.Lock()
+            start_signal = threading.Event()
+
+            def book():
+                start_signal.wait()
+                try:
+                    reservation, message = ReservationService.create_reservation(
+                        args.user_id, slot_date, '10:00', '11:00'
+                    )
+                except Exception as e:
+                    reservation, message = None, f"error: {e}"
+                with lock:
+                    results.append((reservation, message))
+
+            workers = [threading.Thread(target=book) for _ in range(args.threads)]
+            for thread in workers:
+                thread.start()
+            start_signal.set()
+            for thread in workers:
+                thread.join()
+
+            booked = [reservation for reservation, _ in results if reservation]
+            errors = [message for reservation, message in results if message.startswith('error')]
+            created_ids.extend(reservation['id'] for reservation in booked)
+            status = 'OK' if len(booked) == 1 and not errors else 'FAIL'
+            if status == 'FAIL':
+                failures += 1
+            print(f"round {round_number + 1}: {len(booked)} booked, {len(results) - len(booked)} rejected, "
+                  f"{len(errors)} errors -> {status}")
+
+        print("No double bookings." if not failures else f"{failures} round(s) double-booked or errored.")
+    finally:
+        if created_ids:
+            with db.get_cursor() as cursor:
+                cursor.execute("DELETE FROM reservations WHERE id = ANY(%s)", (created_ids,))
+        db.close_pool()
+
+    if failures:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()